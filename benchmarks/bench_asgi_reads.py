@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""
+Benchmark for concurrent GET requests from slow clients: compares the WSGI path
+(a fixed number of worker threads that are busy until the client has received
+the response) to the ASGI path with the async read views of asyncviews.py (the
+views run in the read thread pool, and the event loop sends the responses).
+Slow clients are simulated by a delay for receiving each response.
+
+Usage:
+
+    python benchmarks/bench_asgi_reads.py [--requests 400] [--connections 64] [--workers 4]
+"""
+import argparse
+import asyncio
+import io
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+SERVERS = ["wsgi", "asgi"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--server", choices=SERVERS, help="Run one server (default: both, in subprocesses)")
+    parser.add_argument("--requests", type=int, default=400, help="Number of requests")
+    parser.add_argument("--connections", type=int, default=64, help="Number of concurrent clients")
+    parser.add_argument("--workers", type=int, default=4, help="WSGI worker threads and ASGI read threads")
+    parser.add_argument("--client-delay", type=float, default=0.2, help="Seconds to receive each response")
+    parser.add_argument("--nodes", type=int, default=200, help="Number of content nodes")
+    return parser.parse_args()
+
+
+def run_wsgi(paths, args):
+    from django.core.wsgi import get_wsgi_application
+    application = get_wsgi_application()
+
+    def request(path):
+        environ = {
+            "REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": "",
+            "SERVER_NAME": "localhost", "SERVER_PORT": "80", "HTTP_HOST": "localhost",
+            "SERVER_PROTOCOL": "HTTP/1.1", "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(), "wsgi.errors": sys.stderr,
+        }
+        statuses = []
+        response = application(environ, lambda status, headers: statuses.append(status))
+        try:
+            size = sum(len(chunk) for chunk in response)
+            time.sleep(args.client_delay)     # the worker waits for the slow client
+        finally:
+            response.close()
+        assert statuses[0].startswith("200"), statuses[0]
+        return size
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        return sum(executor.map(request, paths))
+
+
+def run_asgi(paths, args):
+    from django.core.asgi import get_asgi_application
+    application = get_asgi_application()
+
+    async def request(path, semaphore):
+        async with semaphore:
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+                "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+                "query_string": b"", "root_path": "", "headers": [(b"host", b"localhost")],
+                "server": ("localhost", 80), "client": ("127.0.0.1", 50000),
+            }
+            messages = []
+
+            async def receive():
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            async def send(message):
+                messages.append(message)
+                if message["type"] == "http.response.body" and not message.get("more_body"):
+                    await asyncio.sleep(args.client_delay)   # only this connection waits
+
+            await application(scope, receive, send)
+            assert messages[0]["status"] == 200, messages[0]["status"]
+            return sum(len(m.get("body", b"")) for m in messages)
+
+    async def run():
+        semaphore = asyncio.Semaphore(args.connections)
+        return sum(await asyncio.gather(*[request(path, semaphore) for path in paths]))
+
+    return asyncio.run(run())
+
+
+def run_server(args):
+    os.environ["ROCDATA_ASYNC_READ_VIEWS"] = "true" if args.server == "asgi" else ""
+    os.environ["ROCDATA_ASYNC_READ_THREADS"] = str(args.workers)
+    from common import build_content_collection, create_test_db, disable_debug_tools, setup_django
+    setup_django()
+    from django.conf import settings
+    disable_debug_tools()
+    settings.ROCDATA_RESPONSE_CACHE = None      # measure the database path
+    settings.ALLOWED_HOSTS = ["localhost"]
+    create_test_db()
+    collection = build_content_collection(args.nodes)
+    node_ids = list(collection.contentnodes.values_list("id", flat=True))
+    paths = ["/Ghana/contentnodes/{}.json".format(node_ids[i % len(node_ids)]) for i in range(args.requests)]
+
+    runner = run_asgi if args.server == "asgi" else run_wsgi
+    start = time.perf_counter()
+    size = runner(paths, args)
+    seconds = time.perf_counter() - start
+    print("{:<8} {:>10.3f} {:>12.1f} {:>12.1f}".format(
+        args.server, seconds, args.requests / seconds, size / args.requests / 1e3))
+
+
+def main():
+    args = parse_args()
+    if args.server:
+        run_server(args)
+        return
+    print("{} requests, {} concurrent clients, {} workers, {} s client delay".format(
+        args.requests, args.connections, args.workers, args.client_delay))
+    print("{:<8} {:>10} {:>12} {:>12}".format("server", "total (s)", "requests/s", "size (KB)"), flush=True)
+    for server in SERVERS:
+        # separate processes, since the URL patterns are set up once per process
+        subprocess.run([sys.executable, __file__, "--server", server] + sys.argv[1:], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+Benchmark for the ``/full`` endpoint of a large content collection: compares
+the nested response (``full.json``) to the streaming one (``?stream=true``)
+in terms of time to first byte, total time, and peak Python memory use.
+
+Usage:
+
+    python benchmarks/bench_full_stream.py [--nodes 20000]
+"""
+import argparse
+import time
+import tracemalloc
+
+from common import build_content_collection, create_test_db, disable_debug_tools, setup_django
+setup_django()
+
+from django.test import Client
+
+
+def measure(client, url, trace_memory=False):
+    """
+    Return the time to first byte, total time, peak traced memory, and size of
+    the response. Memory tracing slows everything down, so it's a separate run.
+    """
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(url)
+    assert response.status_code == 200, response.status_code
+    if response.streaming:
+        chunks = iter(response.streaming_content)
+        first = next(chunks)
+        ttfb = time.perf_counter() - start
+        size = len(first) + sum(len(chunk) for chunk in chunks)
+    else:
+        ttfb = time.perf_counter() - start
+        size = len(response.content)
+    total = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return ttfb, total, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=20000, help="Number of content nodes")
+    args = parser.parse_args()
+
+    disable_debug_tools()
+    create_test_db()
+    collection = build_content_collection(args.nodes)
+    url = "/Ghana/contentcollections/{}/full.json".format(collection.id)
+    client = Client(HTTP_HOST="localhost")
+
+    print("{:<12} {:>10} {:>10} {:>12} {:>12}".format("mode", "TTFB (s)", "total (s)", "peak (MB)", "size (MB)"))
+    for label, query in [("nested", ""), ("stream", "?stream=true")]:
+        ttfb, total, _, size = measure(client, url + query)
+        _, _, peak, _ = measure(client, url + query, trace_memory=True)
+        print("{:<12} {:>10.3f} {:>10.3f} {:>12.1f} {:>12.1f}".format(label, ttfb, total, peak / 1e6, size / 1e6))
+
+
+if __name__ == "__main__":
+    main()
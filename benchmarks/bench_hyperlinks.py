@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+Microbenchmark for the URIs produced by the ROC hyperlink fields: compares the
+``reverse()``-based ``get_url`` used previously to the compiled URI templates.
+
+Usage:
+
+    python benchmarks/bench_hyperlinks.py [--number 20000]
+"""
+import argparse
+import functools
+import timeit
+
+from common import report, setup_django
+setup_django()
+
+from rest_framework.request import Request
+from rest_framework.reverse import reverse
+from rest_framework.test import APIRequestFactory
+
+from standards.models import Jurisdiction, ControlledVocabulary, Term
+from standards.models import StandardsDocument, StandardNode
+from standards.serializers import StandardNodeHyperlinkField, TermHyperlinkField
+
+
+def legacy_get_url(field, obj, view_name, request):
+    """
+    The ``MultiKeyHyperlinkField.get_url`` implementation based on ``reverse``.
+    """
+    url_kwargs = dict(
+        (urlparam, functools.reduce(getattr, [obj] + attrpath.split('.')))
+        for urlparam, attrpath in field.url_kwargs_mapping.items()
+    )
+    if "format" in request.GET:
+        request.GET._mutable = True
+        del request.GET["format"]
+        request.GET._mutable = False
+    return reverse(view_name, kwargs=url_kwargs, request=request)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000, help="Number of links per run")
+    args = parser.parse_args()
+
+    request = Request(APIRequestFactory().get('/Ghana/documents/D1/full.json', HTTP_HOST='localhost'))
+    juri = Jurisdiction(name='Ghana')
+    vocab = ControlledVocabulary(name='GradeLevels', jurisdiction=juri)
+    term = Term(path='B2/2', vocabulary=vocab)
+    doc = StandardsDocument(id='D1', jurisdiction=juri, license=None)  # no DB needed
+    node = StandardNode(id='S2x4Ab9kq', document=doc)
+
+    for field_class, obj in [(TermHyperlinkField, term), (StandardNodeHyperlinkField, node)]:
+        field = field_class()
+        view_name = field_class.view_name
+        assert legacy_get_url(field, obj, view_name, request) == field.get_url(obj, view_name, request, None)
+        print(field_class.__name__, field.get_url(obj, view_name, request, None))
+        legacy_s = timeit.timeit(lambda: legacy_get_url(field, obj, view_name, request), number=args.number)
+        compiled_s = timeit.timeit(lambda: field.get_url(obj, view_name, request, None), number=args.number)
+        legacy_us = report("  reverse() + rgetattr", legacy_s, args.number, unit="link")
+        compiled_us = report("  compiled URI template", compiled_s, args.number, unit="link")
+        print("  speedup: {:.1f}x".format(legacy_us / compiled_us))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Benchmark for the JSON renderers: compares DRF's ``JSONRenderer`` and the API's
+``FastJSONRenderer`` on the ``/full`` data of a synthetic content collection.
+The data of a small collection is taken from the API and its node data is
+replicated into a tree of the requested size (so the serializers don't have to
+run over all the nodes), once with ``OrderedDict`` nodes as before and once
+with plain ``dict`` nodes as ``process_uris`` now returns.
+
+Usage:
+
+    python benchmarks/bench_renderers.py [--nodes 50000] [--number 3]
+"""
+import argparse
+import time
+from collections import OrderedDict
+
+from common import build_content_collection, create_test_db, disable_debug_tools, report, setup_django
+setup_django()
+
+from django.test import Client
+from rest_framework.renderers import JSONRenderer
+
+from standards.renderers import FastJSONRenderer, orjson
+
+
+def get_sample_data():
+    """
+    Return the ``/full.json`` data of a small content collection.
+    """
+    collection = build_content_collection(3, fanout=2)
+    url = "/Ghana/contentcollections/{}/full.json".format(collection.id)
+    response = Client(HTTP_HOST="localhost").get(url)
+    assert response.status_code == 200, response.status_code
+    return response.data
+
+
+def build_tree_data(sample_data, num_nodes, fanout=10, dict_class=dict):
+    """
+    Return a copy of the collection `sample_data` with a tree of `num_nodes`
+    nodes made from copies of its first node (the ids and titles are varied).
+    """
+    node_template = dict(sample_data["children"][0])
+    nodes = []
+    for i in range(num_nodes):
+        node = dict_class(node_template)
+        node["id"] = "C{:09d}".format(i)
+        node["uri"] = node_template["uri"].rsplit("/", 1)[0] + "/" + node["id"]
+        node["title"] = "Content node {}".format(i)
+        node["children"] = []
+        if i > 0:
+            nodes[(i - 1) // fanout]["children"].append(node)
+        nodes.append(node)
+    data = dict_class(sample_data)
+    data["children"] = [nodes[0]]
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=50000, help="Number of content nodes")
+    parser.add_argument("--number", type=int, default=3, help="Renders per renderer")
+    args = parser.parse_args()
+
+    disable_debug_tools()
+    create_test_db()
+    sample_data = get_sample_data()
+    print("orjson installed: {}".format(orjson is not None))
+
+    results = {}
+    for dict_label, dict_class in [("OrderedDict", OrderedDict), ("dict", dict)]:
+        data = build_tree_data(sample_data, args.nodes, dict_class=dict_class)
+        for renderer_class in [JSONRenderer, FastJSONRenderer]:
+            renderer = renderer_class()
+            start = time.perf_counter()
+            for _ in range(args.number):
+                content = renderer.render(data, "application/json")
+            seconds = time.perf_counter() - start
+            label = "{} ({} nodes)".format(renderer_class.__name__, dict_label)
+            report(label, seconds, args.number, unit="render")
+            results[label] = content
+    assert len(set(results.values())) == 1, "renderers output differs"
+    print("output size: {:.1f} MB".format(len(content) / 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+"""
+Benchmark for the full-text search endpoint ``/search?q=`` over a large content
+collection: times selective queries (a few matches) and broad queries (every
+node matches, so all of them are ranked for the top 50).
+
+Usage:
+
+    python benchmarks/bench_search.py [--nodes 100000] [--repeat 20]
+"""
+import argparse
+import time
+
+from common import build_content_collection, create_test_db, disable_debug_tools, report, setup_django
+setup_django()
+
+from django.test import Client
+
+QUERIES = [
+    ("selective (1 match)", "node 54321"),
+    ("selective (stemmed)", "descriptions 12345"),
+    ("broad (all match)", "content node"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=100000, help="Number of content nodes")
+    parser.add_argument("--repeat", type=int, default=20, help="Requests per query")
+    args = parser.parse_args()
+
+    disable_debug_tools()
+    create_test_db()
+    start = time.perf_counter()
+    build_content_collection(args.nodes)
+    report("insert {} nodes (with indexing)".format(args.nodes), time.perf_counter() - start, args.nodes, "node")
+    client = Client(HTTP_HOST="localhost")
+
+    for label, q in QUERIES:
+        response = client.get("/search", {"q": q})
+        assert response.status_code == 200, response.status_code
+        num_results = len(response.json()["results"])
+        start = time.perf_counter()
+        for i in range(args.repeat):
+            client.get("/search", {"q": q})
+        report("{} -> {}".format(label, num_results), time.perf_counter() - start, args.repeat, "request")
+
+
+if __name__ == "__main__":
+    main()
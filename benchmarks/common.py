@@ -0,0 +1,101 @@
+"""
+Common setup for the benchmark scripts: configures Django for the standards-server
+project so the benchmarks can be run as ``python benchmarks/bench_*.py``.
+"""
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django():
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "standards-server.settings")
+    import django
+    django.setup()
+
+
+def disable_debug_tools():
+    """
+    Run requests like in production: no DEBUG query log and no silk profiling
+    middleware (call before creating a test ``Client``).
+    """
+    from django.conf import settings
+    settings.DEBUG = False
+    settings.MIDDLEWARE = [m for m in settings.MIDDLEWARE if not m.startswith('silk.')]
+
+
+def report(label, seconds, number, unit="op"):
+    """
+    Print the total time and per-operation time for a benchmark run.
+    """
+    per_op_us = seconds / number * 1e6
+    print("{:<40} {:>9.3f} s  {:>9.2f} us/{}".format(label, seconds, per_op_us, unit))
+    return per_op_us
+
+
+def create_test_db(verbosity=0):
+    """
+    Create (and migrate) a throwaway test database for benchmarks that need data.
+    """
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    settings.ROCDATA_READ_ONLY_DATABASE = None     # it would read the dev database
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True)
+    return connection
+
+
+def build_content_collection(num_nodes, fanout=10, juri_name="Ghana"):
+    """
+    Create a content collection with a tree of `num_nodes` content nodes in
+    which every node has `fanout` children (the MPTT columns are computed here
+    so the nodes can be inserted using ``bulk_create``).
+    """
+    from standards.models import Jurisdiction, ContentCollection, ContentNode
+    juri, _ = Jurisdiction.objects.get_or_create(name=juri_name)
+    collection = ContentCollection.objects.create(
+        name="bench{}".format(num_nodes),
+        title="Benchmark collection with {} nodes".format(num_nodes),
+        jurisdiction=juri,
+        import_method="bulk_import",
+        license=None,
+    )
+    tree_id = ContentNode._tree_manager._get_next_tree_id()
+    children = {0: []}
+    for i in range(1, num_nodes):
+        parent_index = (i - 1) // fanout
+        children[parent_index].append(i)
+        children[i] = []
+    nodes = [None] * num_nodes
+    counter = 0
+    stack = [(0, None, 0, False)]
+    lfts = {}
+    while stack:
+        index, parent_index, level, visited = stack.pop()
+        counter += 1
+        if not visited:
+            lfts[index] = counter
+            stack.append((index, parent_index, level, True))
+            for child_index in reversed(children[index]):
+                stack.append((child_index, index, level + 1, False))
+            continue
+        nodes[index] = ContentNode(
+            id="C{:09d}".format(index),
+            collection=collection,
+            parent_id=None if parent_index is None else "C{:09d}".format(parent_index),
+            tree_id=tree_id,
+            lft=lfts[index],
+            rght=counter,
+            level=level,
+            sort_order=float(index),
+            title="Content node {}".format(index),
+            description="Description of content node {} ".format(index) * 3,
+            source_domain="example.org",
+            source_id=str(index),
+            license=None,
+        )
+    ContentNode.objects.bulk_create(nodes, batch_size=1000)
+    return collection
@@ -7,8 +7,10 @@ from django.core.management.base import BaseCommand
 import pycountry
 import requests
 
+from standards.caching import deferred_invalidation
 from standards.models import Jurisdiction, Term, jurisdictions
 from standards.models import ContentCollection, ContentNode
+from standards.termindex import get_term_index
 from standards.utils import ensure_country_code, ensure_language_code
 
 
@@ -25,20 +27,13 @@ KOLIBRI_CONTENTNODE_SOURCE_URL_TMPL = "{demoserver}/en/learn/#/topics/c/{node_id
 # e.g. http://alejandro-demo.learningequality.org/en/learn/#/topics/c/a1602eb28a014abb9d5e724eaed42e23
 
 
-KOLIBRI_KIND_TO_ContentNodeKind_MAP = {}
-kind_terms = Term.objects.filter(
-    vocabulary__jurisdiction__name="LE",
-    vocabulary__name="KolibriContentNodeKinds")
-for kind_term in kind_terms:
-    KOLIBRI_KIND_TO_ContentNodeKind_MAP[kind_term.path] = kind_term
-
-KOLIBRI_LICENSE_NAME_TO_LicenseKind_MAP = {}
-license_terms = Term.objects.filter(
-    vocabulary__jurisdiction__name="LE",
-    vocabulary__name="LicenseKinds")
-for license_term in license_terms:
-    KOLIBRI_LICENSE_NAME_TO_LicenseKind_MAP[license_term.label] = license_term
+# Kolibri kinds are the paths of the terms in the vocabulary LE/KolibriContentNodeKinds
+KOLIBRI_KIND_VOCABULARY = ("LE", "KolibriContentNodeKinds")
 
+KOLIBRI_LICENSE_NAME_TO_LicenseKind_ID_MAP = dict(
+    Term._base_manager.filter(
+        vocabulary__jurisdiction__name="LE",
+        vocabulary__name="LicenseKinds").values_list("label", "id"))
 
 
 
@@ -124,6 +119,18 @@ def add_children_recursive(rocparentnode, children, options):
 
     # STEP 1: Add or update all the nodes in children
     ############################################################################
+    # The new nodes are inserted one at a time, since MPTT updates the tree fields
+    # as each node is added, but their ids are allocated up front in a few queries
+    # (CharIdField.pre_save would check each new id with one query)
+    newchildren_by_source_id = {}
+    for child_dict in children:
+        if child_dict['id'] not in oldchildren_by_source_id:
+            newchildren_by_source_id[child_dict['id']] = ContentNode(
+                collection=rocparentnode.collection,
+                parent=rocparentnode,
+                source_id=child_dict['id'])
+    ContentNode._meta.pk.assign_values(list(newchildren_by_source_id.values()))
+
     children_source_ids = set()  # Keep track of all `source_id`s in `children`
     for i, child_dict in enumerate(children):
 
@@ -131,17 +138,19 @@ def add_children_recursive(rocparentnode, children, options):
         children_source_ids.add(source_id)
 
         if source_id in oldchildren_by_source_id:
-            # CASE A: updating an existing node
+            # CASE A: updating an existing node (reloaded, since the inserts and
+            # moves of its siblings shift its tree fields, and MPTT moves it
+            # among them on save when its sort_order changes)
             child_node = oldchildren_by_source_id[source_id]
+            child_node.refresh_from_db()
         else:
-            # CASE B: adding a new node
-            child_node = ContentNode.objects.create(
-                collection=rocparentnode.collection,
-                parent=rocparentnode,
-                source_id=source_id)
+            # CASE B: adding a new node (inserted by the save below)
+            child_node = newchildren_by_source_id[source_id]
 
         # Set or update attributes on child_node
-        child_node.kind = KOLIBRI_KIND_TO_ContentNodeKind_MAP[child_dict["kind"]]
+        child_node.kind_id = get_term_index().get_id(*KOLIBRI_KIND_VOCABULARY, child_dict["kind"])
+        if child_node.kind_id is None:
+            raise KeyError('Unknown Kolibri kind ' + child_dict["kind"])
         child_node.sort_order = float(i+1)
         # Content info
         child_node.title = child_dict["title"]
@@ -153,7 +162,7 @@ def add_children_recursive(rocparentnode, children, options):
         child_node.content_id = child_dict['content_id']
         child_node.node_id=source_id
         # Licensing
-        child_node.license = KOLIBRI_LICENSE_NAME_TO_LicenseKind_MAP.get(child_dict.get("license_name"))
+        child_node.license_id = KOLIBRI_LICENSE_NAME_TO_LicenseKind_ID_MAP.get(child_dict.get("license_name"))
         child_node.license_description=child_dict.get('license_description')
         child_node.copyright_holder=child_dict.get('license_owner')
         # OTHER ATTRIBUTES (FUTURE WORK):
@@ -202,7 +211,7 @@ def add_children_recursive(rocparentnode, children, options):
         child_node.extra_fields = node_extra_fields
 
         # Save child_node info to DB and recurse into children
-        child_node.save()
+        child_node.save(force_insert=source_id in newchildren_by_source_id)
         if 'children' in child_dict:
             add_children_recursive(child_node, child_dict['children'], options)
 
@@ -211,6 +220,7 @@ def add_children_recursive(rocparentnode, children, options):
     retired_sort_order = float(len(children) + 1)  # put retired nodes last
     for old_source_id, old_child in oldchildren_by_source_id.items():
         if old_source_id not in children_source_ids:
+            old_child.refresh_from_db()
             old_child.publication_status = "retired"
             old_child.sort_order = retired_sort_order
             retired_sort_order += 1.0
@@ -298,11 +308,13 @@ class Command(BaseCommand):
             language = ensure_language_code(language_raw)
             col.language = language
 
-        # Save the collection
-        col.save()
+        # the cached responses are invalidated once at the end
+        with deferred_invalidation():
+            # Save the collection
+            col.save()
 
-        # Add collection nodes
-        import_col_from_kolibri_channel(col, kolibri_tree, options)
+            # Add collection nodes
+            import_col_from_kolibri_channel(col, kolibri_tree, options)
 
         if updating_existing:
             print('Updated content collection', col.name, '   id=', col.id)
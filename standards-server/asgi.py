@@ -12,5 +12,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'standards-server.settings')
+os.environ.setdefault('ROCDATA_ASYNC_READ_VIEWS', 'true')     # see standards/asyncviews.py
 
 application = get_asgi_application()
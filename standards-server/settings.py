@@ -22,7 +22,7 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SECRET_KEY = "(8%+96rlt0k(=&=6^k*w@h(*u$tjcox20gt@yu#mn1)2ojw)$y"
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv("DJANGO_DEBUG", "true").lower() in ("1", "true", "yes")
 
 ALLOWED_HOSTS = ["localhost", "127.0.0.1", "[::1]", "0.0.0.0", "rocdata.global"]
 
@@ -50,6 +50,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "standards.sqlite.ReadOnlyDatabaseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -82,13 +83,38 @@ WSGI_APPLICATION = "standards-server.wsgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/3.1/ref/settings/#databases
-
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
+# PostgreSQL when POSTGRES_DB is set (e.g. the postgres service of
+# docker-compose.postgres.yml), otherwise the local SQLite file.
+
+if os.getenv("POSTGRES_DB"):
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.getenv("POSTGRES_DB"),
+            "USER": os.getenv("POSTGRES_USER", "postgres"),
+            "PASSWORD": os.getenv("POSTGRES_PASSWORD", ""),
+            "HOST": os.getenv("POSTGRES_HOST", "localhost"),
+            "PORT": os.getenv("POSTGRES_PORT", "5432"),
+            "CONN_MAX_AGE": int(os.getenv("POSTGRES_CONN_MAX_AGE", "60")),
+        }
     }
-}
+else:
+    # WAL mode and the other connection settings are in standards/sqlite.py
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
+        },
+        "readonly": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": "file:{}?mode=ro".format(os.path.join(BASE_DIR, "db.sqlite3")),
+            "TEST": {"MIRROR": "default"},
+        },
+    }
+
+# The GET and HEAD requests read from this database alias (None to disable)
+ROCDATA_READ_ONLY_DATABASE = "readonly" if "readonly" in DATABASES else None
+DATABASE_ROUTERS = ["standards.sqlite.ReadOnlyRouter"]
 
 
 # Password validation
@@ -132,7 +158,7 @@ STATIC_URL = "/static/"
 REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": (
         "rest_framework.renderers.TemplateHTMLRenderer",
-        "rest_framework.renderers.JSONRenderer",
+        "standards.renderers.FastJSONRenderer",
         "rest_framework.renderers.BrowsableAPIRenderer",
     )
 }
@@ -202,7 +228,7 @@ ROCDATA_PUBLISHING_CONTEXTS = {
     },
     'rocserver': {
         "scheme": "https",
-        "netloc": "https://rocdata.global",
+        "netloc": "rocdata.global",
         "path_prefix": "",
     },
     'w3id.org': {
@@ -222,6 +248,67 @@ ROCDATA_PUBLISHING_CONTEXTS = {
     },
 }
 
+# Rendered API responses are cached in this cache (set to None to disable) and
+# invalidated when the data changes, see standards/caching.py. A cache shared
+# between the server processes is needed for the invalidation to reach them all.
+ROCDATA_RESPONSE_CACHE = os.getenv("ROCDATA_RESPONSE_CACHE", "default") or None
+ROCDATA_RESPONSE_CACHE_TIMEOUT = 24 * 3600  # seconds
+# larger responses are stored compressed, and responses larger than the max
+# size (after compression) are not cached (None for no limit)
+ROCDATA_RESPONSE_CACHE_COMPRESS_MIN_SIZE = 64 * 1024  # bytes
+ROCDATA_RESPONSE_CACHE_MAX_SIZE = None
+
+# Under ASGI the hot GET endpoints are served by async views that run in a pool
+# of this many threads, see standards/asyncviews.py (enabled in asgi.py).
+ROCDATA_ASYNC_READ_VIEWS = os.getenv("ROCDATA_ASYNC_READ_VIEWS", "").lower() in ("1", "true", "yes")
+ROCDATA_ASYNC_READ_THREADS = int(os.getenv("ROCDATA_ASYNC_READ_THREADS", "16"))
+
+# The rendered responses go to the "default" cache, and the generation tokens of
+# their cache tags and the term index version go to the "rocgenerations" cache.
+# Both must be shared by the server processes: memcached when MEMCACHED_LOCATION
+# is set (e.g. the memcached service of docker-compose.yml), otherwise files in
+# BASE_DIR/cache. The file caches list their directory on every set and delete
+# a third of the entries when MAX_ENTRIES is reached, so they are only suited
+# for development, and the generation tokens are never culled.
+ROCDATA_GENERATION_CACHE = "rocgenerations"
+
+# memcached stores items up to 1 MB by default, which is less than the largest
+# /full responses even when compressed, so the memcached service is started with
+# this max item size (memcached -I) and python-memcached is told the same.
+MEMCACHED_MAX_ITEM_SIZE = 16 * 1024 * 1024  # bytes
+
+if os.getenv("MEMCACHED_LOCATION"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.memcached.MemcachedCache",
+            "LOCATION": os.getenv("MEMCACHED_LOCATION"),
+            "KEY_PREFIX": "responses",
+            "OPTIONS": {"server_max_value_length": MEMCACHED_MAX_ITEM_SIZE},
+        },
+        "rocgenerations": {
+            "BACKEND": "django.core.cache.backends.memcached.MemcachedCache",
+            "LOCATION": os.getenv("MEMCACHED_LOCATION"),
+            "KEY_PREFIX": "generations",
+            "TIMEOUT": None,
+        },
+    }
+    # python-memcached drops larger items silently (room left for the metadata)
+    ROCDATA_RESPONSE_CACHE_MAX_SIZE = MEMCACHED_MAX_ITEM_SIZE - 64 * 1024
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.path.join(BASE_DIR, "cache", "responses"),
+            "OPTIONS": {"MAX_ENTRIES": 50000},
+        },
+        "rocgenerations": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.path.join(BASE_DIR, "cache", "generations"),
+            "TIMEOUT": None,
+            "OPTIONS": {"MAX_ENTRIES": 10 ** 9},
+        },
+    }
+
 
 
 # Static pages (served as google docs HTML embeds)
@@ -32,6 +32,16 @@ urlpatterns = [
 ]
 
 
+# RESOLVE and SEARCH (before the jurisdictions, whose detail pattern matches them)
+################################################################################
+from standards.api import ResolveView, SearchView
+
+urlpatterns += [
+    path('resolve', ResolveView.as_view(), name='resolve'),
+    path('search', SearchView.as_view(), name='search'),
+]
+
+
 # JURISDICTIONS
 ################################################################################
 from standards.api import JurisdictionViewSet
@@ -129,6 +139,10 @@ jurisdiction_router.register(r'contentstandardrels', ContentStandardRelationView
 urlpatterns += format_suffix_patterns(router.urls, allowed=ALLOWED_FORMATS)
 urlpatterns += format_suffix_patterns(jurisdiction_router.urls, allowed=ALLOWED_FORMATS)
 
+if settings.ROCDATA_ASYNC_READ_VIEWS:
+    from standards.asyncviews import enable_async_read_views
+    enable_async_read_views(urlpatterns)
+
 
 
 
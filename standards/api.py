@@ -1,15 +1,32 @@
-from collections import OrderedDict
+import itertools
+from collections import defaultdict
 
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
-from django.http.response import HttpResponseRedirect
-from rest_framework import viewsets
+from django.urls import Resolver404, resolve
+from django.http.response import HttpResponseRedirect, StreamingHttpResponse
+from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import _positive_int
+from rest_framework.renderers import TemplateHTMLRenderer
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from standards.models import Jurisdiction
 from standards.serializers import JurisdictionSerializer
-from standards.publishing import get_publishing_context
+from standards.pagination import LargeResultsSetPagination, TreeCursorPagination
+from standards.bulk import bulk_upsert_content_standard_relations, get_hyperlink_field_class, resolve_hyperlinks
+from standards.caching import cached_response
+from standards.conditional import get_not_modified_response, get_page_validators, get_validators, has_date_modified
+from standards.conditional import set_validator_headers
+from standards.facets import CONTENT_NODE_FACETS, STANDARD_NODE_FACETS, FacetFilterBackend, get_facets_data
+from standards.publishing import build_absolute_uri, get_publishing_context, get_uri_path
+from standards.renderers import FastJSONRenderer
+from standards.search import SEARCH_MAX_RESULTS, SEARCH_SPECS, search
+from standards.streaming import iter_buffered, iter_queryset_chunks, stream_json_array
+from standards.streaming import new_children_placeholder, stream_json_tree
+from standards.trees import iter_tree_nodes, set_children_counts
 
 from standards.models import ControlledVocabulary, Term, TermRelation
 from standards.serializers import ControlledVocabularySerializer, TermSerializer, TermRelationSerializer
@@ -23,23 +40,21 @@ from standards.models import ContentCollection, ContentNode, ContentNodeRelation
 from standards.models import ContentCorrelation, ContentStandardRelation
 from standards.serializers import ContentCollectionSerializer, ContentNodeSerializer, ContentNodeRelationSerializer
 from standards.serializers import ContentCorrelationSerializer, ContentStandardRelationSerializer
-from standards.serializers import FullContentCollectionSerializer
-from standards.serializers import FullStandardsDocumentSerializer
+from standards.serializers import FullContentCollectionSerializer, FullContentNodeSerializer
+from standards.serializers import FullStandardsDocumentSerializer, FullStandardNodeSerializer
 
 
 # HELPERS
 ################################################################################
 
-def LargeResultsSetPagination(size=100):
-    class CustomPagination(PageNumberPagination):
-        page_size = size
-        page_size_query_param = "page_size"
-        max_page_size = page_size * 10
-    return CustomPagination
-
+TREE_DATA_SKIP_KEYS = ["lft", "rght", "tree_id"]   # MPTT internal impl. details
 
+STREAM_QUERY_PARAM = "stream"       # ?stream=true for unpaginated JSON dumps
+TRUTHY_QUERY_VALUES = ["1", "true", "yes"]
 
-TREE_DATA_SKIP_KEYS = ["lft", "rght", "tree_id"]   # MPTT internal impl. details
+TREE_ROOT_QUERY_PARAM = "root"      # ?root=<node id> for a subtree of /full
+TREE_DEPTH_QUERY_PARAM = "depth"    # ?depth=N for the first N levels of /full
+HTML_TREE_DEPTH = 2                 # levels of the HTML /full pages without ?depth, see get_tree_options
 
 class CustomHTMLRendererRetrieve:
     """
@@ -49,13 +64,25 @@ class CustomHTMLRendererRetrieve:
     """
     template_name_list = 'standards/generic_list.html'
 
+    @cached_response
     def list(self, request, *args, **kwargs):
         """
-        Used for HTML format of list-create endpoints.
+        Paginated list of objects, processed for the current publishing context.
+        JSON requests with ``?stream=true`` get all the objects instead, streamed
+        in chunks so that memory use doesn't grow with the size of the list.
         """
-        queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True, context={'request': request})
         publishing_context = get_publishing_context(request=request)
+        queryset = self.filter_queryset(self.get_queryset())
+        stream = self.stream_requested(request)
+        page = self.paginate_queryset(queryset) if not stream else None
+        # the validators of pages come from the objects of the page (no full scan)
+        not_modified_response = self.get_not_modified_response(request, publishing_context, page=page)
+        if not_modified_response is not None:
+            return not_modified_response
+        if stream:
+            return self.get_streaming_response(queryset, publishing_context)
+        objects = page if page is not None else queryset
+        serializer = self.get_serializer(objects, many=True)
         processed_datas = []
         for data in serializer.data:
             processed_data = self.process_uris(data, publishing_context=publishing_context)
@@ -65,19 +92,133 @@ class CustomHTMLRendererRetrieve:
             htmlized_datas = [self.htmlize_data_values(pd) for pd in processed_datas]
             class_name = queryset.model.__name__
             context = {'class_name': class_name, 'datas': htmlized_datas}
+            if page is not None:
+                context.update(self.paginator.get_template_context())
             return Response(context, template_name=self.template_name_list)
+        elif page is not None:
+            # JSON + API (paginated)
+            return self.get_paginated_response(processed_datas)
         else:
             # JSON + API
             return Response(processed_datas)
 
+    def stream_requested(self, request):
+        stream = request.query_params.get(STREAM_QUERY_PARAM, '').lower()
+        return stream in TRUTHY_QUERY_VALUES and request.accepted_renderer.format == 'json'
+
+    def get_streaming_response(self, queryset, publishing_context):
+        """
+        Return a streaming JSON response with the serialized data of all the
+        objects in `queryset` (each chunk is serialized only when it's needed).
+        """
+        def iter_processed_datas():
+            for chunk in iter_queryset_chunks(queryset):
+                serializer = self.get_serializer(chunk, many=True)
+                for data in serializer.data:
+                    yield self.process_uris(data, publishing_context=publishing_context)
+        datas = iter_processed_datas()
+        return StreamingHttpResponse(iter_buffered(stream_json_array(datas)), content_type='application/json')
+
+    def get_tree_options(self, request, instance, node_model, container_name):
+        """
+        Return the root node and the maximum level of nodes (or None for all) to
+        include in the ``/full`` tree of `instance` (the document or collection
+        `container_name` of the `node_model` nodes), based on the ``?root=<id>``
+        and ``?depth=N`` query params. HTML pages show only the first
+        ``HTML_TREE_DEPTH`` levels by default, and the deeper subtrees are loaded
+        on demand from the ``childrenfragment`` action of the nodes.
+        """
+        nodes = node_model.objects.all()
+        root_id = request.query_params.get(TREE_ROOT_QUERY_PARAM)
+        if root_id:
+            root = get_object_or_404(nodes, pk=root_id, **{container_name: instance})
+        else:
+            root = nodes.get(level=0, **{container_name: instance})
+        setattr(root, container_name, instance)
+        max_level = None
+        if TREE_DEPTH_QUERY_PARAM in request.query_params:
+            try:
+                depth = _positive_int(request.query_params[TREE_DEPTH_QUERY_PARAM])
+            except ValueError:
+                raise ValidationError({TREE_DEPTH_QUERY_PARAM: "A non-negative integer is required."})
+            max_level = root.level + depth
+        elif request.accepted_renderer.format == 'html':
+            max_level = root.level + HTML_TREE_DEPTH
+        return root, max_level
+
+    def get_tree_streaming_response(self, instance, root, max_level, serializer_class, node_serializer_class,
+                                    publishing_context):
+        """
+        Return a streaming JSON response for the ``/full`` data of `instance`,
+        whose tree of nodes under `root` is read and serialized in chunks in
+        tree order (so siblings appear in the order of their ``lft`` values).
+        """
+        placeholder = new_children_placeholder()
+        context = {'request': self.request, 'children_placeholder': placeholder}
+        data = serializer_class(instance, context=context).data
+        data = self.process_uris(data, publishing_context=publishing_context)
+        node_serializer = node_serializer_class(context=context)
+        nodes = iter_tree_nodes(
+            root,
+            select_related=node_serializer_class.tree_select_related,
+            prefetch_related=node_serializer.prune_related_lookups(node_serializer_class.tree_prefetch_related),
+            shared_related=node_serializer_class.tree_shared_related,
+            max_level=max_level,
+        )
+        if root.level > 0:
+            # ?root=<node id> subtree
+            if max_level is not None:
+                set_children_counts([root], max_level)
+            nodes = itertools.chain([root], nodes)
+        def serialize_node(node):
+            node_data = node_serializer.to_representation(node)
+            return self.process_uris(node_data, publishing_context=publishing_context)
+        pieces = stream_json_tree(data, nodes, serialize_node, placeholder)
+        return StreamingHttpResponse(iter_buffered(pieces), content_type='application/json')
+
+    def get_children_fragment_response(self, request, node_serializer_class, container_name):
+        """
+        Return the HTML list items of the children of the node, to be inserted
+        in the ``/full`` page when the node is expanded. The children are loaded
+        with one range query on ``tree_id``/``lft``/``level`` (see ``load_tree``)
+        and those that have children of their own get a button to load them.
+        """
+        publishing_context = get_publishing_context(request=request)
+        not_modified_response = self.get_not_modified_response(request, publishing_context)
+        if not_modified_response is not None:
+            return not_modified_response
+        node = self.get_object()
+        context = {'request': request, 'tree_max_level': node.level + 1}
+        datas = node_serializer_class(context=context).get_children(node)
+        processed_datas = [self.process_uris(data, publishing_context=publishing_context) for data in datas]
+        context = {
+            'children': processed_datas,
+            'object': getattr(node, container_name),
+            'tree_node_path': node.get_absolute_url().rsplit('/', 1)[0],
+        }
+        return Response(context, template_name='standards/fragments/recursive_children_nodes.html')
+
+    def get_facets_response(self, request):
+        """
+        Return the counts of the values of the ``facet_fields`` of the view among the
+        nodes of the list that match the facet filters in the query params.
+        """
+        publishing_context = get_publishing_context(request=request)
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(get_facets_data(self, request, queryset, publishing_context))
+
+    @cached_response
     def retrieve(self, request, *args, **kwargs):
         """
         This is used for ROC-data specific manipulation of object data URIs and
         also takes care of special handling for HTML format of details endpoints.
         """
+        publishing_context = get_publishing_context(request=request)
+        not_modified_response = self.get_not_modified_response(request, publishing_context)
+        if not_modified_response is not None:
+            return not_modified_response
         instance = self.get_object()
         serializer = self.get_serializer(instance)
-        publishing_context = get_publishing_context(request=request)
         processed_data = self.process_uris(serializer.data, publishing_context=publishing_context)
         if request.accepted_renderer.format == 'html':
             # HTML browsing
@@ -88,18 +229,90 @@ class CustomHTMLRendererRetrieve:
             # JSON + API
             return Response(processed_data)
 
+    def get_profile_queryset(self):
+        """
+        Return ``queryset`` with the related lookups for the data of the current
+        action (e.g. one of the loading profiles of the node models).
+        """
+        return self.queryset.all()
+
+    def filter_queryset(self, queryset):
+        """
+        Skip the prefetches of the relations omitted with ``?fields=`` or ``?omit=``.
+        """
+        queryset = super().filter_queryset(queryset)
+        lookups = queryset._prefetch_related_lookups
+        if lookups:
+            pruned_lookups = self.get_serializer().prune_related_lookups(lookups)
+            if len(pruned_lookups) < len(lookups):
+                queryset = queryset.prefetch_related(None).prefetch_related(*pruned_lookups)
+        return queryset
+
+    def get_conditional_querysets(self):
+        """
+        Return the querysets of the objects whose ``date_modified`` determine the
+        version of the response for the current action, or None if the model has
+        no ``date_modified``. Viewsets add the querysets of related objects that
+        appear in the detail responses (e.g. the nodes of a document).
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        if not has_date_modified(queryset.model):
+            return None
+        if self.action == 'list':
+            return [queryset]
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return [queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})]
+
+    def get_page_conditional_querysets(self, page):
+        """
+        Return the querysets of the related objects that appear in the serialized
+        objects of the list `page`, and whose changes don't update the objects'
+        own ``date_modified`` (e.g. the children of nodes).
+        """
+        return []
+
+    def get_not_modified_response(self, request, publishing_context, page=None):
+        """
+        Compute the ETag and Last-Modified validators of the response (these are
+        added to the response in ``finalize_response``) and return a 304 response
+        if the client's cached version is still current, otherwise None. For a
+        paginated list, the validators are computed from the objects of `page`.
+        """
+        base_url = publishing_context.base_url
+        if page is not None:
+            if not has_date_modified(self.queryset.model):
+                return None
+            pagination_context = self.paginator.get_template_context()
+            querysets = self.get_page_conditional_querysets(page)
+            self.response_validators = get_page_validators(request, page, pagination_context, base_url, querysets)
+        else:
+            querysets = self.get_conditional_querysets()
+            if querysets is None:
+                return None
+            self.response_validators = get_validators(request, querysets, base_url)
+        etag, last_modified = self.response_validators
+        if etag is None:
+            return None
+        return get_not_modified_response(request, etag, last_modified)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag, last_modified = getattr(self, 'response_validators', (None, None))
+        if etag is not None and response.status_code == 200:
+            set_validator_headers(response, etag, last_modified)
+        return response
+
     def process_uris(self, data, publishing_context=None):
         """
         Transform absolute path like `/terms/Ghana` to absolute URI for a given
         `publishing_context` context, e.g. `http://localhost:8000/terms/Ghana`.
         """
-        processed_data = OrderedDict()
+        base_url = publishing_context.base_url
+        processed_data = {}
         for key, value in data.items():
             if key in TREE_DATA_SKIP_KEYS:
                 continue
             if isinstance(value, str) and key.endswith('uri') and value.startswith('/'):
-                pc = publishing_context
-                base_url = pc['scheme'] + '://' + pc['netloc'] + pc['path_prefix']
                 processed_data[key] = base_url + value
             elif key == 'children' and isinstance(value, list):
                 newchildren = []
@@ -118,7 +331,7 @@ class CustomHTMLRendererRetrieve:
         """
         Make hyperlink data values clickable (used only in HTML browsing views).
         """
-        htmlized_data = OrderedDict()
+        htmlized_data = {}
 
         def htmlize_hyperlink(href):
             return "<a href=\"{href}\">{href}</a>".format(href=href)
@@ -151,9 +364,21 @@ class CustomHTMLRendererRetrieve:
 # JURISDICTION
 ################################################################################
 
+# The jurisdiction serializer only needs the ids of the children (and the names
+# of the vocabularies) to build their URIs. The reverse FK prefetches also set
+# child.jurisdiction so it is not re-fetched for each child.
+JURISDICTION_CHILDREN_PREFETCHES = [
+    Prefetch('vocabularies', queryset=ControlledVocabulary._base_manager.only('id', 'name', 'jurisdiction_id')),
+    Prefetch('documents', queryset=StandardsDocument._base_manager.only('id', 'jurisdiction_id')),
+    Prefetch('crosswalks', queryset=StandardsCrosswalk._base_manager.only('id', 'jurisdiction_id')),
+    Prefetch('contentcollections', queryset=ContentCollection._base_manager.only('id', 'jurisdiction_id')),
+    Prefetch('contentcorrelations', queryset=ContentCorrelation._base_manager.only('id', 'jurisdiction_id')),
+]
+
+
 class JurisdictionViewSet(CustomHTMLRendererRetrieve, viewsets.ModelViewSet):
     # /{juri}
-    queryset = Jurisdiction.objects.all()
+    queryset = Jurisdiction.objects.prefetch_related(*JURISDICTION_CHILDREN_PREFETCHES)
     serializer_class = JurisdictionSerializer
     lookup_field = "name"
     template_name = 'standards/jurisdiction_detail.html'
@@ -174,6 +399,18 @@ class ControlledVocabularyViewSet(CustomHTMLRendererRetrieve, viewsets.ModelView
     def get_queryset(self):
         return self.queryset.filter(jurisdiction__name=self.kwargs['jurisdiction_name'])
 
+    def get_conditional_querysets(self):
+        querysets = super().get_conditional_querysets()
+        if self.action != 'list':
+            querysets.append(Term.objects.filter(
+                vocabulary__jurisdiction__name=self.kwargs['jurisdiction_name'],
+                vocabulary__name=self.kwargs['name'],
+            ))
+        return querysets
+
+    def get_page_conditional_querysets(self, page):
+        return [Term.objects.filter(vocabulary_id__in=[vocab.pk for vocab in page])]
+
 
 class TermViewSet(CustomHTMLRendererRetrieve, viewsets.ModelViewSet):
     # /{juri}/terms/{vocab.name}/               GET(list) POST(create)
@@ -218,19 +455,39 @@ class StandardsDocumentViewSet(CustomHTMLRendererRetrieve, viewsets.ModelViewSet
     def get_queryset(self):
         return self.queryset.filter(jurisdiction__name=self.kwargs['jurisdiction_name'])
 
+    def get_conditional_querysets(self):
+        querysets = super().get_conditional_querysets()
+        if self.action != 'list':
+            querysets.append(StandardNode.objects.filter(document_id=self.kwargs['pk']))
+        return querysets
+
+    def get_page_conditional_querysets(self, page):
+        # the children of the root nodes
+        return [StandardNode.objects.filter(document_id__in=[doc.pk for doc in page], level=1)]
+
     @action(detail=True, methods=['get'])
+    @cached_response
     def full(self, request, *args, **kwargs):
+        publishing_context = get_publishing_context(request=request)
+        not_modified_response = self.get_not_modified_response(request, publishing_context)
+        if not_modified_response is not None:
+            return not_modified_response
         instance = self.queryset.get(
             jurisdiction__name=kwargs['jurisdiction_name'],
             pk=kwargs['pk']
         )
-        serializer = FullStandardsDocumentSerializer(instance, context={'request': request})
-        publishing_context = get_publishing_context(request=request)
+        root, max_level = self.get_tree_options(request, instance, StandardNode, "document")
+        if self.stream_requested(request):
+            return self.get_tree_streaming_response(
+                instance, root, max_level, FullStandardsDocumentSerializer, FullStandardNodeSerializer, publishing_context)
+        context = {'request': request, 'tree_root': root, 'tree_max_level': max_level}
+        serializer = FullStandardsDocumentSerializer(instance, context=context)
         processed_data = self.process_uris(serializer.data, publishing_context=publishing_context)
         if request.accepted_renderer.format == 'html':
             # HTML browsing
             htmlized_data = self.htmlize_data_values(processed_data)
-            context = {'data': htmlized_data, 'object': instance}
+            tree_node_path = root.get_absolute_url().rsplit('/', 1)[0]
+            context = {'data': htmlized_data, 'object': instance, 'tree_node_path': tree_node_path}
             return Response(context, template_name=self.template_name)
         else:
             # JSON + API
@@ -241,11 +498,42 @@ class StandardNodeViewSet(CustomHTMLRendererRetrieve, viewsets.ModelViewSet):
     # /{juri}/standardnodes/{sn.id}
     queryset = StandardNode.objects.all()
     serializer_class = StandardNodeSerializer
-    pagination_class = LargeResultsSetPagination(100)
+    pagination_class = TreeCursorPagination
     template_name = 'standards/standardnode_detail.html'
+    filter_backends = [FacetFilterBackend]
+    facet_fields = STANDARD_NODE_FACETS
+
+    def get_profile_queryset(self):
+        if self.action == 'list':
+            return self.queryset.for_list()
+        if self.action == 'childrenfragment':
+            return self.queryset.minimal()
+        if self.action == 'facets':
+            return self.queryset
+        return self.queryset.for_detail()
 
     def get_queryset(self):
-        return self.queryset.filter(document__jurisdiction__name=self.kwargs['jurisdiction_name'])
+        return self.get_profile_queryset().filter(document__jurisdiction__name=self.kwargs['jurisdiction_name'])
+
+    def get_conditional_querysets(self):
+        querysets = super().get_conditional_querysets()
+        if self.action != 'list':
+            querysets.append(StandardNode.objects.filter(parent_id=self.kwargs['pk']))  # children
+        if self.action == 'childrenfragment':
+            querysets.append(StandardNode.objects.filter(parent__parent_id=self.kwargs['pk']))  # grandchildren
+        return querysets
+
+    def get_page_conditional_querysets(self, page):
+        return [StandardNode.objects.filter(parent_id__in=[node.pk for node in page])]  # children
+
+    @action(detail=True, methods=['get'], renderer_classes=[TemplateHTMLRenderer])
+    @cached_response
+    def childrenfragment(self, request, *args, **kwargs):
+        return self.get_children_fragment_response(request, FullStandardNodeSerializer, "document")
+
+    @action(detail=False, methods=['get'], renderer_classes=[FastJSONRenderer])
+    def facets(self, request, *args, **kwargs):
+        return self.get_facets_response(request)
 
 
 # STANDARDS CROSSWALKS
@@ -287,19 +575,39 @@ class ContentCollectionViewSet(CustomHTMLRendererRetrieve, viewsets.ModelViewSet
     def get_queryset(self):
         return self.queryset.filter(jurisdiction__name=self.kwargs['jurisdiction_name'])
 
+    def get_conditional_querysets(self):
+        querysets = super().get_conditional_querysets()
+        if self.action != 'list':
+            querysets.append(ContentNode.objects.filter(collection_id=self.kwargs['pk']))
+        return querysets
+
+    def get_page_conditional_querysets(self, page):
+        # the children of the root nodes
+        return [ContentNode.objects.filter(collection_id__in=[collection.pk for collection in page], level=1)]
+
     @action(detail=True, methods=['get'])
+    @cached_response
     def full(self, request, *args, **kwargs):
+        publishing_context = get_publishing_context(request=request)
+        not_modified_response = self.get_not_modified_response(request, publishing_context)
+        if not_modified_response is not None:
+            return not_modified_response
         instance = self.queryset.get(
             jurisdiction__name=kwargs['jurisdiction_name'],
             pk=kwargs['pk']
         )
-        serializer = FullContentCollectionSerializer(instance, context={'request': request})
-        publishing_context = get_publishing_context(request=request)
+        root, max_level = self.get_tree_options(request, instance, ContentNode, "collection")
+        if self.stream_requested(request):
+            return self.get_tree_streaming_response(
+                instance, root, max_level, FullContentCollectionSerializer, FullContentNodeSerializer, publishing_context)
+        context = {'request': request, 'tree_root': root, 'tree_max_level': max_level}
+        serializer = FullContentCollectionSerializer(instance, context=context)
         processed_data = self.process_uris(serializer.data, publishing_context=publishing_context)
         if request.accepted_renderer.format == 'html':
             # HTML browsing
             htmlized_data = self.htmlize_data_values(processed_data)
-            context = {'data': htmlized_data, 'object': instance}
+            tree_node_path = root.get_absolute_url().rsplit('/', 1)[0]
+            context = {'data': htmlized_data, 'object': instance, 'tree_node_path': tree_node_path}
             return Response(context, template_name=self.template_name)
         else:
             # JSON + API
@@ -310,11 +618,42 @@ class ContentNodeViewSet(CustomHTMLRendererRetrieve, viewsets.ModelViewSet):
     queryset = ContentNode.objects.all()
     serializer_class = ContentNodeSerializer
     partial=True
-    pagination_class = LargeResultsSetPagination(100)
+    pagination_class = TreeCursorPagination
     template_name = 'standards/contentnode_detail.html'
+    filter_backends = [FacetFilterBackend]
+    facet_fields = CONTENT_NODE_FACETS
+
+    def get_profile_queryset(self):
+        if self.action == 'list':
+            return self.queryset.for_list()
+        if self.action == 'childrenfragment':
+            return self.queryset.minimal()
+        if self.action == 'facets':
+            return self.queryset
+        return self.queryset.for_detail()
 
     def get_queryset(self):
-        return self.queryset.filter(collection__jurisdiction__name=self.kwargs['jurisdiction_name'])
+        return self.get_profile_queryset().filter(collection__jurisdiction__name=self.kwargs['jurisdiction_name'])
+
+    def get_conditional_querysets(self):
+        querysets = super().get_conditional_querysets()
+        if self.action != 'list':
+            querysets.append(ContentNode.objects.filter(parent_id=self.kwargs['pk']))  # children
+        if self.action == 'childrenfragment':
+            querysets.append(ContentNode.objects.filter(parent__parent_id=self.kwargs['pk']))  # grandchildren
+        return querysets
+
+    def get_page_conditional_querysets(self, page):
+        return [ContentNode.objects.filter(parent_id__in=[node.pk for node in page])]  # children
+
+    @action(detail=True, methods=['get'], renderer_classes=[TemplateHTMLRenderer])
+    @cached_response
+    def childrenfragment(self, request, *args, **kwargs):
+        return self.get_children_fragment_response(request, FullContentNodeSerializer, "collection")
+
+    @action(detail=False, methods=['get'], renderer_classes=[FastJSONRenderer])
+    def facets(self, request, *args, **kwargs):
+        return self.get_facets_response(request)
 
 
 class ContentNodeRelationViewSet(CustomHTMLRendererRetrieve, viewsets.ModelViewSet):
@@ -350,4 +689,126 @@ class ContentStandardRelationViewSet(CustomHTMLRendererRetrieve, viewsets.ModelV
     template_name = 'standards/contentstandardrelation_detail.html'
 
     def get_queryset(self):
-        return self.queryset.filter(correlation__jurisdiction__name=self.kwargs['jurisdiction_name'])
\ No newline at end of file
+        return self.queryset.filter(correlation__jurisdiction__name=self.kwargs['jurisdiction_name'])
+
+    @action(detail=False, methods=['post'], renderer_classes=[FastJSONRenderer])
+    def bulk(self, request, *args, **kwargs):
+        """
+        Create or update many relations in one request: POST a list of objects
+        with the fields ``correlation``, ``contentnode``, ``kind`` (optional),
+        and ``standardnode`` (hyperlinks), plus the optional ``canonical_uri``,
+        ``source_uri``, ``notes``, and ``extra_fields``. Existing relations with
+        the same correlation, content node, and standard node are updated.
+        Returns the ``results`` for each row (``created``, ``updated``, or the
+        ``errors``); nothing is saved if any row has errors.
+        """
+        if not isinstance(request.data, list):
+            raise ValidationError({'non_field_errors': ['Expected a list of relations.']})
+        results, saved = bulk_upsert_content_standard_relations(
+            request.data, kwargs['jurisdiction_name'], self.get_serializer_context())
+        if not saved:
+            return Response({'results': results}, status=status.HTTP_400_BAD_REQUEST)
+        publishing_context = get_publishing_context(request=request)
+        for result in results:
+            result['uri'] = build_absolute_uri(result['uri'], publishing_context=publishing_context)
+        return Response({'results': results})
+
+
+# RESOLVE
+################################################################################
+
+RESOLVE_MAX_URIS = 1000
+
+
+class ResolveView(APIView):
+    """
+    Resolve many ROC data URIs in one request: POST ``{"uris": [...]}`` with the
+    URIs of any publishing context to get ``{"objects": {uri: data}, "errors":
+    {uri: [message]}}``. The URIs are grouped by the kind of object they point to
+    and each group is fetched with one ``__in`` query (plus its prefetches).
+    """
+    renderer_classes = [FastJSONRenderer]
+
+    def post(self, request, *args, **kwargs):
+        uris = request.data.get('uris') if isinstance(request.data, dict) else None
+        if not isinstance(uris, list) or not all(isinstance(uri, str) for uri in uris):
+            raise ValidationError({'uris': ['Expected a list of URIs.']})
+        if len(uris) > RESOLVE_MAX_URIS:
+            raise ValidationError({'uris': ['At most {} URIs can be resolved at once.'.format(RESOLVE_MAX_URIS)]})
+        publishing_context = get_publishing_context(request=request)
+        objects, errors = {}, {}
+        groups = defaultdict(lambda: defaultdict(list))     # view -> {path: [uri]}
+        for uri in set(uris):
+            path = get_uri_path(uri)
+            try:
+                match = resolve(path)
+            except Resolver404:
+                match = None
+            if match is None or get_hyperlink_field_class(match.view_name) is None:
+                errors[uri] = ['No ROC data object found for this URI.']
+                continue
+            groups[(match.view_name, match.func.cls)][path].append(uri)
+
+        for (view_name, viewset_class), uris_by_path in groups.items():
+            viewset = viewset_class(request=request, format_kwarg=None, kwargs={}, action='retrieve')
+            queryset = viewset.get_profile_queryset()
+            lookups = viewset.get_serializer().prune_related_lookups(queryset._prefetch_related_lookups)
+            queryset = queryset.prefetch_related(None).prefetch_related(*lookups)
+            field = get_hyperlink_field_class(view_name)()
+            objects_by_path, path_errors = resolve_hyperlinks(field, list(uris_by_path), queryset=queryset)
+            for path, path_uri_errors in path_errors.items():
+                for uri in uris_by_path[path]:
+                    errors[uri] = path_uri_errors
+            instances = list({obj.pk: obj for obj in objects_by_path.values()}.values())
+            serializer = viewset.get_serializer(instances, many=True)
+            datas_by_pk = {}
+            for instance, data in zip(instances, serializer.data):
+                datas_by_pk[instance.pk] = viewset.process_uris(data, publishing_context=publishing_context)
+            for path, obj in objects_by_path.items():
+                for uri in uris_by_path[path]:
+                    objects[uri] = datas_by_pk[obj.pk]
+        return Response({'objects': objects, 'errors': errors})
+
+
+
+
+# SEARCH
+################################################################################
+
+class SearchView(APIView):
+    """
+    Full-text search of the standard nodes, content nodes, and terms: GET
+    ``/search?q=<words>`` for the best matches as ``{"q": q, "results": [...]}``.
+    Use ``?kind=standardnode,contentnode,term`` to search only some kinds of
+    objects, and ``?limit=N`` for fewer than the default (and maximum) 50.
+    """
+    renderer_classes = [FastJSONRenderer]
+
+    def get(self, request, *args, **kwargs):
+        q = request.query_params.get('q', '').strip()
+        if not q:
+            raise ValidationError({'q': ['A search query is required.']})
+        kinds = None
+        if request.query_params.get('kind'):
+            kinds = request.query_params['kind'].split(',')
+            if not all(kind in SEARCH_SPECS for kind in kinds):
+                raise ValidationError({'kind': ['Expected any of: {}.'.format(', '.join(SEARCH_SPECS))]})
+        try:
+            limit = _positive_int(request.query_params.get('limit', SEARCH_MAX_RESULTS),
+                                  strict=True, cutoff=SEARCH_MAX_RESULTS)
+        except ValueError:
+            raise ValidationError({'limit': ['A positive integer is required.']})
+        publishing_context = get_publishing_context(request=request)
+        results = []
+        for spec, obj, score in search(q, kinds=kinds, limit=limit):
+            result = {
+                'kind': spec.kind,
+                'uri': build_absolute_uri(obj.get_absolute_url(), publishing_context=publishing_context),
+                'score': score,
+                spec.container: build_absolute_uri(
+                    getattr(obj, spec.container).get_absolute_url(), publishing_context=publishing_context),
+            }
+            for name in spec.field_names:
+                result[name] = getattr(obj, name)
+            results.append(result)
+        return Response({'q': q, 'results': results})
@@ -1,5 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class StandardsConfig(AppConfig):
     name = 'standards'
+
+    def ready(self):
+        import standards.signals  # noqa: F401 (connects the signal receivers)
+        import standards.sqlite  # noqa: F401 (sets up the SQLite connections)
+        from standards.dbindexes import create_postgres_indexes
+        from standards.publishing import get_publishing_contexts
+        from standards.search import create_search_index
+        post_migrate.connect(create_postgres_indexes, sender=self)
+        post_migrate.connect(create_search_index, sender=self)
+        get_publishing_contexts()  # built once at startup and only read by the requests
@@ -0,0 +1,132 @@
+import asyncio
+import contextvars
+import functools
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import FileResponse
+
+
+
+# ASYNC READ VIEWS
+################################################################################
+# Under ASGI, Django 3.1 runs every synchronous view in one thread (the views are
+# "thread sensitive"), so all the requests queue up behind each other. The hot
+# GET endpoints are wrapped in async views that run the same DRF viewset code in
+# a bounded pool of ``ROCDATA_ASYNC_READ_THREADS`` threads instead. A thread is
+# released as soon as the response is rendered, and the event loop sends the
+# response, so slow clients don't hold on to a thread. Other methods go through
+# the usual thread-sensitive path. Enabled with ``ROCDATA_ASYNC_READ_VIEWS``
+# (set in asgi.py), since under WSGI the async views would only add overhead.
+
+READ_METHODS = ("GET", "HEAD")
+
+# the URL names of the endpoints served by async views under ASGI
+ASYNC_READ_URL_NAMES = [
+    "jurisdiction-detail",
+    "jurisdiction-vocabulary-detail",
+    "jurisdiction-vocabulary-term-detail",
+    "jurisdiction-document-detail",
+    "jurisdiction-document-full",
+    "jurisdiction-standardnode-detail",
+    "jurisdiction-standardnode-childrenfragment",
+    "jurisdiction-contentcollection-detail",
+    "jurisdiction-contentcollection-full",
+    "jurisdiction-contentnode-detail",
+    "jurisdiction-contentnode-childrenfragment",
+]
+
+# streamed responses are spooled in memory up to this size, then to a file
+STREAM_SPOOL_MAX_SIZE = 2 * 1024 * 1024
+
+_read_executor = None
+_read_executor_lock = threading.Lock()
+
+
+def get_read_executor():
+    global _read_executor
+    if _read_executor is None:
+        with _read_executor_lock:
+            if _read_executor is None:
+                _read_executor = ThreadPoolExecutor(
+                    max_workers=settings.ROCDATA_ASYNC_READ_THREADS,
+                    thread_name_prefix="roc-read",
+                )
+    return _read_executor
+
+
+def run_read_view(view, request, *args, **kwargs):
+    """
+    Call the synchronous `view` and render its response in a thread of the read
+    pool. Like Django's request handlers, the stale database connections of the
+    thread are closed before and after. Streaming responses are generated here
+    too, since Django 3.1 sends them from the event loop, where queries are not
+    allowed (see ``spool_streaming_response``).
+    """
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response = response.render()
+        if response.streaming:
+            response = spool_streaming_response(response)
+        return response
+    finally:
+        close_old_connections()
+
+
+def spool_streaming_response(response):
+    """
+    Write the content of the streaming `response` chunk by chunk to a temporary
+    file, which is kept in memory up to ``STREAM_SPOOL_MAX_SIZE`` bytes, and
+    return a response that sends the file, with the same status and headers.
+    Unlike joining the content, this keeps the memory use of large streamed
+    documents bounded, and the file is closed with the returned response.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=STREAM_SPOOL_MAX_SIZE)
+    try:
+        for chunk in response:
+            spool.write(chunk)
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    finally:
+        response.close()
+    spooled_response = FileResponse(spool, status=response.status_code)
+    for header, value in response.items():
+        spooled_response[header] = value
+    return spooled_response
+
+
+def async_read_view(view):
+    """
+    Return an async view that runs the GET and HEAD requests of the synchronous
+    `view` in the read pool (see ``run_read_view``).
+    """
+    sync_view = sync_to_async(view)
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in READ_METHODS:
+            return await sync_view(request, *args, **kwargs)
+        loop = asyncio.get_event_loop()
+        call = functools.partial(run_read_view, view, request, *args, **kwargs)
+        # with the context variables of the request, e.g. the read-only database mark
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(get_read_executor(), context.run, call)
+    return wrapper
+
+
+def enable_async_read_views(urlpatterns, url_names=ASYNC_READ_URL_NAMES):
+    """
+    Replace the views of the `urlpatterns` named in `url_names` (including their
+    format suffix variants) with async read views.
+    """
+    for pattern in urlpatterns:
+        if getattr(pattern, 'name', None) in url_names:
+            pattern.callback = async_read_view(pattern.callback)
@@ -0,0 +1,186 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from standards.caching import get_invalidation_tags, invalidate_tags
+from standards.fields import CharIdField
+from standards.models import ContentStandardRelation
+from standards.serializers import ContentStandardRelationBulkSerializer, ContentStandardRelationSerializer
+from standards.serializers import MultiKeyHyperlinkField
+from standards.utils import get_default_content_standard_relation_kind
+
+
+
+# SET-BASED HYPERLINK RESOLUTION
+################################################################################
+
+BULK_QUERY_CHUNK_SIZE = 500     # max number of values in ``__in`` lookups
+
+
+def iter_chunks(values, chunk_size=BULK_QUERY_CHUNK_SIZE):
+    for start in range(0, len(values), chunk_size):
+        yield values[start:start + chunk_size]
+
+
+def resolve_hyperlinks(field, hyperlinks, queryset=None):
+    """
+    Resolve the `hyperlinks` (strings) of the ``MultiKeyHyperlinkField`` `field`
+    to objects using one ``__in`` query per chunk of hyperlinks that share the
+    same leading URL kwargs (e.g. all the nodes of the same jurisdiction), instead
+    of one ``field.get_object`` query per hyperlink. The objects are fetched from
+    `queryset`, by default the field's queryset without prefetches.
+    Returns the dicts ``objects`` and ``errors`` keyed by hyperlink.
+    """
+    objects, errors = {}, {}
+    key_kwarg = list(field.lookup_kwargs_mapping)[-1]   # e.g. id, path
+    groups = defaultdict(lambda: defaultdict(list))
+    for hyperlink in set(hyperlinks):
+        try:
+            lookup_kwargs = field.get_lookup_kwargs(field.parse_hyperlink(hyperlink))
+        except ValidationError as e:
+            errors[hyperlink] = e.detail
+            continue
+        key = lookup_kwargs.pop(key_kwarg)
+        groups[tuple(sorted(lookup_kwargs.items()))][key].append(hyperlink)
+    if queryset is None:
+        queryset = field.get_queryset().prefetch_related(None)
+    for common_kwargs, hyperlinks_by_key in groups.items():
+        for keys in iter_chunks(list(hyperlinks_by_key)):
+            for obj in queryset.filter(**dict(common_kwargs), **{key_kwarg + '__in': keys}):
+                for hyperlink in hyperlinks_by_key.pop(getattr(obj, key_kwarg)):
+                    objects[hyperlink] = obj
+        for missing_hyperlinks in hyperlinks_by_key.values():
+            for hyperlink in missing_hyperlinks:
+                errors[hyperlink] = [field.error_messages['does_not_exist']]
+    return objects, errors
+
+
+
+def get_hyperlink_field_class(view_name):
+    """
+    Return the ``MultiKeyHyperlinkField`` subclass for the URL named `view_name`.
+    """
+    field_classes = [MultiKeyHyperlinkField]
+    while field_classes:
+        field_class = field_classes.pop()
+        if getattr(field_class, 'view_name', None) == view_name:
+            return field_class
+        field_classes.extend(field_class.__subclasses__())
+    return None
+
+
+
+# BULK CREATE
+################################################################################
+
+def bulk_create_objects(model, objs, batch_size=BULK_QUERY_CHUNK_SIZE):
+    """
+    Like ``model.objects.bulk_create(objs)`` but the new ``CharIdField`` ids of
+    the `objs` are allocated in bulk (``CharIdField.pre_save`` would check each
+    id with one query), so ``bulk_create`` runs a few queries per batch.
+    """
+    for field in model._meta.concrete_fields:
+        if isinstance(field, CharIdField):
+            field.assign_values(objs)
+    return model.objects.bulk_create(objs, batch_size=batch_size)
+
+
+
+# CONTENT STANDARD RELATIONS
+################################################################################
+
+CSR_HYPERLINK_FIELDS = ['correlation', 'contentnode', 'kind', 'standardnode']
+CSR_UPDATE_FIELDS = ['kind', 'canonical_uri', 'source_uri', 'notes', 'extra_fields', 'date_modified']
+
+
+def bulk_upsert_content_standard_relations(datas, jurisdiction_name, context):
+    """
+    Create or update the ``ContentStandardRelation`` s for the list of dicts
+    `datas` (as for single relations, but with optional ``kind``) in one
+    transaction. Relations are identified by (correlation, contentnode,
+    standardnode): existing relations get the ``kind`` and the other values of
+    their row. All the referenced objects are resolved in a few queries and the
+    writes use ``bulk_create`` and ``bulk_update``. Nothing is written if any
+    row has errors.
+    Returns the list of per-row results and whether the rows were saved.
+    """
+    row_serializer = ContentStandardRelationBulkSerializer()
+    rows, results = [], []
+    for index, data in enumerate(datas):
+        try:
+            rows.append(row_serializer.run_validation(data))
+            results.append({'index': index, 'status': 'valid', 'errors': {}})
+        except ValidationError as e:
+            rows.append(None)
+            results.append({'index': index, 'status': 'error', 'errors': e.detail})
+
+    hyperlink_fields = ContentStandardRelationSerializer(context=context).fields
+    resolved, hyperlink_errors = {}, {}
+    for name in CSR_HYPERLINK_FIELDS:
+        hyperlinks = [row[name] for row in rows if row is not None and row.get(name) is not None]
+        resolved[name], hyperlink_errors[name] = resolve_hyperlinks(hyperlink_fields[name], hyperlinks)
+
+    default_kind_id = get_default_content_standard_relation_kind()
+    relations, seen_keys = [], set()
+    for row, result in zip(rows, results):
+        if row is None:
+            continue
+        errors, values = result['errors'], dict(row)
+        for name in CSR_HYPERLINK_FIELDS:
+            if row.get(name) is None:
+                values.pop(name, None)          # kind is the only optional hyperlink
+                values[name + '_id'] = default_kind_id
+            elif row[name] in hyperlink_errors[name]:
+                errors[name] = hyperlink_errors[name][row[name]]
+            else:
+                values[name] = resolved[name][row[name]]
+        if not errors and values['correlation'].jurisdiction.name != jurisdiction_name:
+            errors['correlation'] = ['Correlation is not in jurisdiction {}.'.format(jurisdiction_name)]
+        if not errors:
+            key = (values['correlation'].id, values['contentnode'].id, values['standardnode'].id)
+            if key in seen_keys:
+                errors['non_field_errors'] = ['Duplicate relation in batch.']
+            seen_keys.add(key)
+        if errors:
+            result['status'] = 'error'
+        else:
+            del result['errors']
+            relations.append(ContentStandardRelation(**values))
+    if any(result['status'] == 'error' for result in results):
+        return results, False
+
+    with transaction.atomic():
+        existing = {}
+        for correlation_id in set(r.correlation_id for r in relations):
+            contentnode_ids = list(set(r.contentnode_id for r in relations if r.correlation_id == correlation_id))
+            for chunk in iter_chunks(contentnode_ids):
+                for relation in ContentStandardRelation.objects.filter(
+                        correlation_id=correlation_id, contentnode_id__in=chunk):
+                    existing[(relation.correlation_id, relation.contentnode_id, relation.standardnode_id)] = relation
+        now = timezone.now()
+        new_relations, updated_relations = [], []
+        for relation in relations:
+            key = (relation.correlation_id, relation.contentnode_id, relation.standardnode_id)
+            if key in existing:
+                relation.id = existing[key].id
+                relation.date_created = existing[key].date_created
+                relation.date_modified = now
+                updated_relations.append(relation)
+            else:
+                new_relations.append(relation)
+        bulk_create_objects(ContentStandardRelation, new_relations)
+        ContentStandardRelation.objects.bulk_update(updated_relations, CSR_UPDATE_FIELDS, batch_size=BULK_QUERY_CHUNK_SIZE)
+        # bulk writes don't send the model signals
+        tags = set()
+        for relation in relations:
+            tags.update(get_invalidation_tags(relation))
+        invalidate_tags(tags)
+
+    new_ids = set(r.id for r in new_relations)
+    for result, relation in zip(results, relations):
+        result['status'] = 'created' if relation.id in new_ids else 'updated'
+        result['id'] = relation.id
+        result['uri'] = relation.uri
+    return results, True
@@ -0,0 +1,281 @@
+import functools
+import hashlib
+import logging
+import uuid
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from standards.publishing import get_publishing_context
+
+
+logger = logging.getLogger(__name__)
+
+
+
+# RESPONSE CACHE
+################################################################################
+# Responses are cached per request path (incl. query string), format, and
+# publishing context. Each cached response is tagged with the path of the ROC
+# resource it shows (e.g. /Ghana/documents/D123 for the document's detail and
+# /full pages) and the global tag. Every tag has a random "generation" token
+# that is part of the cache keys, so a response is invalidated by setting a
+# new token for one of its tags (see ``invalidate_tags``). The tokens are kept in
+# the cache ``settings.ROCDATA_GENERATION_CACHE``, which must not evict them.
+
+GLOBAL_TAG = "*"                    # invalidates all cached responses
+CACHED_FORMATS = ["json", "html"]   # the browsable API has per-user content
+CACHE_KEY_PREFIX = "roc:"
+
+
+def get_response_cache():
+    """
+    Return the cache used for responses, or None if response caching is off.
+    """
+    alias = getattr(settings, "ROCDATA_RESPONSE_CACHE", None)
+    if alias is None:
+        return None
+    return caches[alias]
+
+
+def get_generation_cache():
+    """
+    Return the cache of the generation tokens of the tags.
+    """
+    return caches[getattr(settings, "ROCDATA_GENERATION_CACHE", None) or "default"]
+
+
+def get_generation_key(tag):
+    return CACHE_KEY_PREFIX + "gen:" + hashlib.md5(tag.encode("utf-8")).hexdigest()
+
+
+def get_generations(tags):
+    """
+    Return the generation tokens of the `tags`, creating the missing ones.
+    """
+    cache = get_generation_cache()
+    keys = [get_generation_key(tag) for tag in tags]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def bump_tags(tags):
+    if get_response_cache() is None:
+        return
+    get_generation_cache().set_many({get_generation_key(tag): uuid.uuid4().hex for tag in tags}, timeout=None)
+
+
+# the tags and the other invalidation functions of ``deferred_invalidation`` blocks
+_deferred = ContextVar("roc_deferred_invalidation", default=None)
+
+
+def invalidate_tags(tags):
+    """
+    Invalidate the cached responses tagged with any of the `tags`. The tags are
+    bumped right away and again after the current transaction commits, since
+    responses cached in between would have been made from the old data. In a
+    ``deferred_invalidation`` block, the tags are only collected.
+    """
+    tags = set(tags)
+    deferred = _deferred.get()
+    if deferred is not None:
+        deferred[0].update(tags)
+        return
+    bump_tags(tags)
+    transaction.on_commit(functools.partial(bump_tags, tags))
+
+
+def defer_invalidation(func):
+    """
+    Defer the call of the invalidation function `func` (e.g. the term index
+    invalidation) to the end of the current ``deferred_invalidation`` block, and
+    return False if there is no such block.
+    """
+    deferred = _deferred.get()
+    if deferred is None:
+        return False
+    deferred[1].add(func)
+    return True
+
+
+@contextmanager
+def deferred_invalidation():
+    """
+    Collect the tags invalidated in this block and invalidate them once at the
+    end, for the management commands that save many objects (the importers).
+    In the block the signal handlers skip the lookups of the saved versions of
+    the objects (see ``standards.signals``), so updates invalidate everything.
+    """
+    deferred = (set(), set())
+    token = _deferred.set(deferred)
+    try:
+        yield
+    finally:
+        _deferred.reset(token)
+        tags, funcs = deferred
+        if tags:
+            invalidate_tags(tags)
+        for func in funcs:
+            func()
+
+
+def is_invalidation_deferred():
+    return _deferred.get() is not None
+
+
+def is_globally_invalidated():
+    """
+    Return True in a ``deferred_invalidation`` block that already invalidates
+    all the cached responses, so no more tags need to be collected.
+    """
+    deferred = _deferred.get()
+    return deferred is not None and GLOBAL_TAG in deferred[0]
+
+
+def get_resource_path(view, request):
+    """
+    Return the path of the ROC resource that the response of `view` shows, which
+    is the request path without the format suffix and the detail action name.
+    """
+    path = request.path_info
+    format_suffix = view.kwargs.get("format")
+    if format_suffix:
+        path = path[:-len(format_suffix) - 1]
+    if view.action not in ("retrieve", "list") and path.endswith("/" + view.action):
+        path = path[:-len(view.action) - 1]
+    return path.rstrip("/") or "/"
+
+
+def get_response_cache_key(view, request):
+    publishing_context = get_publishing_context(request=request)
+    tags = [GLOBAL_TAG, get_resource_path(view, request)]
+    parts = [
+        request.get_full_path(),
+        request.accepted_renderer.format,
+        publishing_context.base_url,
+    ] + get_generations(tags)
+    return CACHE_KEY_PREFIX + "response:" + hashlib.md5("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def cached_response(view_method):
+    """
+    Cache the rendered responses of the GET viewset action `view_method` (with
+    their ETag and Last-Modified validators) so repeated requests are answered
+    without touching the database, until the resource is invalidated.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        cache = get_response_cache()
+        if cache is None or request.method not in ("GET", "HEAD") \
+                or request.accepted_renderer.format not in CACHED_FORMATS:
+            return view_method(self, request, *args, **kwargs)
+        key = get_response_cache_key(self, request)
+        cached = cache.get(key)
+        if cached is not None:
+            return get_cached_response(request, cached)
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code == 200 and hasattr(response, "add_post_render_callback"):
+            def cache_rendered_response(rendered_response):
+                content, compressed = rendered_response.content, False
+                if len(content) >= settings.ROCDATA_RESPONSE_CACHE_COMPRESS_MIN_SIZE:
+                    content, compressed = zlib.compress(content, 1), True
+                max_size = settings.ROCDATA_RESPONSE_CACHE_MAX_SIZE
+                if max_size is not None and len(content) > max_size:
+                    logger.warning("Response of %s not cached: %d bytes (compressed: %s) is over the "
+                                   "ROCDATA_RESPONSE_CACHE_MAX_SIZE of %d bytes",
+                                   request.path, len(content), compressed, max_size)
+                    return
+                cache.set(key, {
+                    "content": content,
+                    "compressed": compressed,
+                    "content_type": rendered_response["Content-Type"],
+                    "etag": rendered_response.get("ETag"),
+                    "last_modified": getattr(self, "response_validators", (None, None))[1],
+                }, timeout=settings.ROCDATA_RESPONSE_CACHE_TIMEOUT)
+            response.add_post_render_callback(cache_rendered_response)
+        return response
+    return wrapper
+
+
+def get_cached_response(request, cached):
+    etag, last_modified = cached["etag"], cached["last_modified"]
+    if etag is not None:
+        not_modified_response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified_response is not None:
+            response = not_modified_response
+        else:
+            response = get_cached_content_response(cached)
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response
+    return get_cached_content_response(cached)
+
+
+def get_cached_content_response(cached):
+    content = cached["content"]
+    if cached.get("compressed"):
+        content = zlib.decompress(content)
+    return HttpResponse(content, content_type=cached["content_type"])
+
+
+
+# INVALIDATION
+################################################################################
+
+# the attributes of the objects whose resources show (links to) an object
+PARENT_RESOURCES = {
+    "ControlledVocabulary": ["jurisdiction"],
+    "Term": ["vocabulary"],
+    "TermRelation": [],
+    "StandardsDocument": ["jurisdiction"],
+    "StandardNode": ["document", "parent"],
+    "StandardsCrosswalk": ["jurisdiction"],
+    "StandardNodeRelation": ["crosswalk"],
+    "ContentCollection": ["jurisdiction"],
+    "ContentNode": ["collection", "parent"],
+    "ContentNodeRelation": [],
+    "ContentCorrelation": ["jurisdiction"],
+    "ContentStandardRelation": ["correlation"],
+}
+
+# objects whose URIs appear in the data of other objects
+REFERENCED_MODELS = ["Jurisdiction", "ControlledVocabulary", "Term"]
+
+
+def get_invalidation_tags(instance):
+    """
+    Return the tags of the cached responses that show data of `instance`: its
+    own resource, the list of its kind, and the resources that contain it and
+    their lists (e.g. the document and the parent node of a standard node).
+    """
+    model_name = type(instance).__name__
+    if model_name == "Jurisdiction":
+        return {GLOBAL_TAG}
+    if model_name not in PARENT_RESOURCES:
+        return set()
+    uri = instance.get_absolute_url()
+    tags = {uri}
+    if model_name != "Term":
+        tags.add(uri.rsplit("/", 1)[0])     # the list, e.g. /Ghana/documents
+    for attr in PARENT_RESOURCES[model_name]:
+        parent = getattr(instance, attr)
+        if parent is not None:
+            parent_uri = parent.get_absolute_url()
+            tags.add(parent_uri)
+            tags.add(parent_uri.rsplit("/", 1)[0] or "/")     # e.g. the jurisdictions list
+    parent = getattr(instance, "parent", None) if "parent" in PARENT_RESOURCES[model_name] else None
+    if parent is not None and parent.parent_id is not None:
+        # the children fragment of the grandparent shows if the parent has children
+        tags.add(uri.rsplit("/", 1)[0] + "/" + parent.parent_id)
+    return tags
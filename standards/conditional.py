@@ -0,0 +1,86 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+
+# CONDITIONAL GET
+################################################################################
+
+def has_date_modified(model):
+    return any(field.name == 'date_modified' for field in model._meta.get_fields())
+
+
+def get_rollup(querysets):
+    """
+    Return the latest ``date_modified`` and the total number of objects in the
+    list of `querysets` (one aggregate query per queryset).
+    """
+    last_modified, count = None, 0
+    for queryset in querysets:
+        result = queryset.order_by().aggregate(last_modified=Max('date_modified'), count=Count('pk'))
+        count += result['count']
+        if result['last_modified'] and (last_modified is None or result['last_modified'] > last_modified):
+            last_modified = result['last_modified']
+    return last_modified, count
+
+
+def get_validators(request, querysets, base_url):
+    """
+    Return the ``(etag, last_modified)`` validators for the response to `request`,
+    whose data comes from the objects in `querysets`. The ETag changes when any
+    of the objects is modified, added, or deleted, and it depends on the request
+    path, query string, format, and publishing context `base_url`.
+    Returns ``(None, None)`` if the `querysets` are empty.
+    """
+    last_modified, count = get_rollup(querysets)
+    return make_validators(request, base_url, last_modified, [str(count)])
+
+
+def get_page_validators(request, page, pagination_context, base_url, querysets=()):
+    """
+    Return the validators for the response to `request` that shows the objects
+    of the list `page` and the `pagination_context` (e.g. the next and previous
+    links), computed from the loaded objects and the rollup of the `querysets`
+    of related objects that appear in the serialized objects of the page (e.g.
+    their children), without a query of the whole list. The ETag changes when
+    the objects on the page, their related objects, or the pagination links change.
+    """
+    dates_modified = [obj.date_modified for obj in page if obj.date_modified is not None]
+    related_last_modified, related_count = get_rollup(querysets)
+    if related_last_modified is not None:
+        dates_modified.append(related_last_modified)
+    last_modified = max(dates_modified) if dates_modified else None
+    version_parts = [str(obj.pk) for obj in page] + [repr(sorted(pagination_context.items())), str(related_count)]
+    return make_validators(request, base_url, last_modified, version_parts)
+
+
+def make_validators(request, base_url, last_modified, version_parts):
+    if last_modified is None:
+        return None, None
+    version = '|'.join([
+        request.get_full_path(),
+        request.accepted_renderer.format,
+        base_url,
+        last_modified.isoformat(),
+    ] + version_parts)
+    etag = quote_etag(hashlib.md5(version.encode('utf-8')).hexdigest())
+    return etag, int(last_modified.timestamp())
+
+
+def get_not_modified_response(request, etag, last_modified):
+    """
+    Return a 304 response if `request` has ``If-None-Match`` or ``If-Modified-Since``
+    headers that match the validators, otherwise None.
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validator_headers(response, etag, last_modified)
+    return response
+
+
+def set_validator_headers(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
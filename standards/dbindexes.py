@@ -0,0 +1,42 @@
+from django.db import connections
+
+
+
+# POSTGRESQL INDEXES
+################################################################################
+# The migrations are generated from the models (see ``fab reset_and_migrate``),
+# so they include the indexes declared in the models, e.g. the (tree_id, lft)
+# index that django-mptt adds to the ``index_together`` of both node models.
+# The indexes below only exist in PostgreSQL (SQLite has no operator classes
+# or GIN indexes), so they are created after ``./manage.py migrate`` instead,
+# which keeps the models and the migrations usable with both backends.
+
+POSTGRES_INDEXES = {
+    # prefix queries like Term.objects.filter(path__startswith=...) use LIKE 'x%'
+    # which can't use the default btree index unless the collation is "C"
+    "standards_term_path_pattern": "ON standards_term (path text_pattern_ops)",
+    # containment queries like .filter(extra_fields__contains={...})
+    "standards_term_extra_fields_gin":
+        "ON standards_term USING gin (extra_fields jsonb_path_ops)",
+    "standards_standardsdocument_extra_fields_gin":
+        "ON standards_standardsdocument USING gin (extra_fields jsonb_path_ops)",
+    "standards_standardnode_extra_fields_gin":
+        "ON standards_standardnode USING gin (extra_fields jsonb_path_ops)",
+    "standards_contentcollection_extra_fields_gin":
+        "ON standards_contentcollection USING gin (extra_fields jsonb_path_ops)",
+    "standards_contentnode_extra_fields_gin":
+        "ON standards_contentnode USING gin (extra_fields jsonb_path_ops)",
+}
+
+
+def create_postgres_indexes(using="default", **kwargs):
+    """
+    Create the missing ``POSTGRES_INDEXES`` in the database `using` if it is a
+    PostgreSQL database (connected to the ``post_migrate`` signal).
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        for name, definition in POSTGRES_INDEXES.items():
+            cursor.execute("CREATE INDEX IF NOT EXISTS {} {}".format(name, definition))
@@ -0,0 +1,213 @@
+import gzip
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Count, Max
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.urls import resolve
+
+from standards.models import Jurisdiction, ControlledVocabulary, Term, TermRelation
+from standards.models import StandardsDocument, StandardNode, StandardsCrosswalk, StandardNodeRelation
+from standards.models import ContentCollection, ContentNode, ContentNodeRelation
+from standards.models import ContentCorrelation, ContentStandardRelation
+
+
+
+# STATIC SITE EXPORT
+################################################################################
+# The static site generator mode of ``./manage.py exportsite``: the detail
+# endpoints of all the ROC resources are rendered in the ``EXPORT_FORMATS`` with
+# a fixed publishing context and written to files named after the resource paths
+# (e.g. /Ghana/documents/D123 -> Ghana/documents/D123.json), with precompressed
+# ``.gz`` siblings. The export manifest records the version of each resource, so
+# an incremental export only renders the resources whose data changed.
+
+EXPORT_FORMATS = ["json", "html"]
+EXPORT_HOST = "localhost"               # any of the ALLOWED_HOSTS; URIs and hyperlinks come from the publishing context
+MANIFEST_FILENAME = ".exportmanifest.json"
+
+
+class ExportSpec:
+    """
+    How to export the objects of one model: the ``select_related`` lookups used
+    to build their paths, the reverse relation whose objects are shown on their
+    detail pages (e.g. the nodes of a document), and the extra ``actions`` whose
+    JSON responses are exported (e.g. ``full`` for /Ghana/documents/D123/full).
+    """
+
+    def __init__(self, model, select_related=(), rollup_relation=None, actions=()):
+        self.model = model
+        self.select_related = select_related
+        self.rollup_relation = rollup_relation
+        self.actions = actions
+
+    def get_queryset(self):
+        queryset = self.model._base_manager.select_related(*self.select_related).order_by()
+        if self.rollup_relation:
+            queryset = queryset.annotate(
+                rollup_modified=Max(self.rollup_relation + '__date_modified'),
+                rollup_count=Count(self.rollup_relation),
+            )
+        return queryset
+
+    def get_version(self, obj):
+        """
+        Return a string that changes when the detail pages of `obj` change, or
+        None if that can't be known (models without ``date_modified``).
+        """
+        date_modified = getattr(obj, 'date_modified', None)
+        if date_modified is None:
+            return None
+        version = date_modified.isoformat()
+        if self.rollup_relation:
+            rollup_modified = obj.rollup_modified.isoformat() if obj.rollup_modified else ''
+            version += '|' + rollup_modified + '|' + str(obj.rollup_count)
+        return version
+
+
+EXPORT_SPECS = [
+    ExportSpec(Jurisdiction),
+    ExportSpec(ControlledVocabulary, ['jurisdiction'], 'terms'),
+    ExportSpec(Term, ['vocabulary__jurisdiction']),
+    ExportSpec(TermRelation, ['jurisdiction']),
+    ExportSpec(StandardsDocument, ['jurisdiction'], 'standardnodes', actions=['full']),
+    ExportSpec(StandardNode, ['document__jurisdiction'], 'children'),
+    ExportSpec(StandardsCrosswalk, ['jurisdiction']),
+    ExportSpec(StandardNodeRelation, ['crosswalk__jurisdiction']),
+    ExportSpec(ContentCollection, ['jurisdiction'], 'contentnodes', actions=['full']),
+    ExportSpec(ContentNode, ['collection__jurisdiction'], 'children'),
+    ExportSpec(ContentNodeRelation, ['jurisdiction']),
+    ExportSpec(ContentCorrelation, ['jurisdiction']),
+    ExportSpec(ContentStandardRelation, ['correlation__jurisdiction']),
+]
+
+
+def get_terms_digest():
+    """
+    Return a digest of the paths of all the terms and jurisdictions. The URIs of
+    these appear in the data of most resources, so when it changes everything
+    needs to be exported again.
+    """
+    digest = hashlib.md5()
+    for name in Jurisdiction._base_manager.order_by('name').values_list('name', flat=True):
+        digest.update(name.encode('utf-8') + b'\n')
+    for term in Term._base_manager.select_related('vocabulary__jurisdiction').order_by('id').iterator():
+        digest.update((str(term.id) + ' ' + term.get_absolute_url()).encode('utf-8') + b'\n')
+    return digest.hexdigest()
+
+
+def get_export_resources():
+    """
+    Return a dict {path: version} of all the ROC resources to export, where the
+    paths of the extra actions (e.g. /Ghana/documents/D123/full) are included.
+    """
+    resources = {}
+    for spec in EXPORT_SPECS:
+        for obj in spec.get_queryset().iterator():
+            path = obj.get_absolute_url()
+            version = spec.get_version(obj)
+            resources[path] = version
+            for action in spec.actions:
+                resources[path + '/' + action] = version
+    return resources
+
+
+def get_changed_resources(resources, manifest):
+    """
+    Return the paths of the `resources` (see ``get_export_resources``) that
+    changed since the export of the `manifest`, and the paths of the exported
+    resources that no longer exist.
+    """
+    old_resources = manifest['resources']
+    changed_paths = [
+        path for path, version in resources.items()
+        if version is None or old_resources.get(path) != version
+    ]
+    removed_paths = [path for path in old_resources if path not in resources]
+    return changed_paths, removed_paths
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILENAME)) as manifest_file:
+            return json.load(manifest_file)
+    except FileNotFoundError:
+        return None
+
+
+def save_manifest(output_dir, manifest):
+    with open(os.path.join(output_dir, MANIFEST_FILENAME), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+
+
+def get_export_files(output_dir, path):
+    """
+    Return the list of ``(format, filename)`` of the files written for the
+    resource `path` (each also gets a ``.gz`` sibling). Only the JSON of the
+    extra actions is exported, since their HTML pages load more data from the
+    server (see the ``childrenfragment`` action).
+    """
+    action = path.rsplit('/', 1)[-1]
+    formats = ['json'] if action == 'full' else EXPORT_FORMATS
+    filename = os.path.join(output_dir, path.lstrip('/'))
+    return [(format_suffix, filename + '.' + format_suffix) for format_suffix in formats]
+
+
+def render_resource(path, format_suffix, host=EXPORT_HOST, secure=False):
+    """
+    Return the content of the response of the API for the resource `path` in
+    the format `format_suffix`, rendered without the middleware. The `host` and
+    `secure` matter only for the ``default`` publishing context.
+    """
+    url = path + '.' + format_suffix
+    request = RequestFactory().get(url, HTTP_HOST=host, secure=secure)
+    request.user = AnonymousUser()
+    request.resolver_match = match = resolve(url)
+    response = match.func(request, *match.args, **match.kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    if response.status_code != 200:
+        raise ValueError('Exporting {} failed with status {}'.format(url, response.status_code))
+    return response.content
+
+
+def write_file(filename, content):
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open(filename, 'wb') as exported_file:
+        exported_file.write(content)
+    with open(filename + '.gz', 'wb') as compressed_file:
+        compressed_file.write(gzip.compress(content, mtime=0))
+
+
+def export_resources(output_dir, paths, context_name):
+    """
+    Render and write the files of the resources `paths` in the publishing
+    context `context_name`. The response cache is not used, since the exported
+    responses would fill it up.
+    """
+    with override_settings(ROCDATA_PUBLISHING_CONTEXT=context_name, ROCDATA_RESPONSE_CACHE=None):
+        for path in paths:
+            for format_suffix, filename in get_export_files(output_dir, path):
+                write_file(filename, render_resource(path, format_suffix))
+    return len(paths)
+
+
+def remove_resource_files(output_dir, path):
+    for _, filename in get_export_files(output_dir, path):
+        for name in [filename, filename + '.gz']:
+            if os.path.exists(name):
+                os.remove(name)
+
+
+def get_publishing_context_name(context_name=None):
+    context_name = context_name or settings.ROCDATA_PUBLISHING_CONTEXT
+    if context_name not in settings.ROCDATA_PUBLISHING_CONTEXTS:
+        raise ValueError('Unknown publishing context ' + context_name)
+    if context_name == 'default':
+        raise ValueError('The default publishing context takes the hostname from requests, '
+                         'static exports need one of the other publishing contexts')
+    return context_name
@@ -0,0 +1,205 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.db.models import Count
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from standards.caching import CACHE_KEY_PREFIX, GLOBAL_TAG
+from standards.caching import get_generations, get_resource_path, get_response_cache
+from standards.models import Term
+from standards.publishing import build_absolute_uri, get_uri_path
+from standards.termindex import get_term_index
+
+
+
+# FACETS
+################################################################################
+# The standard node and content node lists can be filtered by the facets of
+# their viewset, e.g. /Ghana/standardnodes?subjects=<term URI>&education_levels=
+# <term URI>, and their ``facets`` action has the number of nodes for each value
+# of each facet among the filtered nodes. A facet has values from one query param
+# (repeated params match any of the values), and the filters of all the facets
+# must match. The counts are computed with one grouped query per facet (over the
+# through table for many-to-many fields) and cached in the response cache until
+# the nodes of the jurisdiction change.
+
+class Facet:
+    """
+    A facet of the field `name` with the values of the `lookup` (defaults to the
+    `name`). The counts also change with the ``resource`` lists of `resources`
+    of the jurisdiction (e.g. "documents" for lookups of the document fields).
+    """
+    is_term = False
+
+    def __init__(self, name, lookup=None, resources=()):
+        self.name = name
+        self.lookup = lookup or name
+        self.resources = resources
+
+    def filter(self, queryset, values):
+        return queryset.filter(**{self.lookup + '__in': values})
+
+    def get_counts(self, queryset):
+        rows = queryset.order_by().values_list(self.lookup).annotate(count=Count('pk'))
+        return [(value, count) for value, count in rows if value not in (None, '')]
+
+
+class TermFacet(Facet):
+    """
+    A facet of the ``Term`` foreign key `name` (e.g. ``kind``). The values are
+    the term ids, and the query params can be term URIs or ids.
+    """
+    is_term = True
+
+    def __init__(self, name, resources=()):
+        super().__init__(name, name + '_id', resources=resources)
+
+
+class TermsFacet(TermFacet):
+    """
+    A facet of the many-to-many field `name` to ``Term`` (e.g. ``subjects``).
+    """
+    def get_through_lookups(self, model):
+        field = model._meta.get_field(self.name)
+        return field.remote_field.through, field.m2m_column_name(), field.m2m_reverse_name()
+
+    def filter(self, queryset, values):
+        through, node_column, term_column = self.get_through_lookups(queryset.model)
+        node_ids = through.objects.filter(**{term_column + '__in': values}).values(node_column)
+        return queryset.filter(pk__in=node_ids)
+
+    def get_counts(self, queryset):
+        through, node_column, term_column = self.get_through_lookups(queryset.model)
+        rows = through.objects.filter(**{node_column + '__in': queryset.order_by().values('pk')}) \
+            .values_list(term_column).annotate(count=Count('pk')).order_by()
+        return list(rows)
+
+
+STANDARD_NODE_FACETS = [
+    TermsFacet('subjects'),
+    TermsFacet('education_levels'),
+    TermFacet('kind'),
+    Facet('language'),
+    Facet('publication_status', 'document__publication_status', resources=['documents']),
+]
+
+CONTENT_NODE_FACETS = [
+    TermsFacet('subjects'),
+    TermsFacet('education_levels'),
+    TermFacet('kind'),
+    Facet('language'),
+    Facet('publication_status'),
+]
+
+
+def get_term_id(value, index):
+    """
+    Return the id of the term with the URI (from any publishing context) or id
+    `value`, or None if there is no such term.
+    """
+    if '/' not in value:
+        return value if index.get_key(value) is not None else None
+    parts = get_uri_path(value).split('/', 4)
+    if len(parts) != 5 or parts[2] != 'terms':
+        return None
+    return index.get_id(parts[1], parts[3], parts[4])
+
+
+def get_facet_filters(request, facets):
+    """
+    Return a dict of the values of the `facets` in the query params of `request`
+    (term URIs are replaced by term ids), raising ``ValidationError`` for terms
+    that don't exist.
+    """
+    filters = {}
+    for facet in facets:
+        values = [value for value in request.query_params.getlist(facet.name) if value]
+        if not values:
+            continue
+        if facet.is_term:
+            index = get_term_index(request)
+            term_ids = [get_term_id(value, index) for value in values]
+            if None in term_ids:
+                raise ValidationError({facet.name: ['No term found for this URI.']})
+            values = term_ids
+        filters[facet.name] = values
+    return filters
+
+
+class FacetFilterBackend(BaseFilterBackend):
+    """
+    Filter the list of nodes by the values of the ``facet_fields`` of the view.
+    """
+    def filter_queryset(self, request, queryset, view):
+        if view.action != 'list' and view.action != 'facets':
+            return queryset
+        filters = get_facet_filters(request, view.facet_fields)
+        for facet in view.facet_fields:
+            if facet.name in filters:
+                queryset = facet.filter(queryset, filters[facet.name])
+        return queryset
+
+
+def get_facet_counts_cache_key(view, request, filters):
+    tags = [GLOBAL_TAG, get_resource_path(view, request)]
+    for facet in view.facet_fields:
+        tags += ['/' + view.kwargs['jurisdiction_name'] + '/' + resource for resource in facet.resources]
+    filters_json = json.dumps(sorted((name, sorted(values)) for name, values in filters.items()))
+    parts = [get_resource_path(view, request), filters_json] + get_generations(tags)
+    return CACHE_KEY_PREFIX + "facets:" + hashlib.md5("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def get_facet_counts(view, request, queryset):
+    """
+    Return the number of nodes in the filtered `queryset` of `view` and a dict
+    of the ``(value, count)`` pairs of each facet, from the response cache if
+    it's up to date.
+    """
+    cache = get_response_cache()
+    if cache is not None:
+        key = get_facet_counts_cache_key(view, request, get_facet_filters(request, view.facet_fields))
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    counts = (
+        queryset.count(),
+        {facet.name: facet.get_counts(queryset) for facet in view.facet_fields},
+    )
+    if cache is not None:
+        cache.set(key, counts, timeout=settings.ROCDATA_RESPONSE_CACHE_TIMEOUT)
+    return counts
+
+
+def get_facets_data(view, request, queryset, publishing_context):
+    """
+    Return the data of the ``facets`` action: the ``count`` of the filtered
+    nodes and the values of each facet with their ``count``, in the order of
+    decreasing counts. The values of term facets are term URIs with a ``label``.
+    """
+    count, facet_counts = get_facet_counts(view, request, queryset)
+    index = get_term_index(request)
+    term_ids = set()
+    for facet in view.facet_fields:
+        if facet.is_term:
+            term_ids.update(value for value, value_count in facet_counts[facet.name])
+    labels = dict(Term.objects.filter(pk__in=term_ids).values_list('id', 'label')) if term_ids else {}
+    facets_data = {}
+    for facet in view.facet_fields:
+        values_data = []
+        for value, value_count in sorted(facet_counts[facet.name], key=lambda pair: (-pair[1], pair[0])):
+            if facet.is_term:
+                key = index.get_key(value)
+                if key is None:
+                    continue
+                path = '/' + key[0] + '/terms/' + key[1] + '/' + key[2]
+                values_data.append({
+                    'value': build_absolute_uri(path, publishing_context=publishing_context),
+                    'label': labels.get(value),
+                    'count': value_count,
+                })
+            else:
+                values_data.append({'value': value, 'count': value_count})
+        facets_data[facet.name] = values_data
+    return {'count': count, 'facets': facets_data}
@@ -13,6 +13,9 @@ from django_extensions.db.fields import UniqueFieldMixin, MAX_UNIQUE_QUERY_ATTEM
 # RANDOM STRING ID MODEL FIELD
 ################################################################################
 
+ALLOCATE_QUERY_CHUNK_SIZE = 500     # max number of values in ``__in`` lookups
+
+
 class CharIdField(UniqueFieldMixin, models.CharField):
     """
     A random character field that is used as primary key for ROC data models.
@@ -45,6 +48,9 @@ class CharIdField(UniqueFieldMixin, models.CharField):
 
         super().__init__(*args, **kwargs)
 
+    def new_random_value(self):
+        return self.prefix + get_random_string(self.length - len(self.prefix), self.ALPHABET)
+
     def random_char_generator(self, chars):
         for i in range(self.max_unique_query_attempts):
             len_random_chars = self.length - len(self.prefix)
@@ -81,6 +87,44 @@ class CharIdField(UniqueFieldMixin, models.CharField):
             random_chars,
         )
 
+    def allocate_values(self, count, chunk_size=ALLOCATE_QUERY_CHUNK_SIZE):
+        """
+        Return a list of `count` new random values for this field. Collisions with
+        existing rows are checked with one ``__in`` query per chunk of candidates,
+        and only the colliding candidates are replaced in the next round.
+        """
+        values = set()
+        for attempt in range(self.max_unique_query_attempts):
+            candidates = set()
+            while len(candidates) < count - len(values):
+                candidate = self.new_random_value()
+                if candidate not in values:
+                    candidates.add(candidate)
+            if self.unique:
+                candidates_list = list(candidates)
+                for start in range(0, len(candidates_list), chunk_size):
+                    chunk = candidates_list[start:start + chunk_size]
+                    taken = self.model._base_manager.filter(**{self.attname + '__in': chunk})
+                    candidates.difference_update(taken.values_list(self.attname, flat=True))
+            values.update(candidates)
+            if len(values) == count:
+                return list(values)
+        raise RuntimeError('max random character attempts exceeded (%s)' % self.max_unique_query_attempts)
+
+    def assign_values(self, model_instances):
+        """
+        Set new values on the unsaved `model_instances` that don't have one, as
+        ``pre_save`` would do one instance (and one query) at a time. Call this
+        before ``bulk_create`` to allocate all the values in a few queries.
+        """
+        missing = [
+            instance for instance in model_instances
+            if getattr(instance, self.attname) == ''
+            or (getattr(instance, self.attname) is None and not self.null)
+        ]
+        for instance, value in zip(missing, self.allocate_values(len(missing))):
+            setattr(instance, self.attname, value)
+
     def deconstruct(self):
         name, path, args, kwargs = super().deconstruct()
         kwargs['length'] = self.length
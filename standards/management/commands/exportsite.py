@@ -0,0 +1,74 @@
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from standards.exporting import export_resources, get_changed_resources, get_export_resources
+from standards.exporting import get_publishing_context_name, get_terms_digest
+from standards.exporting import load_manifest, remove_resource_files, save_manifest
+
+
+EXPORT_CHUNK_SIZE = 200     # resources per task sent to the worker processes
+
+
+class Command(BaseCommand):
+    """
+    Export all the ROC resources as static .json and .html files (static site
+    generator mode) for the publishing context `--context`.
+    """
+    def add_arguments(self, parser):
+        parser.add_argument("output_dir", help="The directory to write the files to (served at the path_prefix).")
+        parser.add_argument("--context", help="The publishing context (defaults to ROCDATA_PUBLISHING_CONTEXT).")
+        parser.add_argument("--processes", type=int, default=os.cpu_count(), help="Number of worker processes.")
+        parser.add_argument(
+            "--incremental", action='store_true',
+            help="Export only the resources that changed since the last export to output_dir."
+        )
+
+
+    def handle(self, *args, **options):
+        output_dir = options['output_dir']
+        try:
+            context_name = get_publishing_context_name(options['context'])
+        except ValueError as e:
+            print('ERROR:', e)
+            sys.exit(-9)
+        os.makedirs(output_dir, exist_ok=True)
+
+        resources = get_export_resources()
+        terms_digest = get_terms_digest()
+        manifest = load_manifest(output_dir)
+        if options['incremental'] and manifest is not None \
+                and manifest['publishing_context'] == context_name and manifest['terms_digest'] == terms_digest:
+            paths, removed_paths = get_changed_resources(resources, manifest)
+        else:
+            paths = list(resources)
+            removed_paths = []
+        print('Exporting', len(paths), 'of', len(resources), 'resources to', output_dir,
+              'in the publishing context', context_name)
+
+        for path in removed_paths:
+            remove_resource_files(output_dir, path)
+        chunks = [paths[i:i + EXPORT_CHUNK_SIZE] for i in range(0, len(paths), EXPORT_CHUNK_SIZE)]
+        if options['processes'] > 1 and len(chunks) > 1:
+            # the forked workers must open their own database connections
+            connections.close_all()
+            mp_context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=options['processes'], mp_context=mp_context) as executor:
+                futures = [executor.submit(export_resources, output_dir, chunk, context_name) for chunk in chunks]
+                for future in futures:
+                    future.result()
+        else:
+            for chunk in chunks:
+                export_resources(output_dir, chunk, context_name)
+
+        save_manifest(output_dir, {
+            'publishing_context': context_name,
+            'terms_digest': terms_digest,
+            'resources': resources,
+        })
+        print('Removed', len(removed_paths), 'resources')
+        print('DONE')
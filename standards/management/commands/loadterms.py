@@ -7,8 +7,11 @@ import pycountry
 import requests
 import yaml
 
+from standards.bulk import bulk_create_objects
+from standards.caching import deferred_invalidation, get_invalidation_tags, invalidate_tags
 from standards.models import Jurisdiction, ControlledVocabulary, Term, TermRelation
-from standards.utils import ensure_language_code
+from standards.termindex import invalidate_term_index
+from standards.utils import DefaultTerm, ensure_language_code
 
 
 class Command(BaseCommand):
@@ -73,60 +76,60 @@ class Command(BaseCommand):
             print('Created vocab:', vocab)
 
         print('Adding', len(termsdata['terms']), 'terms to vocab', vocab.name, '...')
+        terms = []
         for idxi, term_dict in enumerate(termsdata['terms']):
             term_path = term_dict['term'].strip()
-            label = term_dict.get('label') or term_path
-            term_language_raw = term_dict.get('language', None)
-            if term_language_raw:
-                term_language = ensure_language_code(term_language_raw)
-            else:
-                term_language = vocab_language
-            term = Term(
-                path=term_path,                        # TODO: check if URL-safe
-                label=label,
-                vocabulary=vocab,
-                sort_order=float(idxi+1),
-                language=term_language,
-            )
-            OPTIONAL_ATTRS = ['definition', 'notes', 'alt_label', 'hidden_label', 'source_uri']
-            for attr in OPTIONAL_ATTRS:
-                val = term_dict.get(attr)
-                if val:
-                    setattr(term, attr, val)
-            term.save()
+            terms.append(self.build_term(term_dict, term_path, vocab, idxi, vocab_language))
 
             if 'children' in term_dict:
                 for idxj, subterm_dict in enumerate(term_dict['children']):
                     subterm_path = term_path + '/' + subterm_dict['term'].strip()
-                    subterm_label = subterm_dict.get('label') or subterm_dict['term'].strip()
-                    subterm_language_raw = subterm_dict.get('language', None)
-                    if subterm_language_raw:
-                        subterm_language = ensure_language_code(subterm_language_raw)
-                    else:
-                        subterm_language = vocab_language
-                    subterm = Term(
-                        path=subterm_path,             # TODO: check if URL-safe
-                        label=subterm_label,
-                        vocabulary=vocab,
-                        sort_order=float(idxj+1),
-                        language=subterm_language,
-                    )
-                    OPTIONAL_ATTRS = ['definition', 'notes', 'alt_label', 'hidden_label', 'source_uri']
-                    for attr in OPTIONAL_ATTRS:
-                        val = subterm_dict.get(attr)
-                        if val:
-                            setattr(subterm, attr, val)
-                    subterm.save()
+                    subterm = self.build_term(subterm_dict, subterm_path, vocab, idxj, vocab_language)
+                    subterm.label = subterm_dict.get('label') or subterm_dict['term'].strip()
+                    terms.append(subterm)
 
                     if 'children' in subterm_dict:
                         raise NotImplementedError('Loading deeply nexted vocabularies not supported yet.')
 
+        # insert the terms with a few queries; bulk_create doesn't send the
+        # model signals, so the cached responses and the term index are
+        # invalidated here
+        bulk_create_objects(Term, terms)
+        tags = set()
+        for term in terms:
+            tags.update(get_invalidation_tags(term))
+        invalidate_tags(tags)
+        invalidate_term_index()
+        DefaultTerm.reset_all()
 
         print('DONE')
 
         # TODO: check termsdata.get('uri') maches vocab.uri
 
 
+    def build_term(self, term_dict, term_path, vocab, idx, vocab_language):
+        """
+        Return a new unsaved Term for the `term_dict` at position `idx`.
+        """
+        term_language_raw = term_dict.get('language', None)
+        if term_language_raw:
+            term_language = ensure_language_code(term_language_raw)
+        else:
+            term_language = vocab_language
+        term = Term(
+            path=term_path,                        # TODO: check if URL-safe
+            label=term_dict.get('label') or term_path,
+            vocabulary=vocab,
+            sort_order=float(idx+1),
+            language=term_language,
+        )
+        OPTIONAL_ATTRS = ['definition', 'notes', 'alt_label', 'hidden_label', 'source_uri']
+        for attr in OPTIONAL_ATTRS:
+            val = term_dict.get(attr)
+            if val:
+                setattr(term, attr, val)
+        return term
+
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -160,4 +163,6 @@ class Command(BaseCommand):
             print('ERROR: no data can available at', path)
             sys.exit(-3)
 
-        self.load_terms_data(termsdata, options)
+        # the cached responses and the term index are invalidated once at the end
+        with deferred_invalidation():
+            self.load_terms_data(termsdata, options)
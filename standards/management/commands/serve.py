@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+
+from standards.warmup import warm_up
+
+
+def build_application(options, load):
+    """
+    Return a gunicorn application with the config `options` that serves the WSGI
+    application returned by `load` (gunicorn is only needed for production).
+    """
+    from gunicorn.app.base import BaseApplication
+
+    class PreloadedApplication(BaseApplication):
+
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return load()
+
+    return PreloadedApplication()
+
+
+class Command(BaseCommand):
+    """
+    Serve the ROC server in production: the Django app is loaded and warmed up
+    (see ``standards.warmup``) in the gunicorn master process, which then forks
+    the worker processes, so they start with the loaded code and data. SIGTERM
+    stops the server gracefully (the workers finish their current requests).
+    """
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", default="0.0.0.0:8000", help="The address to listen on.")
+        parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes.")
+        parser.add_argument("--threads", type=int, default=4, help="Number of threads per worker.")
+        parser.add_argument("--timeout", type=int, default=120, help="Seconds before a silent worker is restarted.")
+        parser.add_argument(
+            "--graceful-timeout", type=int, default=30,
+            help="Seconds that workers get to finish their requests on shutdown."
+        )
+        parser.add_argument(
+            "--warmup-url", default="http://localhost:8000",
+            help="The base URL of the warmed up responses (matters for the default publishing context)."
+        )
+        parser.add_argument("--warmup-limit", type=int, default=20, help="Number of documents and collections to warm up.")
+        parser.add_argument("--no-warmup", action='store_true', help="Start without warming up the caches.")
+
+
+    def load_application(self, options):
+        application = get_wsgi_application()
+        if not options['no_warmup']:
+            start = time.perf_counter()
+            count = warm_up(options['warmup_url'], limit=options['warmup_limit'])
+            print('Warmed up', count, 'responses in', round(time.perf_counter() - start, 1), 'seconds')
+        # the forked workers must open their own database connections
+        connections.close_all()
+        return application
+
+
+    def handle(self, *args, **options):
+        try:
+            import gunicorn  # noqa: F401
+        except ImportError:
+            print('ERROR: gunicorn is required to serve (see requirements.txt)')
+            sys.exit(-10)
+        if settings.DEBUG:
+            print('WARNING: DEBUG is on; set DJANGO_DEBUG=false in production')
+        gunicorn_options = {
+            "bind": options['bind'],
+            "workers": options['workers'],
+            "threads": options['threads'],
+            "worker_class": "gthread" if options['threads'] > 1 else "sync",
+            "timeout": options['timeout'],
+            "graceful_timeout": options['graceful_timeout'],
+            "preload_app": True,
+            "accesslog": "-",
+        }
+        build_application(gunicorn_options, lambda: self.load_application(options)).run()
@@ -4,11 +4,14 @@ from django.db.models import CharField
 from django.db.models import DateTimeField
 from django.db.models import FloatField
 from django.db.models import ForeignKey
+from django.db.models import Index
 from django.db.models import IntegerField
 from django.db.models import JSONField
 from django.db.models import Manager
 from django.db.models import ManyToManyField
 from django.db.models import Model
+from django.db.models import Prefetch
+from django.db.models import QuerySet
 from django.db.models import SET_NULL
 from django.db.models import TextField
 from django.db.models import URLField
@@ -109,7 +112,8 @@ class ContentCollection(Model):
 
     @property
     def root(self):
-        return ContentNode.objects.get(level=0, collection=self)
+        children = Prefetch("children", queryset=ContentNode.objects.minimal())
+        return ContentNode.objects.prefetch_related(children).get(level=0, collection=self)
 
     def get_children(self):
         self.root.get_children()
@@ -117,19 +121,39 @@ class ContentCollection(Model):
 
 
 
-class ContentNodeManager(Manager):
-    def get_queryset(self):
-        return super(ContentNodeManager, self).get_queryset().prefetch_related(
+class ContentNodeQuerySet(QuerySet):
+    """
+    Named loading profiles of content nodes. The default manager adds no related
+    lookups, so each view or command picks the profile for the data it reads.
+    The ``/full`` trees are loaded with the ``tree_*`` lookups of the full node
+    serializers instead (see ``standards.trees.load_tree``).
+    """
+
+    def minimal(self):
+        """Enough to build the URIs of the nodes."""
+        return self.select_related("collection__jurisdiction")
+
+    def for_list(self):
+        """All the data shown by ``ContentNodeSerializer``."""
+        return self.select_related(
             "collection__jurisdiction",
-            "collection",
-            "parent",
-            "kind",
-            "children",
+            "parent__collection__jurisdiction",
+        ).prefetch_related(
+            Prefetch("children", queryset=self.model.objects.minimal()),
             "subjects",
             "education_levels",
             "concept_terms",
         )
 
+    def for_detail(self):
+        """Same as the list items."""
+        return self.for_list()
+
+
+class ContentNodeManager(Manager.from_queryset(ContentNodeQuerySet)):
+    pass
+
+
 class ContentNode(MPTTModel):
     """
     A class that represents individual content items (learning resources) within
@@ -195,6 +219,13 @@ class ContentNode(MPTTModel):
                 condition=Q(level=0),
             )
         ]
+        indexes = [
+            # django-mptt adds this index to index_together, but not to the migrations
+            Index(name="contentnode_tree_lft", fields=["tree_id", "lft"]),
+            # for the facet filters
+            Index(name="contentnode_language", fields=["language"]),
+            Index(name="contentnode_pub_status", fields=["publication_status"]),
+        ]
         ordering = ('sort_order', )
 
     class MPTTMeta:
@@ -4,10 +4,13 @@ from django.db.models import DateField
 from django.db.models import DateTimeField
 from django.db.models import FloatField
 from django.db.models import ForeignKey
+from django.db.models import Index
 from django.db.models import JSONField
 from django.db.models import Manager
 from django.db.models import ManyToManyField
 from django.db.models import Model
+from django.db.models import Prefetch
+from django.db.models import QuerySet
 from django.db.models import SET_NULL
 from django.db.models import TextField
 from django.db.models import URLField
@@ -103,7 +106,8 @@ class StandardsDocument(Model):
 
     @property
     def root(self):
-        return StandardNode.objects.get(level=0, document=self)
+        children = Prefetch("children", queryset=StandardNode.objects.minimal())
+        return StandardNode.objects.prefetch_related(children).get(level=0, document=self)
 
 
     def get_children(self):
@@ -111,19 +115,39 @@ class StandardsDocument(Model):
 
 
 
-class StandardNodeManager(Manager):
-    def get_queryset(self):
-        return super(StandardNodeManager, self).get_queryset().prefetch_related(
+class StandardNodeQuerySet(QuerySet):
+    """
+    Named loading profiles of standard nodes. The default manager adds no related
+    lookups, so each view or command picks the profile for the data it reads.
+    The ``/full`` trees are loaded with the ``tree_*`` lookups of the full node
+    serializers instead (see ``standards.trees.load_tree``).
+    """
+
+    def minimal(self):
+        """Enough to build the URIs of the nodes."""
+        return self.select_related("document__jurisdiction")
+
+    def for_list(self):
+        """All the data shown by ``StandardNodeSerializer``."""
+        return self.select_related(
             "document__jurisdiction",
-            "document",
-            "parent",
-            "kind",
-            "children",
+            "parent__document__jurisdiction",
+        ).prefetch_related(
+            Prefetch("children", queryset=self.model.objects.minimal()),
             "subjects",
             "education_levels",
             "concept_terms",
         )
 
+    def for_detail(self):
+        """Same as the list items."""
+        return self.for_list()
+
+
+class StandardNodeManager(Manager.from_queryset(StandardNodeQuerySet)):
+    pass
+
+
 class StandardNode(MPTTModel):
     """
     An individual standard entry within the a standards document.
@@ -177,6 +201,12 @@ class StandardNode(MPTTModel):
                 condition=Q(level=0),
             )
         ]
+        indexes = [
+            # django-mptt adds this index to index_together, but not to the migrations
+            Index(name="standardnode_tree_lft", fields=["tree_id", "lft"]),
+            # for the facet filters
+            Index(name="standardnode_language", fields=["language"]),
+        ]
         ordering = ('sort_order', )
 
     class MPTTMeta:
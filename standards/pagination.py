@@ -0,0 +1,179 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict, namedtuple
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from standards.publishing import build_absolute_uri
+
+
+
+# PAGE NUMBER PAGINATION
+################################################################################
+
+class PublishingContextPagination(PageNumberPagination):
+    """
+    Page number pagination that generates ``next`` and ``previous`` links in the
+    current publishing context (see ``standards.publishing``) instead of using
+    the hostname of the request.
+    """
+    page_size_query_param = "page_size"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not queryset.ordered:
+            # pages are only well-defined for ordered querysets
+            queryset = queryset.order_by("pk")
+        return super().paginate_queryset(queryset, request, view=view)
+
+    def get_current_url(self):
+        return build_absolute_uri(self.request.get_full_path(), request=self.request)
+
+    def get_next_link(self):
+        if not self.page.has_next():
+            return None
+        url = self.get_current_url()
+        page_number = self.page.next_page_number()
+        return replace_query_param(url, self.page_query_param, page_number)
+
+    def get_previous_link(self):
+        if not self.page.has_previous():
+            return None
+        url = self.get_current_url()
+        page_number = self.page.previous_page_number()
+        if page_number == 1:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, page_number)
+
+    def get_template_context(self):
+        return {
+            'count': self.page.paginator.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        }
+
+
+def LargeResultsSetPagination(size=100):
+    class CustomPagination(PublishingContextPagination):
+        page_size = size
+        max_page_size = page_size * 10
+    return CustomPagination
+
+
+
+# TREE CURSOR PAGINATION
+################################################################################
+
+TreePosition = namedtuple('TreePosition', ['reverse', 'tree_id', 'lft', 'pk'])
+
+
+class TreeCursorPagination(BasePagination):
+    """
+    Keyset pagination for MPTT models in tree order ``(tree_id, lft)`` that uses
+    opaque cursors (encoded tree positions) instead of page numbers. Each page is
+    a single indexed range query, so walking the whole list is linear time,
+    and there is no ``count`` since that would require a full scan.
+    Cursors also store the pk of the boundary row, whose current position is
+    looked up when the next page is requested, so rows are not skipped or
+    repeated when rows are added, moved, or removed while a client is paging,
+    even when that renumbers the ``lft`` values of the tree (e.g. imports).
+    The stored position is only used when the boundary row was deleted.
+    """
+    page_size = 100
+    max_page_size = 1000
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        if position is None:
+            self.reverse = False
+        else:
+            self.reverse = position.reverse
+            position = self.get_current_position(queryset.model, position)
+            queryset = queryset.filter(self.get_position_filter(position))
+        if self.reverse:
+            queryset = queryset.order_by('-tree_id', '-lft')
+        else:
+            queryset = queryset.order_by('tree_id', 'lft')
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_current_position(self, model, position):
+        """
+        Return the `position` updated with the current tree fields of its
+        boundary row, or unchanged if that row no longer exists.
+        """
+        current = model._base_manager.filter(pk=position.pk).values_list('tree_id', 'lft').first()
+        if current is None:
+            return position
+        return position._replace(tree_id=current[0], lft=current[1])
+
+    def get_position_filter(self, position):
+        if position.reverse:
+            return Q(tree_id__lt=position.tree_id) | Q(tree_id=position.tree_id, lft__lt=position.lft)
+        return Q(tree_id__gt=position.tree_id) | Q(tree_id=position.tree_id, lft__gt=position.lft)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            direction, tree_id, lft, pk = urlsafe_b64decode(encoded.encode('ascii')).decode('ascii').split(':', 3)
+            return TreePosition(reverse=(direction == 'r'), tree_id=int(tree_id), lft=int(lft), pk=pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position):
+        direction = 'r' if position.reverse else 'f'
+        raw = '{}:{}:{}:{}'.format(direction, position.tree_id, position.lft, position.pk)
+        encoded = urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+        url = build_absolute_uri(self.request.get_full_path(), request=self.request)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        last = self.page[-1]
+        return self.encode_cursor(TreePosition(reverse=False, tree_id=last.tree_id, lft=last.lft, pk=last.pk))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        first = self.page[0]
+        return self.encode_cursor(TreePosition(reverse=True, tree_id=first.tree_id, lft=first.lft, pk=first.pk))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_template_context(self):
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        }
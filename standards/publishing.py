@@ -1,14 +1,94 @@
+from collections import namedtuple
 from urllib.parse import urlparse
+
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+
+# PUBLISHING CONTEXTS
+################################################################################
+# The publishing contexts of ``settings.ROCDATA_PUBLISHING_CONTEXTS`` are built
+# once as immutable ``PublishingContext`` objects. The ``default`` context takes
+# the scheme and host from the request, so it is built per request (and kept on
+# the request). Nothing is shared between requests that could be mutated, so
+# concurrent requests in threaded or async servers can't see each other's host.
+
+class PublishingContext(namedtuple("PublishingContext", ["name", "scheme", "netloc", "path_prefix", "base_url"])):
+    """
+    The `scheme`, `netloc`, and `path_prefix` of the URIs in a publishing
+    context, and the ``base_url`` that is prepended to absolute paths.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def create(cls, name, scheme, netloc, path_prefix):
+        base_url = scheme + '://' + netloc + path_prefix
+        return cls(name, scheme, netloc, path_prefix, base_url)
+
+
+_publishing_contexts = None
 
 
+def get_publishing_contexts():
+    """
+    Return a dict of the ``PublishingContext`` of all the configured publishing
+    contexts except ``default``, built the first time it's needed.
+    """
+    global _publishing_contexts
+    if _publishing_contexts is None:
+        _publishing_contexts = {
+            name: PublishingContext.create(name, pc['scheme'], pc['netloc'], pc['path_prefix'])
+            for name, pc in settings.ROCDATA_PUBLISHING_CONTEXTS.items()
+            if name != 'default'
+        }
+    return _publishing_contexts
+
+
+@receiver(setting_changed)
+def reset_publishing_contexts(setting, **kwargs):
+    # e.g. override_settings in the tests and in ``./manage.py exportsite``
+    global _publishing_contexts
+    if setting == 'ROCDATA_PUBLISHING_CONTEXTS':
+        _publishing_contexts = None
+
 
 def get_publishing_context(request=None):
     context_name = settings.ROCDATA_PUBLISHING_CONTEXT
-    publishing_context = settings.ROCDATA_PUBLISHING_CONTEXTS[context_name]
-    if context_name == 'default' and request is None:
+    if context_name != 'default':
+        return get_publishing_contexts()[context_name]
+    if request is None:
         raise ValueError('Default publishing requires request info')
-    elif context_name == 'default':
-        publishing_context['scheme'] = request.scheme
-        publishing_context['netloc'] = request.get_host()
+    http_request = getattr(request, '_request', request)     # the HttpRequest of DRF requests
+    publishing_context = getattr(http_request, '_roc_publishing_context', None)
+    if publishing_context is None:
+        path_prefix = settings.ROCDATA_PUBLISHING_CONTEXTS['default']['path_prefix']
+        publishing_context = PublishingContext.create('default', request.scheme, request.get_host(), path_prefix)
+        http_request._roc_publishing_context = publishing_context
     return publishing_context
+
+
+def build_absolute_uri(path, publishing_context=None, request=None):
+    """
+    Return the absolute URI for the absolute path `path` (e.g. `/terms/Ghana`)
+    in the `publishing_context` (defaults to the current publishing context).
+    """
+    if publishing_context is None:
+        publishing_context = get_publishing_context(request=request)
+    return publishing_context.base_url + path
+
+
+def get_uri_path(uri):
+    """
+    Return the absolute path of the ROC data `uri` from any of the publishing
+    contexts, e.g. `/Ghana/terms/GradeLevels` for the URI
+    `https://w3id.org/rocdata/Ghana/terms/GradeLevels`.
+    """
+    parsed_uri = urlparse(uri)
+    path = parsed_uri.path
+    for pc in get_publishing_contexts().values():
+        prefix = pc.path_prefix
+        if prefix and parsed_uri.netloc == pc.netloc and path.startswith(prefix + '/'):
+            return path[len(prefix):]
+    return path
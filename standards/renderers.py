@@ -0,0 +1,78 @@
+import json
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:     # optional dependency, see FastJSONRenderer
+    orjson = None
+
+
+
+# JSON ENCODING
+################################################################################
+
+SHORT_SEPARATORS = (',', ':')
+
+# \u2028 and \u2029 are escaped so the output is a strict subset of javascript
+# like in DRF's JSONRenderer, see http://timelessrepo.com/json-isnt-a-javascript-subset
+JS_LINE_TERMINATORS = [
+    ('\u2028'.encode('utf-8'), b'\\u2028'),
+    ('\u2029'.encode('utf-8'), b'\\u2029'),
+]
+
+_default_encoder = encoders.JSONEncoder()
+
+
+def json_dumps(data):
+    """
+    Encode `data` as compact UTF-8 JSON bytes like DRF's ``JSONRenderer``
+    (default settings), but using orjson if it's installed. Types that orjson
+    doesn't handle the same way as DRF (e.g. ``datetime``, ``Decimal``, lazy
+    strings) are converted by DRF's ``JSONEncoder``. The output of orjson only
+    differs for floats: the values are the same but the notation may differ
+    (e.g. ``1e16`` and ``0.00001`` instead of ``1e+16`` and ``1e-05``), and the
+    non-finite floats, which are not valid JSON, are written as ``null`` where
+    ``JSONRenderer`` raises ``ValueError``. Checking the data for such floats
+    would take longer than encoding it with orjson.
+    """
+    if orjson is not None:
+        try:
+            ret = orjson.dumps(
+                data,
+                default=_default_encoder.default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            pass    # e.g. integers larger than 64 bits
+        else:
+            for char, escaped in JS_LINE_TERMINATORS:
+                if char in ret:
+                    ret = ret.replace(char, escaped)
+            return ret
+    ret = json.dumps(data, cls=encoders.JSONEncoder, ensure_ascii=False, allow_nan=False, separators=SHORT_SEPARATORS)
+    return ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode('utf-8')
+
+
+
+# RENDERERS
+################################################################################
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for DRF's ``JSONRenderer`` that encodes the compact JSON
+    responses with ``json_dumps`` (much faster when orjson is installed).
+    Indented output (``Accept: application/json; indent=4`` and the browsable
+    API) and non-default ``UNICODE_JSON``/``COMPACT_JSON`` settings are left to
+    ``JSONRenderer``.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        return json_dumps(data)
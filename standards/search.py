@@ -0,0 +1,246 @@
+import re
+
+from django.db import connections, router
+
+from standards.models import ContentNode, StandardNode, Term
+
+
+
+# SEARCH INDEX
+################################################################################
+# Full-text indexes of the standard nodes, content nodes, and terms, which are
+# kept up to date by database triggers, so they also see the rows written with
+# ``bulk_create`` and ``QuerySet.update`` (the importers). The triggers and
+# indexes are created after ``./manage.py migrate``, like the indexes of
+# dbindexes.py, since they differ between the backends:
+#   - SQLite: an FTS5 table per model (``<table>_fts``) that indexes the rows of
+#     the model table (an "external content" table keyed by the table rowids)
+#     with the porter stemmer, ranked with bm25 and the column weights below.
+#   - PostgreSQL: a ``search_vector`` column in the model table, computed by a
+#     trigger using the text search configuration of the row's ``language``, with
+#     a GIN index, ranked with ts_rank_cd.
+
+SEARCH_MAX_RESULTS = 50
+
+# PostgreSQL text search configurations by language code (others use "simple")
+SEARCH_LANGUAGES = {
+    "en": "english",
+    "es": "spanish",
+    "fr": "french",
+    "pt": "portuguese",
+}
+
+# the relative weights of the PostgreSQL weight classes in the SQLite bm25 ranks
+SQLITE_WEIGHTS = {"A": 10.0, "B": 4.0, "C": 1.0}
+
+
+class SearchSpec:
+    """
+    The search index of `model`: the indexed `fields` with their weight class
+    ("A" is the highest) and the `container` shown with each result.
+    """
+    def __init__(self, kind, model, fields, container):
+        self.kind = kind
+        self.model = model
+        self.fields = fields
+        self.container = container
+
+    @property
+    def table(self):
+        return self.model._meta.db_table
+
+    @property
+    def field_names(self):
+        return [name for name, weight in self.fields]
+
+    @property
+    def select_related(self):
+        return self.container + "__jurisdiction"
+
+
+SEARCH_SPECS = {
+    "standardnode": SearchSpec("standardnode", StandardNode, [
+        ("notation", "A"),
+        ("title", "A"),
+        ("concept_keywords", "B"),
+        ("description", "C"),
+    ], container="document"),
+    "contentnode": SearchSpec("contentnode", ContentNode, [
+        ("title", "A"),
+        ("author", "B"),
+        ("description", "C"),
+    ], container="collection"),
+    "term": SearchSpec("term", Term, [
+        ("label", "A"),
+        ("alt_label", "B"),
+        ("hidden_label", "B"),
+    ], container="vocabulary"),
+}
+
+
+def create_search_index(using="default", **kwargs):
+    """
+    Create the missing full-text indexes and their triggers in the database
+    `using` (connected to the ``post_migrate`` signal).
+    """
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        for spec in SEARCH_SPECS.values():
+            if connection.vendor == "sqlite":
+                create_sqlite_search_index(cursor, spec)
+            elif connection.vendor == "postgresql":
+                create_postgres_search_index(cursor, spec)
+
+
+def rebuild_search_index(using="default"):
+    """
+    Reindex all the rows, e.g. after ``VACUUM`` renumbered the SQLite rowids.
+    """
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        for spec in SEARCH_SPECS.values():
+            if connection.vendor == "sqlite":
+                cursor.execute("INSERT INTO {fts}({fts}) VALUES ('rebuild')".format(fts=spec.table + "_fts"))
+            elif connection.vendor == "postgresql":
+                name = spec.field_names[0]
+                cursor.execute("UPDATE {} SET {} = {}".format(spec.table, name, name))
+
+
+
+# SQLITE FTS5
+################################################################################
+
+def create_sqlite_search_index(cursor, spec):
+    fts = spec.table + "_fts"
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = %s", [fts + "_insert"])
+    if cursor.fetchone() is not None:
+        return
+    # the triggers are dropped when migrations rebuild the table, which also
+    # renumbers the rowids, so the index is rebuilt when they're created
+    columns = ", ".join(spec.field_names)
+    new_values = ", ".join("new." + name for name in spec.field_names)
+    old_values = ", ".join("old." + name for name in spec.field_names)
+    cursor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, content='{table}', "
+        "tokenize='porter unicode61 remove_diacritics 2')".format(fts=fts, columns=columns, table=spec.table)
+    )
+    insert = "INSERT INTO {fts}(rowid, {columns}) VALUES (new.rowid, {new_values});".format(
+        fts=fts, columns=columns, new_values=new_values)
+    delete = "INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});".format(
+        fts=fts, columns=columns, old_values=old_values)
+    cursor.execute("CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN {insert} END".format(
+        fts=fts, table=spec.table, insert=insert))
+    cursor.execute("CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN {delete} END".format(
+        fts=fts, table=spec.table, delete=delete))
+    # only for changes of the indexed columns, not e.g. the MPTT columns of tree inserts
+    cursor.execute(
+        "CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {columns} ON {table} "
+        "BEGIN {delete} {insert} END".format(fts=fts, columns=columns, table=spec.table, delete=delete, insert=insert)
+    )
+    cursor.execute("INSERT INTO {fts}({fts}) VALUES ('rebuild')".format(fts=fts))
+
+
+def get_sqlite_match_query(q):
+    """
+    Return the FTS5 query for the words of `q` (all the words must match).
+    """
+    return " ".join('"{}"'.format(word) for word in re.findall(r"\w+", q))
+
+
+def search_sqlite(cursor, spec, q, limit):
+    match_query = get_sqlite_match_query(q)
+    if not match_query:
+        return []
+    fts = spec.table + "_fts"
+    weights = ", ".join(str(SQLITE_WEIGHTS[weight]) for name, weight in spec.fields)
+    cursor.execute(
+        "SELECT t.id, bm25({fts}, {weights}) AS score FROM {fts} JOIN {table} t ON t.rowid = {fts}.rowid "
+        "WHERE {fts} MATCH %s ORDER BY score LIMIT %s".format(fts=fts, weights=weights, table=spec.table),
+        [match_query, limit],
+    )
+    return [(pk, -score) for pk, score in cursor.fetchall()]     # bm25 scores are negative
+
+
+
+# POSTGRESQL FULL-TEXT SEARCH
+################################################################################
+
+def get_postgres_config_sql(language_sql):
+    """
+    Return the SQL for the text search configuration of the `language_sql`.
+    """
+    whens = " ".join(
+        "WHEN '{}' THEN '{}'".format(code, config) for code, config in SEARCH_LANGUAGES.items()
+    )
+    return "(CASE split_part(lower(coalesce({}, '')), '-', 1) {} ELSE 'simple' END)::regconfig".format(
+        language_sql, whens)
+
+
+def create_postgres_search_index(cursor, spec):
+    config = get_postgres_config_sql("NEW.language")
+    vector = " || ".join(
+        "setweight(to_tsvector({}, coalesce(NEW.{}, '')), '{}')".format(config, name, weight)
+        for name, weight in spec.fields
+    )
+    cursor.execute("ALTER TABLE {} ADD COLUMN IF NOT EXISTS search_vector tsvector".format(spec.table))
+    cursor.execute(
+        "CREATE OR REPLACE FUNCTION {table}_search_update() RETURNS trigger AS $$ "
+        "BEGIN NEW.search_vector := {vector}; RETURN NEW; END $$ LANGUAGE plpgsql".format(
+            table=spec.table, vector=vector)
+    )
+    cursor.execute("DROP TRIGGER IF EXISTS {table}_search ON {table}".format(table=spec.table))
+    cursor.execute(
+        "CREATE TRIGGER {table}_search BEFORE INSERT OR UPDATE OF {columns}, language ON {table} "
+        "FOR EACH ROW EXECUTE PROCEDURE {table}_search_update()".format(
+            table=spec.table, columns=", ".join(spec.field_names))
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS {table}_search ON {table} USING gin (search_vector)".format(
+        table=spec.table))
+    name = spec.field_names[0]
+    cursor.execute("UPDATE {} SET {} = {} WHERE search_vector IS NULL".format(spec.table, name, name))
+
+
+def search_postgres(cursor, spec, q, limit):
+    # the rows use different configurations, so the query matches the words
+    # stemmed by any of them
+    configs = list(SEARCH_LANGUAGES.values()) + ["simple"]
+    query = " || ".join("websearch_to_tsquery('{}', %s)".format(config) for config in configs)
+    cursor.execute(
+        "SELECT id, ts_rank_cd(search_vector, query) AS score FROM {table}, {query} AS query "
+        "WHERE search_vector @@ query ORDER BY score DESC LIMIT %s".format(table=spec.table, query=query),
+        [q] * len(configs) + [limit],
+    )
+    return cursor.fetchall()
+
+
+
+# SEARCH
+################################################################################
+
+def search(q, kinds=None, limit=SEARCH_MAX_RESULTS):
+    """
+    Return the best `limit` matches for the search query `q` as a list of
+    ``(spec, obj, score)`` tuples, for the kinds of objects in `kinds` (the keys
+    of ``SEARCH_SPECS``, defaults to all).
+    """
+    matches = []
+    for kind in kinds or SEARCH_SPECS.keys():
+        spec = SEARCH_SPECS[kind]
+        connection = connections[router.db_for_read(spec.model)]
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                scores = search_postgres(cursor, spec, q, limit)
+            else:
+                scores = search_sqlite(cursor, spec, q, limit)
+        matches.extend((spec, pk, score) for pk, score in scores)
+    matches.sort(key=lambda match: match[2], reverse=True)
+    matches = matches[:limit]
+
+    objects = {}
+    for spec in set(match[0] for match in matches):
+        pks = [pk for match_spec, pk, score in matches if match_spec is spec]
+        objects[spec.kind] = spec.model.objects.select_related(spec.select_related).in_bulk(pks)
+    return [
+        (spec, objects[spec.kind][pk], score)
+        for spec, pk, score in matches if pk in objects[spec.kind]
+    ]
@@ -1,8 +1,12 @@
-import functools
+from collections import OrderedDict
+from urllib.parse import unquote, urlparse
 
+from django.core.exceptions import FieldDoesNotExist
+from django.urls import Resolver404, get_script_prefix, resolve
+from django.utils.encoding import uri_to_iri
 from django_countries.serializers import CountryFieldMixin
 from rest_framework import serializers
-from rest_framework.reverse import reverse
+from rest_framework.relations import PKOnlyObject
 
 from standards.models import Jurisdiction, UserProfile
 from standards.models import ControlledVocabulary, Term
@@ -12,6 +16,9 @@ from standards.models import StandardsDocument, StandardNode
 from standards.models import StandardsCrosswalk, StandardNodeRelation
 from standards.models import ContentCollection, ContentNode, ContentNodeRelation
 from standards.models import ContentCorrelation, ContentStandardRelation
+from standards.termindex import get_term_index
+from standards.trees import load_tree
+from standards.uris import build_uri, get_attribute_getters
 
 
 
@@ -26,33 +33,42 @@ class MultiKeyHyperlinkField(serializers.HyperlinkedRelatedField):
     (used by ``get_url``), and ``lookup_kwargs_mapping`` (used by ``get_object``).
     """
 
-    def rgetattr(self, obj, attrpath):
-        """
-        A fancy version of ``getattr`` that allows getting dot-separated nested attributes
-        like ``jurisdiction.id`` used in ``MultiKeyHyperlinkField`` mapping dicst.
-        This code is inspired by solution in https://stackoverflow.com/a/31174427.
-        """
-        return functools.reduce(getattr, [obj] + attrpath.split('.'))
-
     def get_url(self, obj, view_name, request, format):
-        url_kwargs = dict(
-            (urlparam, self.rgetattr(obj, attrpath))
-            for urlparam, attrpath in self.url_kwargs_mapping.items()
-        )
-        if "format" in request.GET:
-            # This is a hack to avoid ?format=api appended to URIs by preserve_builtin_query_params
-            # github.com/encode/django-rest-framework/blob/master/rest_framework/reverse.py#L12-L29
-            request.GET._mutable = True
-            del request.GET["format"]
-            request.GET._mutable = False
-        return reverse(view_name, kwargs=url_kwargs, request=request)
+        # attribute getters and URI templates are compiled once, then cached
+        getters = get_attribute_getters(tuple(self.url_kwargs_mapping.items()))
+        url_kwargs = dict((urlparam, getter(obj)) for urlparam, getter in getters)
+        return build_uri(view_name, request, **url_kwargs)
 
     def get_object(self, view_name, view_args, view_kwargs):
-        lookup_kwargs = dict(
+        return self.get_queryset().get(**self.get_lookup_kwargs(view_kwargs))
+
+    def get_lookup_kwargs(self, view_kwargs):
+        return dict(
             (kwarg, view_kwargs[url_kwarg])
             for kwarg, url_kwarg in self.lookup_kwargs_mapping.items()
         )
-        return self.get_queryset().get(**lookup_kwargs)
+
+    def parse_hyperlink(self, data):
+        """
+        Return the URL kwargs of the hyperlink `data` (absolute URI or path),
+        validated like in ``to_internal_value`` but without fetching the object
+        (see ``standards.bulk.resolve_hyperlinks``).
+        """
+        if not isinstance(data, str):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        path = data
+        if path.startswith(('http:', 'https:')):
+            path = urlparse(path).path
+            prefix = get_script_prefix()
+            if path.startswith(prefix):
+                path = '/' + path[len(prefix):]
+        try:
+            match = resolve(uri_to_iri(unquote(path)))
+        except Resolver404:
+            self.fail('no_match')
+        if match.view_name != self.view_name:
+            self.fail('incorrect_match')
+        return match.kwargs
 
     def use_pk_only_optimization(self):
         # via
@@ -113,6 +129,30 @@ class TermHyperlinkField(MultiKeyHyperlinkField):
         "path": "path",
     }
 
+    # Terms are resolved and rendered using the term index: foreign keys (e.g.
+    # ``kind``) are rendered from their ids only, and lookups are by primary key.
+
+    def use_pk_only_optimization(self):
+        return True
+
+    def get_url(self, obj, view_name, request, format):
+        if not isinstance(obj, PKOnlyObject):
+            return super().get_url(obj, view_name, request, format)
+        key = get_term_index(request).get_key(obj.pk)
+        if key is None:
+            # not in the index (e.g. a term created in a transaction of another process)
+            return super().get_url(self.get_queryset().get(pk=obj.pk), view_name, request, format)
+        jurisdiction_name, vocabulary_name, path = key
+        return build_uri(view_name, request,
+                         jurisdiction_name=jurisdiction_name, vocabulary_name=vocabulary_name, path=path)
+
+    def get_object(self, view_name, view_args, view_kwargs):
+        term_id = get_term_index().get_id(
+            view_kwargs["jurisdiction_name"], view_kwargs["vocabulary_name"], view_kwargs["path"])
+        if term_id is None:
+            raise Term.DoesNotExist
+        return self.get_queryset().get(pk=term_id)
+
 class TermRelationHyperlinkField(JurisdictionScopedHyperlinkField):
     # /<jurisdiction_name>/termrels/<pk>
     view_name = 'jurisdiction-termrelation-detail'
@@ -213,10 +253,108 @@ class ContentStandardRelationHyperlinkField(MultiKeyHyperlinkField):
 
 
 
+# SPARSE FIELDSETS
+################################################################################
+
+FIELDS_QUERY_PARAM = 'fields'
+OMIT_QUERY_PARAM = 'omit'
+
+
+def get_query_param_names(request, param):
+    # comma-separated names, e.g. ?fields=id,notation,parent
+    value = request.query_params.get(param, '')
+    return set(name.strip() for name in value.split(',') if name.strip())
+
+
+class SparseFieldsetsMixin:
+    """
+    Request-level field selection for ROC serializers: ``?fields=id,notation``
+    keeps only the listed fields and ``?omit=children,subjects`` removes fields.
+    The fields are removed before serialization, so the dropped hyperlinks are
+    never resolved. The same params apply to the nested serializers of ``/full``
+    responses, so unknown names are ignored. Only used for GET requests.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.omitted_fields = set()
+        request = self.context.get('request')
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return
+        fields = get_query_param_names(request, FIELDS_QUERY_PARAM)
+        omit = get_query_param_names(request, OMIT_QUERY_PARAM)
+        for name in list(self.fields):
+            if (fields and name not in fields) or name in omit:
+                self.fields.pop(name)
+                self.omitted_fields.add(name)
+
+    def prune_related_lookups(self, lookups):
+        """
+        Return the ``prefetch_related`` `lookups` without those that start with
+        an omitted many-to-many or reverse relation (e.g. ``subjects`` or
+        ``children``). Lookups for forward relations are kept, since these are
+        also used to build URIs (e.g. ``document__jurisdiction``).
+        """
+        if not self.omitted_fields:
+            return list(lookups)
+        model = self.Meta.model
+        pruned_lookups = []
+        for lookup in lookups:
+            name = getattr(lookup, 'prefetch_to', lookup).split('__')[0]
+            if name in self.omitted_fields:
+                try:
+                    field = model._meta.get_field(name)
+                except FieldDoesNotExist:
+                    field = None
+                if field is not None and (field.many_to_many or field.one_to_many):
+                    continue
+            pruned_lookups.append(lookup)
+        return pruned_lookups
+
+
+
+# TREES
+################################################################################
+
+class FullTreeNodeSerializerMixin:
+    """
+    Recursive serialization of the subtree of a node for the ``/full`` actions.
+    The whole subtree is loaded in a constant number of queries (see ``load_tree``)
+    using the ``tree_select_related``, ``tree_prefetch_related``, and
+    ``tree_shared_related`` lookups of the serializer class. Trees limited to the
+    level ``tree_max_level`` (from the serializer context) show the number of
+    children as ``children_count`` instead of ``children`` for the boundary nodes.
+    """
+
+    def get_children(self, obj):
+        if "children_placeholder" in self.context:
+            return self.context["children_placeholder"]   # streamed separately
+        if not hasattr(obj, 'tree_children'):
+            load_tree(
+                obj,
+                select_related=self.tree_select_related,
+                prefetch_related=self.prune_related_lookups(self.tree_prefetch_related),
+                shared_related=self.tree_shared_related,
+                max_level=self.context.get("tree_max_level"),
+            )
+        return self.__class__(obj.tree_children, many=True, context=self.context).data
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        children_count = getattr(instance, 'tree_children_count', None)
+        if children_count is not None:
+            data = OrderedDict(
+                ('children_count', children_count) if key == 'children' else (key, value)
+                for key, value in data.items()
+            )
+        return data
+
+
+
 # JURISDICTION
 ################################################################################
 
-class JurisdictionSerializer(serializers.ModelSerializer):
+class JurisdictionSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     vocabularies = ControlledVocabularyHyperlinkField(many=True, required=False)
     documents = serializers.SerializerMethodField()
     crosswalks = serializers.SerializerMethodField()
@@ -242,51 +380,33 @@ class JurisdictionSerializer(serializers.ModelSerializer):
         ]
 
     # The following four are done as a method fields because the serializers are
-    # only defined later in this source file.
+    # only defined later in this source file. Only the ids of the children are
+    # used (see ``JURISDICTION_CHILDREN_PREFETCHES``) since the name of their
+    # jurisdiction is ``obj.name``.
 
-    def get_documents(self, obj):
+    def get_children_uris(self, obj, relation, view_name):
         return [
-            reverse(
-                "jurisdiction-document-detail",
-                kwargs= {"jurisdiction_name": doc.jurisdiction.name, "pk": doc.id},
-                request=self.context["request"],
-            ) for doc in obj.documents.all()
+            build_uri(view_name, self.context["request"], jurisdiction_name=obj.name, pk=child.id)
+            for child in getattr(obj, relation).all()
         ]
 
+    def get_documents(self, obj):
+        return self.get_children_uris(obj, "documents", "jurisdiction-document-detail")
+
     def get_crosswalks(self, obj):
-        return [
-            reverse(
-                "jurisdiction-standardscrosswalk-detail",
-                kwargs= {"jurisdiction_name": sc.jurisdiction.name, "pk": sc.id},
-                request=self.context["request"],
-            ) for sc in obj.crosswalks.all()
-        ]
+        return self.get_children_uris(obj, "crosswalks", "jurisdiction-standardscrosswalk-detail")
 
     def get_contentcollections(self, obj):
-        return [
-            reverse(
-                "jurisdiction-contentcollection-detail",
-                kwargs= {"jurisdiction_name": cc.jurisdiction.name, "pk": cc.id},
-                request=self.context["request"],
-            )
-            for cc in obj.contentcollections.all()
-        ]
+        return self.get_children_uris(obj, "contentcollections", "jurisdiction-contentcollection-detail")
 
     def get_contentcorrelations(self, obj):
-        return [
-            reverse(
-                "jurisdiction-contentcorrelation-detail",
-                kwargs= {"jurisdiction_name": cs.jurisdiction.name, "pk": cs.id},
-                request=self.context["request"],
-            )
-            for cs in obj.contentcorrelations.all()
-        ]
+        return self.get_children_uris(obj, "contentcorrelations", "jurisdiction-contentcorrelation-detail")
 
 
 # VOCABULARIES, TERMS, and TERM RELATIONS
 ################################################################################
 
-class ControlledVocabularySerializer(serializers.ModelSerializer):
+class ControlledVocabularySerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     jurisdiction = JurisdictionHyperlinkField(required=True)
     terms = TermHyperlinkField(many=True, required=False)
 
@@ -312,7 +432,7 @@ class ControlledVocabularySerializer(serializers.ModelSerializer):
         ]
 
 
-class TermSerializer(serializers.ModelSerializer):
+class TermSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     jurisdiction = JurisdictionHyperlinkField(source='vocabulary.jurisdiction', required=True)
     vocabulary = ControlledVocabularyHyperlinkField(required=True)
 
@@ -338,7 +458,7 @@ class TermSerializer(serializers.ModelSerializer):
         ]
 
 
-class TermRelationSerializer(serializers.ModelSerializer):
+class TermRelationSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     jurisdiction = JurisdictionHyperlinkField(required=True)
     source = TermHyperlinkField(required=True)
     target = TermHyperlinkField(required=False)
@@ -363,7 +483,7 @@ class TermRelationSerializer(serializers.ModelSerializer):
 # STANDARDS
 ################################################################################
 
-class StandardsDocumentSerializer(serializers.ModelSerializer):
+class StandardsDocumentSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     root_node_id = serializers.SerializerMethodField()
     jurisdiction = JurisdictionHyperlinkField(required=True)
     children = StandardNodeHyperlinkField(source='root.children', many=True)
@@ -376,10 +496,8 @@ class StandardsDocumentSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
     def get_root_node_id(self, obj):
-        try:
-            return StandardNode.objects.get(level=0, document_id=obj.id).id
-        except StandardNode.DoesNotExist:
-            return None
+        root_ids = StandardNode.objects.filter(level=0, document_id=obj.id).values_list('id', flat=True)
+        return root_ids.first()
 
 class FullStandardsDocumentSerializer(StandardsDocumentSerializer):
     """
@@ -388,13 +506,19 @@ class FullStandardsDocumentSerializer(StandardsDocumentSerializer):
     children = serializers.SerializerMethodField()
 
     def get_children(self, obj):
-        return [
-            FullStandardNodeSerializer(node, context=self.context).data
-            for node in obj.root.children.all()
-        ]
-
-
-class StandardNodeSerializer(serializers.ModelSerializer):
+        if "children_placeholder" in self.context:
+            return self.context["children_placeholder"]   # streamed separately
+        root = self.context.get("tree_root")
+        if root is None:
+            root = StandardNode.objects.get(level=0, document=obj)
+            root.document = obj
+        if root.level > 0:
+            # ?root=<node id> subtree
+            return [FullStandardNodeSerializer(root, context=self.context).data]
+        return FullStandardNodeSerializer(context=self.context).get_children(root)
+
+
+class StandardNodeSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     uri = serializers.SerializerMethodField()
     jurisdiction = JurisdictionHyperlinkField(source='document.jurisdiction', required=False) # check this...
     document = StandardsDocumentHyperlinkHyperlinkField(required=True)
@@ -413,23 +537,20 @@ class StandardNodeSerializer(serializers.ModelSerializer):
         return obj.uri
 
 
-class FullStandardNodeSerializer(StandardNodeSerializer):
+class FullStandardNodeSerializer(FullTreeNodeSerializerMixin, StandardNodeSerializer):
     """
     Recursive variant of ``StandardNodeSerializer`` to use for ``/full`` action.
     """
     children = serializers.SerializerMethodField()
-
-    def get_children(self, obj):
-        return [
-            FullStandardNodeSerializer(node, context=self.context).data
-            for node in obj.children.all()
-        ]
+    tree_select_related = []    # the kind is rendered from the term index
+    tree_prefetch_related = ["subjects", "education_levels", "concept_terms"]
+    tree_shared_related = ["document"]
 
 
 # STANDARDS CROSSWALKS
 ################################################################################
 
-class StandardsCrosswalkSerializer(serializers.ModelSerializer):
+class StandardsCrosswalkSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     jurisdiction = JurisdictionHyperlinkField(required=True)
     license = TermHyperlinkField()
     subjects = TermHyperlinkField(many=True)
@@ -441,7 +562,7 @@ class StandardsCrosswalkSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class StandardNodeRelationSerializer(serializers.ModelSerializer):
+class StandardNodeRelationSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     jurisdiction = JurisdictionHyperlinkField(source='crosswalk.jurisdiction', required=False)
     crosswalk = StandardsCrowsswalkHyperlinkField(required=True)
     source = StandardNodeHyperlinkField(style={'base_template': 'input.html'})
@@ -459,7 +580,7 @@ class StandardNodeRelationSerializer(serializers.ModelSerializer):
 # CONTENT
 ################################################################################
 
-class ContentCollectionSerializer(CountryFieldMixin, serializers.ModelSerializer):
+class ContentCollectionSerializer(CountryFieldMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     uri = serializers.SerializerMethodField()
     jurisdiction = JurisdictionHyperlinkField(required=True)
     license = TermHyperlinkField()
@@ -481,13 +602,19 @@ class FullContentCollectionSerializer(ContentCollectionSerializer):
     children = serializers.SerializerMethodField()
 
     def get_children(self, obj):
-        return [
-            FullContentNodeSerializer(node, context=self.context).data
-            for node in obj.root.children.all()
-        ]
-
-
-class ContentNodeSerializer(serializers.ModelSerializer):
+        if "children_placeholder" in self.context:
+            return self.context["children_placeholder"]   # streamed separately
+        root = self.context.get("tree_root")
+        if root is None:
+            root = ContentNode.objects.get(level=0, collection=obj)
+            root.collection = obj
+        if root.level > 0:
+            # ?root=<node id> subtree
+            return [FullContentNodeSerializer(root, context=self.context).data]
+        return FullContentNodeSerializer(context=self.context).get_children(root)
+
+
+class ContentNodeSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     uri = serializers.SerializerMethodField()
     jurisdiction = JurisdictionHyperlinkField(source='document.jurisdiction', required=False)
     collection = ContentCollectionHyperlinkField(required=True)
@@ -507,20 +634,17 @@ class ContentNodeSerializer(serializers.ModelSerializer):
         return obj.uri
 
 
-class FullContentNodeSerializer(ContentNodeSerializer):
+class FullContentNodeSerializer(FullTreeNodeSerializerMixin, ContentNodeSerializer):
     """
     Recursive variant of ``ContentNodeSerializer`` to use for ``/full`` action.
     """
     children = serializers.SerializerMethodField()
-
-    def get_children(self, obj):
-        return [
-            FullContentNodeSerializer(node, context=self.context).data
-            for node in obj.children.all()
-        ]
+    tree_select_related = []    # the kind and license are rendered from the term index
+    tree_prefetch_related = ["subjects", "education_levels", "concept_terms"]
+    tree_shared_related = ["collection"]
 
 
-class ContentNodeRelationSerializer(serializers.ModelSerializer):
+class ContentNodeRelationSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     jurisdiction = JurisdictionHyperlinkField(required=True)
     source = ContentNodeHyperlinkField(style={'base_template': 'input.html'})
     kind = TermHyperlinkField()
@@ -535,7 +659,7 @@ class ContentNodeRelationSerializer(serializers.ModelSerializer):
 # CONTENT CORRELATIONS
 ################################################################################
 
-class ContentCorrelationSerializer(serializers.ModelSerializer):
+class ContentCorrelationSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     jurisdiction = JurisdictionHyperlinkField(required=True)
     license = TermHyperlinkField()
     subjects = TermHyperlinkField(many=True)
@@ -547,7 +671,7 @@ class ContentCorrelationSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class ContentStandardRelationSerializer(serializers.ModelSerializer):
+class ContentStandardRelationSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     jurisdiction = JurisdictionHyperlinkField(source='correlation.jurisdiction', required=False)
     correlation = ContentCorrelationHyperlinkField(required=True)
     contentnode = ContentNodeHyperlinkField(style={'base_template': 'input.html'})
@@ -557,3 +681,28 @@ class ContentStandardRelationSerializer(serializers.ModelSerializer):
     class Meta:
         model = ContentStandardRelation
         fields = '__all__'
+
+
+class ContentStandardRelationBulkSerializer(serializers.ModelSerializer):
+    """
+    One row of a bulk request for content standard relations. The hyperlinks are
+    only validated as strings here; they are resolved for all the rows at once in
+    ``standards.bulk.bulk_upsert_content_standard_relations``.
+    """
+    correlation = serializers.CharField()
+    contentnode = serializers.CharField()
+    kind = serializers.CharField(required=False, allow_null=True)
+    standardnode = serializers.CharField()
+
+    class Meta:
+        model = ContentStandardRelation
+        fields = [
+            "correlation",
+            "contentnode",
+            "kind",
+            "standardnode",
+            "canonical_uri",
+            "source_uri",
+            "notes",
+            "extra_fields",
+        ]
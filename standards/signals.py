@@ -0,0 +1,121 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from standards.caching import GLOBAL_TAG, REFERENCED_MODELS
+from standards.caching import get_invalidation_tags, invalidate_tags
+from standards.caching import is_globally_invalidated, is_invalidation_deferred
+from standards.conditional import has_date_modified
+from standards.termindex import invalidate_term_index
+from standards.utils import DefaultTerm
+
+
+
+def is_roc_model(model):
+    return model._meta.app_label == 'standards'
+
+
+
+# DATE MODIFIED
+################################################################################
+
+@receiver(m2m_changed)
+def touch_date_modified(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """
+    Update the ``date_modified`` of ROC objects when their many-to-many fields
+    (e.g. ``subjects``) change, since ``auto_now`` only applies on ``save``.
+    """
+    if not is_roc_model(type(instance)) or action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    now = timezone.now()
+    if not reverse and has_date_modified(type(instance)):
+        type(instance)._base_manager.filter(pk=instance.pk).update(date_modified=now)
+        instance.date_modified = now
+    elif reverse and pk_set and has_date_modified(model):
+        model._base_manager.filter(pk__in=pk_set).update(date_modified=now)
+
+
+
+# RESPONSE CACHE INVALIDATION
+################################################################################
+
+@receiver(pre_save)
+def collect_tags_before_save(sender, instance, raw=False, **kwargs):
+    """
+    Remember the cache tags of the saved version of `instance` (e.g. the old
+    parent of a node that gets moved), and whether its URI is about to change.
+    """
+    if raw or not is_roc_model(sender) or instance._state.adding or is_globally_invalidated():
+        return
+    if is_invalidation_deferred():
+        # skip the query of the saved version in bulk changes (the importers)
+        invalidate_tags({GLOBAL_TAG})
+        return
+    old_instance = sender._base_manager.filter(pk=instance.pk).first()
+    if old_instance is None:
+        return
+    tags = get_invalidation_tags(old_instance)
+    if type(instance).__name__ in REFERENCED_MODELS \
+            and old_instance.get_absolute_url() != instance.get_absolute_url():
+        tags.add(GLOBAL_TAG)   # links to the object in other resources change
+    instance._invalidation_tags = tags
+
+
+@receiver(post_save)
+def invalidate_after_save(sender, instance, raw=False, **kwargs):
+    if not is_roc_model(sender) or is_globally_invalidated():
+        return
+    if raw:
+        # loaddata: the old version and the related objects are unknown
+        invalidate_tags({GLOBAL_TAG})
+        return
+    tags = get_invalidation_tags(instance) | getattr(instance, '_invalidation_tags', set())
+    instance._invalidation_tags = set()
+    invalidate_tags(tags)
+
+
+@receiver(pre_delete)
+def collect_tags_before_delete(sender, instance, **kwargs):
+    if not is_roc_model(sender) or is_globally_invalidated():
+        return
+    tags = get_invalidation_tags(instance)
+    if type(instance).__name__ in REFERENCED_MODELS:
+        tags.add(GLOBAL_TAG)   # links to the object in other resources are removed
+    instance._invalidation_tags = tags
+
+
+@receiver(post_delete)
+def invalidate_after_delete(sender, instance, **kwargs):
+    if not is_roc_model(sender):
+        return
+    invalidate_tags(getattr(instance, '_invalidation_tags', set()))
+
+
+@receiver(m2m_changed)
+def invalidate_after_m2m_change(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if not is_roc_model(type(instance)) or action not in ('post_add', 'post_remove', 'post_clear') \
+            or is_globally_invalidated():
+        return
+    if not reverse:
+        invalidate_tags(get_invalidation_tags(instance))
+    elif pk_set:
+        tags = set()
+        for obj in model._base_manager.filter(pk__in=pk_set):
+            tags |= get_invalidation_tags(obj)
+        invalidate_tags(tags)
+
+
+
+# TERM INDEX INVALIDATION
+################################################################################
+
+TERM_INDEX_MODELS = ["Jurisdiction", "ControlledVocabulary", "Term"]
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_term_index_after_change(sender, instance, **kwargs):
+    # raw saves (loaddata) included, since fixtures are a way to load vocabularies
+    if is_roc_model(sender) and sender.__name__ in TERM_INDEX_MODELS:
+        invalidate_term_index()
+        DefaultTerm.reset_all()
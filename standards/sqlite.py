@@ -0,0 +1,134 @@
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+
+# SQLITE CONNECTION SETTINGS
+################################################################################
+# Every SQLite connection is set up for concurrent reads and writes: in WAL mode
+# the readers don't block the writer and the writer doesn't block the readers,
+# so long imports (e.g. ``./manage.py loadterms``) can run while the server is
+# serving requests. WAL mode is stored in the database file, so it is only set
+# by the read-write connections.
+
+SQLITE_PRAGMAS = [
+    ("synchronous", "NORMAL"),          # safe in WAL mode, fsync only at checkpoints
+    ("mmap_size", 256 * 1024 * 1024),   # bytes of the database file read via mmap
+    ("cache_size", -64 * 1024),         # page cache of 64 MiB (negative = KiB)
+    ("temp_store", "MEMORY"),
+    ("busy_timeout", 5000),             # ms to wait for a lock instead of failing
+]
+
+
+def is_read_only_connection(connection):
+    return "mode=ro" in str(connection.settings_dict["NAME"])
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        if not is_read_only_connection(connection):
+            cursor.execute("PRAGMA journal_mode=WAL")
+        for name, value in SQLITE_PRAGMAS:
+            cursor.execute("PRAGMA {}={}".format(name, value))
+
+
+
+# READ-ONLY DATABASE
+################################################################################
+# With SQLite, the GET and HEAD requests read from the database alias
+# ``settings.ROCDATA_READ_ONLY_DATABASE``, which opens the same database file
+# in read-only mode (``mode=ro``), and the writes go to the default database.
+# The requests are marked by ``ReadOnlyDatabaseMiddleware`` and routed by the
+# ``ReadOnlyRouter``. The mark is a context variable so it follows requests
+# into the threads of the async views (see asyncviews.py).
+
+READ_METHODS = ("GET", "HEAD")
+
+_read_only = ContextVar("roc_read_only", default=False)
+
+
+@contextmanager
+def read_only_database():
+    """
+    Send the reads in this block to the read-only database (if configured).
+    """
+    token = _read_only.set(True)
+    try:
+        yield
+    finally:
+        _read_only.reset(token)
+
+
+def read_only_iterator(iterator):
+    with read_only_database():
+        yield from iterator
+
+
+class ReadOnlyDatabaseMiddleware:
+    """
+    Run the GET and HEAD requests, including the generation of the content of
+    streaming responses, in ``read_only_database`` blocks. The middleware is
+    async capable, so under ASGI it doesn't move the async read views of
+    asyncviews.py back onto Django's single thread for synchronous code.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(self.get_response):
+            # mark the instance as a coroutine function for Django's handler
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if request.method not in READ_METHODS:
+            return self.get_response(request)
+        with read_only_database():
+            response = self.get_response(request)
+        return self.process_response(response)
+
+    async def __acall__(self, request):
+        if request.method not in READ_METHODS:
+            return await self.get_response(request)
+        with read_only_database():
+            response = await self.get_response(request)
+        return self.process_response(response)
+
+    def process_response(self, response):
+        if response.streaming:
+            response.streaming_content = read_only_iterator(response.streaming_content)
+        return response
+
+
+class ReadOnlyRouter:
+    """
+    Route the reads in ``read_only_database`` blocks to the read-only database.
+    """
+    def get_read_only_alias(self):
+        return getattr(settings, "ROCDATA_READ_ONLY_DATABASE", None)
+
+    def db_for_read(self, model, **hints):
+        alias = self.get_read_only_alias()
+        if alias is not None and _read_only.get():
+            return alias
+        return None
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # both aliases are the same database
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db != self.get_read_only_alias()
@@ -0,0 +1,127 @@
+import uuid
+
+from standards.renderers import json_dumps
+
+
+
+# JSON ENCODING
+################################################################################
+
+def dumps(data):
+    """
+    Encode `data` as compact JSON text, the same way the API's JSON renderer does.
+    """
+    return json_dumps(data).decode('utf-8')
+
+
+
+# STREAMING LISTS
+################################################################################
+
+STREAM_CHUNK_SIZE = 500
+STREAM_BUFFER_SIZE = 64 * 1024     # characters sent to the server per write
+
+
+def iter_queryset_chunks(queryset, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yield lists of at most `chunk_size` objects from `queryset` in ``pk`` order.
+    Each chunk is a separate keyset query (``pk > last_pk``) so the prefetches
+    of `queryset` are applied per chunk and only one chunk is in memory.
+    """
+    queryset = queryset.order_by('pk')
+    last_pk = None
+    while True:
+        chunk_queryset = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        chunk = list(chunk_queryset[:chunk_size])
+        if chunk:
+            yield chunk
+        if len(chunk) < chunk_size:
+            break
+        last_pk = chunk[-1].pk
+
+
+def stream_json_array(datas):
+    """
+    Yield the JSON text of the list of dicts `datas` (any iterable) in pieces.
+    """
+    yield '['
+    for i, data in enumerate(datas):
+        if i > 0:
+            yield ','
+        yield dumps(data)
+    yield ']'
+
+
+def iter_buffered(pieces, buffer_size=STREAM_BUFFER_SIZE):
+    """
+    Join the small strings in `pieces` into chunks of about `buffer_size`.
+    """
+    buffer, length = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        length += len(piece)
+        if length >= buffer_size:
+            yield ''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+
+# STREAMING TREES
+################################################################################
+
+def new_children_placeholder():
+    """
+    Return a unique string to use as the value of ``children`` in the data that
+    is passed to ``stream_json_tree`` (the nested children are streamed there).
+    """
+    return 'children-' + uuid.uuid4().hex
+
+
+def split_at_placeholder(data, placeholder):
+    """
+    Return the JSON text of `data` before and after the `placeholder` value,
+    or the whole JSON text and None if `data` doesn't contain `placeholder`.
+    """
+    parts = dumps(data).split(dumps(placeholder), 1)
+    if len(parts) == 1:
+        return parts[0], None
+    prefix, suffix = parts
+    return prefix, suffix
+
+
+def stream_json_tree(data, nodes, serialize_node, placeholder):
+    """
+    Yield the JSON text of the tree with top-level `data` and all the MPTT
+    `nodes` below it (any iterable in tree order, i.e. sorted by ``lft``).
+    The ``children`` of `data` and of the dicts returned by `serialize_node(node)`
+    must be `placeholder`, where the JSON list of their children is inserted.
+    Nodes without `placeholder` (e.g. boundary nodes of depth-limited trees)
+    are output as is, and so is `data` (without any nodes). Only the JSON
+    suffixes of the current ancestors are kept.
+    """
+    prefix, suffix = split_at_placeholder(data, placeholder)
+    if suffix is None:
+        yield prefix
+        return
+    yield prefix + '['
+    # stack of [rght, json suffix, is_empty] of the open lists of children
+    stack = [[float('inf'), suffix, True]]
+    for node in nodes:
+        while stack[-1][0] < node.lft:
+            yield ']' + stack.pop()[1]
+        parent = stack[-1]
+        if not parent[2]:
+            yield ','
+        parent[2] = False
+        node_prefix, node_suffix = split_at_placeholder(serialize_node(node), placeholder)
+        if node_suffix is None:
+            yield node_prefix
+        elif node.rght == node.lft + 1:
+            yield node_prefix + '[]' + node_suffix     # leaf node
+        else:
+            yield node_prefix + '['
+            stack.append([node.rght, node_suffix, True])
+    while stack:
+        yield ']' + stack.pop()[1]
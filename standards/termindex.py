@@ -0,0 +1,101 @@
+import threading
+import uuid
+
+from django.db import transaction
+
+from standards.caching import defer_invalidation, get_generation_cache
+from standards.models import Term
+
+
+
+# TERM INDEX
+################################################################################
+# Terms are referenced by most ROC objects but change only when vocabularies are
+# (re)loaded. The process-wide ``TermIndex`` maps the natural keys of all terms
+# (jurisdiction name, vocabulary name, path) to their ids and back, so that Term
+# hyperlinks are resolved and rendered with dictionary lookups. The index is
+# loaded lazily with one query and reloaded when the version stamp in the
+# generation cache changes, which happens on every save or delete of a term,
+# vocabulary, or jurisdiction (see ``standards.signals``).
+
+TERM_INDEX_VERSION_KEY = "roc:termindex:version"
+
+
+class TermIndex:
+    """
+    Snapshot of the natural keys and ids of all the terms for version `version`.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.ids_by_key = {}
+        self.keys_by_id = {}
+        rows = Term._base_manager.values_list(
+            "id", "vocabulary__jurisdiction__name", "vocabulary__name", "path")
+        for term_id, jurisdiction_name, vocabulary_name, path in rows.iterator():
+            key = (jurisdiction_name, vocabulary_name, path)
+            self.ids_by_key[key] = term_id
+            self.keys_by_id[term_id] = key
+
+    def get_id(self, jurisdiction_name, vocabulary_name, path):
+        """
+        Return the id of the term with this natural key, or None if not found.
+        """
+        return self.ids_by_key.get((jurisdiction_name, vocabulary_name, path))
+
+    def get_key(self, term_id):
+        """
+        Return the (jurisdiction name, vocabulary name, path) of the term with
+        id `term_id`, or None if not found.
+        """
+        return self.keys_by_id.get(term_id)
+
+
+_term_index = None
+_term_index_lock = threading.Lock()
+
+
+def get_term_index_version():
+    cache = get_generation_cache()
+    version = cache.get(TERM_INDEX_VERSION_KEY)
+    if version is None:
+        cache.add(TERM_INDEX_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(TERM_INDEX_VERSION_KEY)
+    return version
+
+
+def get_term_index(request=None):
+    """
+    Return the current ``TermIndex``, reloading it if the version changed. When
+    `request` is given, the version is checked only once per request.
+    """
+    global _term_index
+    index = getattr(request, "_roc_term_index", None)
+    if index is not None:
+        return index
+    version = get_term_index_version()
+    index = _term_index
+    if index is None or index.version != version:
+        with _term_index_lock:
+            index = _term_index
+            if index is None or index.version != version:
+                index = _term_index = TermIndex(version)
+    if request is not None:
+        request._roc_term_index = index
+    return index
+
+
+def bump_term_index_version():
+    get_generation_cache().set(TERM_INDEX_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def invalidate_term_index():
+    """
+    Make all processes reload the term index. Like ``invalidate_tags``, the
+    version is bumped right away and again after the current transaction commits
+    (or once at the end of a ``deferred_invalidation`` block).
+    """
+    if defer_invalidation(invalidate_term_index):
+        return
+    bump_term_index_version()
+    transaction.on_commit(bump_term_index_version)
@@ -1,8 +1,36 @@
 import pytest
 
+from django.core.cache import cache, caches
+
 from standards.models import Jurisdiction, UserProfile
 
 from standards.models import ControlledVocabulary, Term, TermRelation
+from standards.models import StandardsDocument, StandardNode
+from standards.models import ContentCollection, ContentNode, ContentCorrelation
+from standards.utils import DefaultTerm
+
+@pytest.fixture(autouse=True)
+def response_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "rocgenerations": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "generations"},
+    }
+    cache.clear()
+    caches["rocgenerations"].clear()
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def read_only_database(settings):
+    # a read-only connection wouldn't see the data of the test transactions
+    settings.ROCDATA_READ_ONLY_DATABASE = None
+
+
+@pytest.fixture(autouse=True)
+def default_terms():
+    # the memoized default terms may be from a rolled back test transaction
+    DefaultTerm.reset_all()
+
 
 @pytest.fixture
 def juri():
@@ -32,3 +60,66 @@ def vocabterms(vocab):
     b2  = Term.objects.create(path='B2', label='Basic 2', vocabulary=vocab)
     b22 = Term.objects.create(path='B2/2', label='Basic 2.2', vocabulary=vocab)
     return dict(b1=b1, b2=b2, b22=b22)
+
+
+@pytest.fixture
+def doc(juri):
+    doc = StandardsDocument(
+        name='GH.Math',
+        title='Ghana Mathematics Curriculum',
+        jurisdiction=juri,
+        digitization_method='manual_entry',
+    )
+    doc.save()
+    return doc
+
+
+@pytest.fixture
+def docnodes(doc):
+    root = StandardNode.objects.create(document=doc, description='HIDDEN ROOT')
+    nodes = dict(root=root)
+    for i in range(1, 4):
+        strand = StandardNode.objects.create(
+            document=doc, parent=root, sort_order=float(i),
+            notation='B1.{}'.format(i), description='Strand {}'.format(i))
+        nodes['s{}'.format(i)] = strand
+        for j in range(1, 3):
+            nodes['s{}{}'.format(i, j)] = StandardNode.objects.create(
+                document=doc, parent=strand, sort_order=float(j),
+                notation='B1.{}.{}'.format(i, j), description='Substrand {}.{}'.format(i, j))
+    return nodes
+
+
+@pytest.fixture
+def collection(juri):
+    collection = ContentCollection(
+        jurisdiction=juri,
+        name='GhanaMathsVideos',
+        title='Ghana Maths Videos',
+        language='en',
+        import_method='manual_entry',
+    )
+    collection.save()
+    return collection
+
+
+@pytest.fixture
+def contentnodes(collection):
+    root = ContentNode.objects.create(collection=collection, title='Videos')
+    nodes = dict(root=root)
+    for i in range(1, 4):
+        nodes['c{}'.format(i)] = ContentNode.objects.create(
+            collection=collection, parent=root, sort_order=float(i),
+            title='Video {}'.format(i), source_domain='example.org', source_id=str(i))
+    return nodes
+
+
+@pytest.fixture
+def correlation(juri):
+    correlation = ContentCorrelation(
+        jurisdiction=juri,
+        title='Ghana Maths Videos to Ghana Maths Curriculum',
+        digitization_method='api_created',
+    )
+    correlation.save()
+    return correlation
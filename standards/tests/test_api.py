@@ -1,6 +1,14 @@
+import json
+
 import pytest
 
 from bs4 import BeautifulSoup
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from standards.models import ContentNode, StandardNode
+
+from .test_trees import add_grandchildren, count_queries
 
 TEST_SERVER_HOST = "http://testserver"
 
@@ -77,3 +85,107 @@ def test_get_json_endpoints(juri, vocab, vocabterms, client):
     assert data['path'] == term.path
     assert term.uri in data['uri']
     assert data['label'] == term.label
+
+
+@pytest.mark.django_db
+def test_list_endpoints_paginate(juri, vocab, vocabterms, client):
+    response = client.get('/Ghana/terms/GradeLevels/.json?page_size=2')
+    data = response.json()
+    assert data['count'] == 3
+    assert len(data['results']) == 2
+    assert data['previous'] is None
+    assert data['next'].startswith(TEST_SERVER_HOST + '/Ghana/terms/GradeLevels/')
+    assert 'page=2' in data['next']
+    #
+    response = client.get(data['next'][len(TEST_SERVER_HOST):])
+    data2 = response.json()
+    assert len(data2['results']) == 1
+    assert data2['next'] is None
+    assert 'page=' not in data2['previous']
+    paths = [term['path'] for term in data['results'] + data2['results']]
+    assert sorted(paths) == ['B1', 'B2', 'B2/2']
+
+
+@pytest.mark.django_db
+def test_list_endpoints_stream(juri, vocab, vocabterms, client):
+    response = client.get('/Ghana/terms/GradeLevels/.json?stream=true')
+    assert response.streaming
+    content = b''.join(response.streaming_content)
+    data = json.loads(content.decode('utf-8'))
+    assert len(data) == 3
+    for term_data in data:
+        assert term_data['uri'].startswith(TEST_SERVER_HOST + '/Ghana/terms/GradeLevels/')
+        assert term_data['jurisdiction'] == TEST_SERVER_HOST + juri.uri
+
+
+@pytest.mark.django_db
+def test_tree_cursor_pagination(juri, doc, docnodes, client):
+    expected_ids = list(StandardNode.objects.order_by('tree_id', 'lft').values_list('id', flat=True))
+    assert len(expected_ids) == 10
+    seen_ids = []
+    url = '/Ghana/standardnodes.json?page_size=3'
+    while url:
+        data = client.get(url).json()
+        assert 'count' not in data
+        assert len(data['results']) <= 3
+        seen_ids.extend(node['id'] for node in data['results'])
+        url = data['next'][len(TEST_SERVER_HOST):] if data['next'] else None
+    assert seen_ids == expected_ids
+    #
+    # walk back using the previous links from the last page
+    previous_ids = []
+    while data['previous']:
+        data = client.get(data['previous'][len(TEST_SERVER_HOST):]).json()
+        previous_ids = [node['id'] for node in data['results']] + previous_ids
+    assert previous_ids == expected_ids[:len(previous_ids)]
+    assert len(previous_ids) == 9
+
+
+@pytest.mark.django_db
+def test_tree_cursor_pagination_insert_before_cursor(juri, doc, docnodes, client):
+    data = client.get('/Ghana/standardnodes.json?page_size=3').json()
+    assert data['results'][-1]['id'] == docnodes['s11'].id
+    # inserted before the boundary row of the cursor, which renumbers its lft
+    StandardNode.objects.create(document=doc, parent=docnodes['s1'], sort_order=0.5, description='New')
+    next_url = data['next'][len(TEST_SERVER_HOST):]
+    next_ids = [node['id'] for node in client.get(next_url).json()['results']]
+    assert next_ids == [docnodes['s12'].id, docnodes['s2'].id, docnodes['s21'].id]
+    # the stored position is used once the boundary row is deleted
+    StandardNode.objects.get(pk=docnodes['s11'].pk).delete()
+    next_ids = [node['id'] for node in client.get(next_url).json()['results']]
+    assert next_ids[0] == docnodes['s12'].id
+
+
+@pytest.mark.django_db
+def test_tree_cursor_pagination_invalid_cursor(juri, doc, docnodes, client):
+    response = client.get('/Ghana/standardnodes.json?cursor=notacursor')
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_node_endpoints_constant_queries(doc, docnodes, contentnodes, vocabterms, client, settings):
+    settings.ROCDATA_RESPONSE_CACHE = None
+    assert StandardNode.objects.all()._prefetch_related_lookups == ()
+    docnodes['s1'].education_levels.add(vocabterms['b1'])
+    urls = [
+        '/Ghana/standardnodes.json',
+        '/Ghana/standardnodes/{}.json'.format(docnodes['s1'].id),
+        '/Ghana/contentnodes.json',
+    ]
+    counts = []
+    for url in urls:
+        with CaptureQueriesContext(connection) as ctx:
+            client.get(url)
+        counts.append(count_queries(ctx))
+    add_grandchildren(docnodes, [vocabterms['b1'], vocabterms['b2']])
+    for i in range(3):
+        ContentNode.objects.create(collection=contentnodes['c1'].collection, parent=contentnodes['c{}'.format(i + 1)],
+                                   title='Clip {}'.format(i), source_domain='example.org', source_id='c' + str(i))
+    for url, count in zip(urls, counts):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert count_queries(ctx) == count, url
+    data = client.get(urls[0]).json()['results']
+    assert len(data) == 10 + 18
+    assert all(node['parent'].startswith('http://testserver/Ghana/standardnodes/') for node in data[1:])
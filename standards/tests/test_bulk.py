@@ -0,0 +1,109 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from standards.models import ContentStandardRelation, ControlledVocabulary, Jurisdiction, StandardNode, Term
+from standards.termindex import get_term_index
+
+from .test_trees import count_queries
+
+BULK_URL = '/Ghana/contentstandardrels/bulk'
+
+
+def make_rows(correlation, contentnodes, standardnodes, kind=None):
+    rows = []
+    for contentnode in contentnodes:
+        for standardnode in standardnodes:
+            row = {
+                'correlation': 'http://testserver' + correlation.uri,
+                'contentnode': contentnode.uri,
+                'standardnode': 'http://testserver' + standardnode.uri,
+            }
+            if kind is not None:
+                row['kind'] = kind.uri
+            rows.append(row)
+    return rows
+
+
+@pytest.mark.django_db
+def test_bulk_create(docnodes, contentnodes, correlation, vocabterms, client):
+    contentnodes = [contentnodes[name] for name in ['c1', 'c2', 'c3']]
+    standardnodes = [docnodes[name] for name in ['s11', 's12', 's21', 's22']]
+    rows = make_rows(correlation, contentnodes, standardnodes, kind=vocabterms['b1'])
+    response = client.post(BULK_URL, rows, content_type='application/json')
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert [result['status'] for result in results] == ['created'] * 12
+    assert results[0]['uri'].startswith('http://testserver/Ghana/contentstandardrels/CSR')
+    relations = ContentStandardRelation.objects.filter(correlation=correlation)
+    assert relations.count() == 12
+    relation = relations.get(id=results[5]['id'])
+    assert relation.contentnode_id == contentnodes[1].id
+    assert relation.standardnode_id == standardnodes[1].id
+    assert relation.kind_id == vocabterms['b1'].id
+    #
+    rows[5]['notes'] = 'Checked'
+    rows.append(make_rows(correlation, contentnodes[:1], [docnodes['s31']])[0])
+    response = client.post(BULK_URL, rows, content_type='application/json')
+    results = response.json()['results']
+    assert [result['status'] for result in results] == ['updated'] * 12 + ['created']
+    assert relations.count() == 13
+    relation = relations.get(id=results[5]['id'])
+    assert relation.notes == 'Checked'
+    assert relation.kind_id == vocabterms['b1'].id
+    assert relations.get(id=results[12]['id']).kind_id is None     # no default kind in the test db
+
+
+@pytest.mark.django_db
+def test_bulk_create_query_count(doc, docnodes, contentnodes, correlation, vocabterms, client):
+    contentnodes = [contentnodes[name] for name in ['c1', 'c2', 'c3']]
+    standardnodes = [docnodes[name] for name in ['s11', 's12', 's21', 's22']]
+    rows = make_rows(correlation, contentnodes[:1], standardnodes[:1], kind=vocabterms['b1'])
+    get_term_index()    # loaded once per version of the terms
+    with CaptureQueriesContext(connection) as ctx:
+        client.post(BULK_URL, rows, content_type='application/json')
+    for i in range(20):
+        StandardNode.objects.create(document=doc, parent=docnodes['s3'], description='Node {}'.format(i))
+    standardnodes = StandardNode.objects.filter(parent=docnodes['s3'])
+    rows = make_rows(correlation, contentnodes, standardnodes, kind=vocabterms['b1'])
+    with CaptureQueriesContext(connection) as many_ctx:
+        response = client.post(BULK_URL, rows, content_type='application/json')
+    assert len(response.json()['results']) == len(rows) == 66
+    assert count_queries(many_ctx) == count_queries(ctx)
+
+
+@pytest.mark.django_db
+def test_bulk_create_errors(docnodes, contentnodes, correlation, vocabterms, client):
+    rows = make_rows(correlation, [contentnodes['c1'], contentnodes['c2']], [docnodes['s11']])
+    rows.append(dict(rows[0]))                                      # duplicate
+    rows.append(dict(rows[0], contentnode='/Ghana/contentnodes/Cnotanode'))
+    rows.append(dict(rows[0], standardnode=contentnodes['c1'].uri))    # wrong kind of object
+    rows.append({'correlation': rows[0]['correlation']})
+    response = client.post(BULK_URL, rows, content_type='application/json')
+    assert response.status_code == 400
+    results = response.json()['results']
+    assert [result['status'] for result in results] == ['valid', 'valid', 'error', 'error', 'error', 'error']
+    assert 'non_field_errors' in results[2]['errors']
+    assert list(results[3]['errors']) == ['contentnode']
+    assert list(results[4]['errors']) == ['standardnode']
+    assert set(results[5]['errors']) == {'contentnode', 'standardnode'}
+    assert ContentStandardRelation.objects.count() == 0
+    #
+    response = client.post(BULK_URL, {'not': 'a list'}, content_type='application/json')
+    assert response.status_code == 400
+    response = client.post(BULK_URL.replace('Ghana', 'Kenya'), rows[:2], content_type='application/json')
+    assert response.status_code == 400
+    assert 'correlation' in response.json()['results'][0]['errors']
+
+
+@pytest.mark.django_db
+def test_bulk_create_default_kind(docnodes, contentnodes, correlation, client):
+    global_juri = Jurisdiction.objects.create(name='Global', display_name='Global')
+    kinds = ControlledVocabulary.objects.create(
+        name='ContentStandardRelationKinds', label='Relation kinds', jurisdiction=global_juri)
+    major = Term.objects.create(path='majorCorrelation', label='Major correlation', vocabulary=kinds)
+    rows = make_rows(correlation, [contentnodes['c1']], [docnodes['s11'], docnodes['s12']])
+    response = client.post(BULK_URL, rows, content_type='application/json')
+    assert response.status_code == 200
+    assert set(ContentStandardRelation.objects.values_list('kind_id', flat=True)) == {major.id}
@@ -0,0 +1,156 @@
+import json
+
+import pytest
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from standards.caching import deferred_invalidation
+from standards.models import StandardNode, Term
+from standards.termindex import get_term_index
+from standards.warmup import warm_up
+
+from .test_trees import count_queries
+
+
+@pytest.mark.django_db
+def test_cached_response(doc, docnodes, vocabterms, client):
+    url = '/Ghana/documents/{}/full.json'.format(doc.id)
+    response = client.get(url)
+    assert response.status_code == 200
+    with CaptureQueriesContext(connection) as ctx:
+        cached_response = client.get(url)
+    assert count_queries(ctx) == 0
+    assert cached_response.content == response.content
+    assert cached_response['Content-Type'] == response['Content-Type']
+    assert cached_response['ETag'] == response['ETag']
+    #
+    not_modified_response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert not_modified_response.status_code == 304
+    assert client.get(url + '?depth=1').content != response.content
+
+
+@pytest.mark.django_db
+def test_cached_response_compressed(doc, docnodes, client, settings, caplog):
+    settings.ROCDATA_RESPONSE_CACHE_COMPRESS_MIN_SIZE = 100
+    url = '/Ghana/documents/{}/full.json'.format(doc.id)
+    response = client.get(url)
+    with CaptureQueriesContext(connection) as ctx:
+        assert client.get(url).content == response.content
+    assert count_queries(ctx) == 0
+    #
+    settings.ROCDATA_RESPONSE_CACHE_MAX_SIZE = 100
+    url = '/Ghana/documents/{}.json'.format(doc.id)
+    assert client.get(url).status_code == 200
+    assert 'not cached' in caplog.text
+    with CaptureQueriesContext(connection) as ctx:
+        assert client.get(url).status_code == 200
+    assert count_queries(ctx) > 0
+
+
+@pytest.mark.django_db
+def test_cache_invalidation_on_save(doc, docnodes, vocabterms, client):
+    node = StandardNode.objects.get(pk=docnodes['s21'].pk)
+    urls = [
+        '/Ghana/documents/{}/full.json'.format(doc.id),
+        '/Ghana/standardnodes/{}.json'.format(docnodes['s2'].id),
+        '/Ghana/standardnodes/{}.json'.format(node.id),
+        '/Ghana/standardnodes.json',
+    ]
+    for url in urls:
+        client.get(url)
+    node.description = 'Changed'
+    node.save()
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(urls[1])     # the parent node (links to its children)
+    assert count_queries(ctx) > 0
+    after = [client.get(url).content for url in urls]
+    assert all(b'Changed' in content for content in after[:1] + after[2:])
+    #
+    node.subjects.add(vocabterms['b1'])
+    assert client.get(urls[0]).content != after[0]
+    #
+    unrelated_url = '/Ghana/standardnodes/{}.json'.format(docnodes['s1'].id)
+    response = client.get(unrelated_url)
+    node.delete()
+    with CaptureQueriesContext(connection) as ctx:
+        assert client.get(unrelated_url).content == response.content
+    assert count_queries(ctx) == 0
+    assert client.get(urls[2]).status_code == 404
+
+
+@pytest.mark.django_db
+def test_cache_invalidation_on_loaddata(doc, docnodes, client, tmp_path):
+    node = docnodes['s11']
+    url = '/Ghana/standardnodes/{}.json'.format(node.id)
+    assert client.get(url).json()['description'] == node.description
+    fixture = tmp_path / 'fixture.json'
+    call_command('dumpdata', 'standards.standardnode', pks=str(node.pk), output=str(fixture))
+    data = json.loads(fixture.read_text())
+    data[0]['fields']['description'] = 'FROM FIXTURE'
+    fixture.write_text(json.dumps(data))
+    call_command('loaddata', str(fixture), verbosity=0)
+    assert client.get(url).json()['description'] == 'FROM FIXTURE'
+
+
+@pytest.mark.django_db
+def test_deferred_invalidation(doc, docnodes, vocab, client):
+    node = StandardNode.objects.get(pk=docnodes['s11'].pk)
+    url = '/Ghana/standardnodes/{}.json'.format(node.id)
+    node.description = 'Changed once'
+    with CaptureQueriesContext(connection) as ctx:
+        node.save()
+    save_queries = count_queries(ctx)
+    assert client.get(url).json()['description'] == 'Changed once'
+    with deferred_invalidation():
+        node.description = 'Changed twice'
+        with CaptureQueriesContext(connection) as ctx:
+            node.save()
+        assert count_queries(ctx) == 0 < save_queries     # no queries of the saved version and the tags
+        assert client.get(url).json()['description'] == 'Changed once'
+        index = get_term_index()
+        term = Term.objects.create(path='B9', label='Basic 9', vocabulary=vocab)
+        assert get_term_index() is index
+    assert client.get(url).json()['description'] == 'Changed twice'
+    assert get_term_index().get_key(term.id) == ('Ghana', 'GradeLevels', 'B9')
+
+
+@pytest.mark.django_db
+def test_cache_invalidation_of_term_uris(doc, docnodes, vocabterms, client):
+    node = docnodes['s11']
+    node.education_levels.add(vocabterms['b2'])
+    url = '/Ghana/standardnodes/{}.json'.format(node.id)
+    assert b'/terms/GradeLevels/B2' in client.get(url).content
+    term = Term.objects.get(pk=vocabterms['b2'].pk)
+    term.path = 'Basic2'
+    term.save()
+    assert b'/terms/GradeLevels/Basic2' in client.get(url).content
+
+
+@pytest.mark.django_db
+def test_browsable_api_not_cached(doc, docnodes, client):
+    url = '/Ghana/documents/{}?format=api'.format(doc.id)
+    assert client.get(url).status_code == 200
+    with CaptureQueriesContext(connection) as ctx:
+        assert client.get(url).status_code == 200
+    assert count_queries(ctx) > 0
+
+
+@pytest.mark.django_db
+def test_cache_disabled(doc, docnodes, client, settings):
+    settings.ROCDATA_RESPONSE_CACHE = None
+    url = '/Ghana/documents/{}.json'.format(doc.id)
+    client.get(url)
+    with CaptureQueriesContext(connection) as ctx:
+        assert client.get(url).status_code == 200
+    assert count_queries(ctx) > 0
+
+
+@pytest.mark.django_db
+def test_warm_up(doc, docnodes, collection, contentnodes, client):
+    assert warm_up('http://testserver') == 8
+    with CaptureQueriesContext(connection) as ctx:
+        for url in ['/Ghana/documents/{}/full.json'.format(doc.id), '/Ghana/contentcollections/{}.html'.format(collection.id)]:
+            assert client.get(url).status_code == 200
+    assert count_queries(ctx) == 0
@@ -1,11 +1,13 @@
 
 import json
+from unittest import mock
 
 from django.core import exceptions, serializers
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
 from django.test import (
     SimpleTestCase, TestCase, TransactionTestCase, skipUnlessDBFeature,
 )
+from django.test.utils import CaptureQueriesContext
 
 
 from standards.tests.models import (
@@ -203,6 +205,37 @@ class TestAsPrimaryKey(TestCase):
 
 
 
+class TestBulkAllocation(TestCase):
+    def test_allocate_values(self):
+        field = CharIdModelWithPrefix._meta.get_field('field')
+        with self.assertNumQueries(1):
+            values = field.allocate_values(50)
+        self.assertEqual(len(set(values)), 50)
+        self.assertTrue(all(len(value) == 10 and value.startswith('WP') for value in values))
+
+    def test_allocate_values_retries_collisions(self):
+        field = PrimaryKeyCharIdModel._meta.get_field('id')
+        PrimaryKeyCharIdModel.objects.create(id='taken1')
+        PrimaryKeyCharIdModel.objects.create(id='taken2')
+        candidates = iter(['taken1', 'new1', 'taken2', 'new1', 'new2', 'new3', 'new4'])
+        with mock.patch.object(field, 'new_random_value', side_effect=lambda: next(candidates)):
+            with self.assertNumQueries(2):
+                values = field.allocate_values(4)
+        self.assertEqual(sorted(values), ['new1', 'new2', 'new3', 'new4'])
+
+    def test_bulk_create_with_assigned_values(self):
+        field = PrimaryKeyCharIdModel._meta.get_field('id')
+        instances = [PrimaryKeyCharIdModel() for _ in range(1000)] + [PrimaryKeyCharIdModel(id='manual')]
+        with self.assertNumQueries(2):
+            field.assign_values(instances)
+        self.assertEqual(instances[-1].id, 'manual')
+        with CaptureQueriesContext(connection) as ctx:
+            PrimaryKeyCharIdModel.objects.bulk_create(instances)
+        self.assertTrue(all(q['sql'].startswith('INSERT') for q in ctx.captured_queries))
+        self.assertEqual(PrimaryKeyCharIdModel.objects.count(), 1001)
+
+
+
 class TestAsPrimaryKeyTransactionTests(TransactionTestCase):
     # Need a TransactionTestCase to avoid deferring FK constraint checking.
 
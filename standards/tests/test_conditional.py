@@ -0,0 +1,108 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from standards.models import StandardNode
+
+
+@pytest.mark.django_db
+def test_document_etag(doc, docnodes, vocabterms, client):
+    url = '/Ghana/documents/{}.json'.format(doc.id)
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response['ETag']
+    assert response['Last-Modified']
+    #
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+    assert response.content == b''
+    #
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+    assert response.status_code == 304
+    #
+    response = client.get('/Ghana/documents/{}'.format(doc.id), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200     # different format
+    response = client.get('/Ghana/documents/{}/full.json'.format(doc.id), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200     # different resource
+
+
+@pytest.mark.django_db
+def test_document_etag_changes_with_nodes(doc, docnodes, vocabterms, client):
+    url = '/Ghana/documents/{}/full.json'.format(doc.id)
+    etags = [client.get(url)['ETag']]
+    #
+    node = StandardNode.objects.get(pk=docnodes['s21'].pk)
+    node.description = 'Changed'
+    node.save()
+    etags.append(client.get(url)['ETag'])
+    #
+    node.subjects.add(vocabterms['b1'])
+    etags.append(client.get(url)['ETag'])
+    #
+    StandardNode.objects.get(pk=docnodes['s32'].pk).delete()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etags[-1])
+    assert response.status_code == 200
+    etags.append(response['ETag'])
+    assert len(set(etags)) == 4
+
+
+@pytest.mark.django_db
+def test_list_etag(juri, vocab, vocabterms, client):
+    url = '/Ghana/terms/GradeLevels/.json'
+    response = client.get(url)
+    etag = response['ETag']
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert client.get(url + '?page=2', HTTP_IF_NONE_MATCH=etag).status_code != 304
+    vocabterms['b2'].label = 'Basic Two'
+    vocabterms['b2'].save()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_node_list_etag_from_page(doc, docnodes, client):
+    url = '/Ghana/standardnodes.json?page_size=2'
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    rollups = [query['sql'] for query in ctx.captured_queries if query['sql'].startswith('SELECT MAX(')]
+    assert len(rollups) == 1 and '"parent_id" IN (' in rollups[0]    # only the children of the page
+    etag = response['ETag']
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    next_url = response.json()['next']
+    assert client.get(next_url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+    node = StandardNode.objects.get(pk=response.json()['results'][1]['id'])
+    node.description = 'Changed'
+    node.save()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+    # changes of the nodes on other pages don't change the ETag of the page
+    etag = client.get(url)['ETag']
+    last_node = StandardNode.objects.get(pk=docnodes['s32'].pk)
+    last_node.description = 'Changed'
+    last_node.save()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+
+@pytest.mark.django_db
+def test_node_list_etag_children(doc, docnodes, client):
+    url = '/Ghana/standardnodes.json?page_size=3'
+    response = client.get(url)
+    assert response.json()['results'][-1]['id'] == docnodes['s11'].id
+    assert response.json()['results'][-1]['children'] == []
+    etag = response['ETag']
+    # the new child is the first node of the next page
+    child = StandardNode.objects.create(document=doc, parent=docnodes['s11'], description='New child')
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert len(response.json()['results'][-1]['children']) == 1
+    assert response.json()['next'] and client.get(response.json()['next']).json()['results'][0]['id'] == child.id
+    etag = response['ETag']
+    child.delete()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_no_etag_without_date_modified(juri, client):
+    response = client.get('/Ghana.json')
+    assert response.status_code == 200
+    assert not response.has_header('ETag')
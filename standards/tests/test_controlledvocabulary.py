@@ -1,10 +1,12 @@
 import django
 import pytest
 
+from django.core.management import call_command
 
 from standards.models import ControlledVocabulary, jurisdictions
 from standards.models.terms import Term
 from standards.models.terms import TermRelation, TERM_REL_KINDS
+from standards.termindex import get_term_index
 
 
 # VOCABS
@@ -58,3 +60,31 @@ def test_terms_relation(juri, vocab):
     rel12 = TermRelation(source=b1, kind=TERM_REL_KINDS.related, target=b2, jurisdiction=juri)
     rel12.save()
     assert rel12.id
+
+
+@pytest.mark.django_db
+def test_loadterms(juri, client, tmp_path):
+    path = tmp_path / 'GradeLevels.yml'
+    path.write_text(
+        'type: ControlledVocabulary\n'
+        'jurisdiction: Ghana\n'
+        'country: GH\n'
+        'name: GradeLevels\n'
+        'terms:\n'
+        '  - term: B1\n'
+        '    label: Basic 1\n'
+        '    definition: First grade\n'
+        '    children:\n'
+        '      - term: T1\n'
+        '        label: Term 1\n'
+        '  - term: B2\n'
+    )
+    assert client.get('/Ghana/terms/GradeLevels/B1.json').status_code == 404
+    call_command('loadterms', str(path))
+    terms = Term.objects.filter(vocabulary__name='GradeLevels').order_by('path')
+    assert [(t.path, t.label, t.sort_order) for t in terms] == [
+        ('B1', 'Basic 1', 1.0), ('B1/T1', 'Term 1', 1.0), ('B2', 'B2', 2.0)]
+    assert all(t.id.startswith('T') and t.date_created for t in terms)
+    assert terms[0].definition == 'First grade'
+    assert client.get('/Ghana/terms/GradeLevels/B1.json').json()['label'] == 'Basic 1'
+    assert get_term_index().get_id('Ghana', 'GradeLevels', 'B1/T1') == terms[1].id
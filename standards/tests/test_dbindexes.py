@@ -0,0 +1,30 @@
+import pytest
+
+from django.db import connection
+
+from standards.dbindexes import POSTGRES_INDEXES
+from standards.models import ContentNode, StandardNode
+
+
+def get_indexes(table_name):
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table_name)
+    return {name: c for name, c in constraints.items() if c['index']}
+
+
+@pytest.mark.django_db
+def test_tree_indexes():
+    for model in [StandardNode, ContentNode]:
+        indexes = get_indexes(model._meta.db_table)
+        assert ['tree_id', 'lft'] in [index['columns'] for index in indexes.values()]
+
+
+@pytest.mark.django_db
+def test_postgres_indexes():
+    tables = connection.introspection.table_names()
+    for definition in POSTGRES_INDEXES.values():
+        assert definition.split()[1] in tables
+    if connection.vendor != 'postgresql':
+        pytest.skip('PostgreSQL-only indexes')
+    for name, definition in POSTGRES_INDEXES.items():
+        assert name in get_indexes(definition.split()[1])
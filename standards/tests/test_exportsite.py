@@ -0,0 +1,46 @@
+import gzip
+import json
+
+import pytest
+
+from django.core.management import call_command
+
+from standards.models import StandardNode
+
+
+@pytest.mark.django_db
+def test_exportsite(doc, docnodes, vocabterms, tmp_path):
+    call_command('exportsite', str(tmp_path), '--context', 'w3id.org', '--processes', '1')
+    node = docnodes['s11']
+    node_file = tmp_path / 'Ghana' / 'standardnodes' / (node.id + '.json')
+    data = json.loads(node_file.read_bytes())
+    assert data['uri'] == 'https://w3id.org/rocdata' + node.uri
+    assert data['jurisdiction'] == 'https://w3id.org/rocdata/Ghana'
+    assert data['document'] == 'https://w3id.org/rocdata' + doc.uri
+    assert data['parent'] == 'https://w3id.org/rocdata' + docnodes['s1'].uri
+    assert gzip.decompress((tmp_path / 'Ghana' / 'standardnodes' / (node.id + '.json.gz')).read_bytes()) \
+        == node_file.read_bytes()
+    assert (tmp_path / 'Ghana' / 'standardnodes' / (node.id + '.html')).exists()
+    assert (tmp_path / 'Ghana' / 'terms' / 'GradeLevels' / 'B2' / '2.json').exists()
+    assert (tmp_path / 'Ghana.html').exists()
+    full_data = json.loads((tmp_path / 'Ghana' / 'documents' / doc.id / 'full.json').read_bytes())
+    assert len(full_data['children']) == 3
+    #
+    other_node = docnodes['s31']
+    other_node_file = tmp_path / 'Ghana' / 'standardnodes' / (other_node.id + '.json')
+    other_node_file.write_bytes(b'unchanged')
+    node = StandardNode.objects.get(pk=node.pk)
+    node.description = 'Changed'
+    node.save()
+    deleted_node = docnodes['s22']
+    deleted_node_id, deleted_node_uri = deleted_node.id, deleted_node.uri
+    deleted_node.delete()
+    call_command('exportsite', str(tmp_path), '--context', 'w3id.org', '--processes', '1', '--incremental')
+    assert json.loads(node_file.read_bytes())['description'] == 'Changed'
+    assert other_node_file.read_bytes() == b'unchanged'
+    assert not (tmp_path / 'Ghana' / 'standardnodes' / (deleted_node_id + '.json')).exists()
+    manifest = json.loads((tmp_path / '.exportmanifest.json').read_bytes())
+    assert deleted_node_uri not in manifest['resources']
+    #
+    call_command('exportsite', str(tmp_path), '--context', 'w3id.org', '--processes', '1')
+    assert other_node_file.read_bytes() != b'unchanged'
@@ -0,0 +1,97 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from standards.models import ControlledVocabulary, Term
+from standards.tests.test_trees import count_queries
+
+
+@pytest.fixture
+def subjects(juri):
+    vocab = ControlledVocabulary.objects.create(name='Subjects', label='Subjects', kind='subjects', jurisdiction=juri)
+    return dict(
+        maths=Term.objects.create(path='Maths', label='Mathematics', vocabulary=vocab),
+        science=Term.objects.create(path='Science', label='Science', vocabulary=vocab),
+    )
+
+
+@pytest.fixture
+def tagged_docnodes(docnodes, subjects, vocabterms):
+    for name in ['s1', 's11', 's12', 's2']:
+        docnodes[name].subjects.add(subjects['maths'])
+    docnodes['s12'].subjects.add(subjects['science'])
+    docnodes['s3'].subjects.add(subjects['science'])
+    for name in ['s11', 's12']:
+        docnodes[name].education_levels.add(vocabterms['b1'])
+    docnodes['s2'].language = 'en'
+    docnodes['s2'].save()
+    return docnodes
+
+
+@pytest.mark.django_db
+def test_facet_filters(tagged_docnodes, subjects, vocabterms, client):
+    maths_uri = 'http://testserver' + subjects['maths'].uri
+    data = client.get('/Ghana/standardnodes.json', {'subjects': maths_uri}).json()
+    assert {node['id'] for node in data['results']} == {tagged_docnodes[name].id for name in ['s1', 's11', 's12', 's2']}
+    data = client.get('/Ghana/standardnodes.json', {
+        'subjects': [subjects['maths'].uri, subjects['science'].id],
+        'education_levels': 'https://w3id.org/rocdata' + vocabterms['b1'].uri,
+    }).json()
+    assert [node['id'] for node in data['results']] == [tagged_docnodes['s11'].id, tagged_docnodes['s12'].id]
+    data = client.get('/Ghana/standardnodes.json', {'language': 'en', 'publication_status': 'publicdraft'}).json()
+    assert [node['id'] for node in data['results']] == [tagged_docnodes['s2'].id]
+    response = client.get('/Ghana/standardnodes.json', {'subjects': '/Ghana/terms/Subjects/Art'})
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_facets(tagged_docnodes, subjects, vocabterms, client):
+    data = client.get('/Ghana/standardnodes/facets.json').json()
+    assert data['count'] == 10
+    assert data['facets']['subjects'] == [
+        {'value': 'http://testserver' + subjects['maths'].uri, 'label': 'Mathematics', 'count': 4},
+        {'value': 'http://testserver' + subjects['science'].uri, 'label': 'Science', 'count': 2},
+    ]
+    assert data['facets']['education_levels'] == [
+        {'value': 'http://testserver' + vocabterms['b1'].uri, 'label': 'Basic 1', 'count': 2},
+    ]
+    assert data['facets']['kind'] == []
+    assert data['facets']['language'] == [{'value': 'en', 'count': 1}]
+    assert data['facets']['publication_status'] == [{'value': 'publicdraft', 'count': 10}]
+    data = client.get('/Ghana/standardnodes/facets.json', {'subjects': subjects['science'].uri}).json()
+    assert data['count'] == 2
+    assert [value['count'] for value in data['facets']['subjects']] == [2, 1]
+
+
+@pytest.mark.django_db
+def test_facets_cache(tagged_docnodes, subjects, client):
+    url = '/Ghana/standardnodes/facets.json'
+    with CaptureQueriesContext(connection) as ctx:
+        data = client.get(url).json()
+    with CaptureQueriesContext(connection) as cached_ctx:
+        assert client.get(url).json() == data
+    assert count_queries(cached_ctx) == 1     # the term labels
+    assert count_queries(ctx) > count_queries(cached_ctx)
+    tagged_docnodes['s3'].subjects.add(subjects['maths'])
+    assert client.get(url).json()['facets']['subjects'][0]['count'] == 5
+    document = tagged_docnodes['s3'].document
+    document.publication_status = 'published'
+    document.save()
+    assert client.get(url).json()['facets']['publication_status'] == [{'value': 'published', 'count': 10}]
+
+
+@pytest.mark.django_db
+def test_content_node_facets(contentnodes, subjects, client):
+    contentnodes['c2'].subjects.add(subjects['science'])
+    contentnodes['c3'].publication_status = 'published'
+    contentnodes['c3'].save()
+    data = client.get('/Ghana/contentnodes/facets.json').json()
+    assert data['count'] == 4
+    assert [value['label'] for value in data['facets']['subjects']] == ['Science']
+    assert data['facets']['publication_status'] == [
+        {'value': 'publicdraft', 'count': 3},
+        {'value': 'published', 'count': 1},
+    ]
+    data = client.get('/Ghana/contentnodes.json', {'publication_status': 'published'}).json()
+    assert [node['id'] for node in data['results']] == [contentnodes['c3'].id]
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .test_trees import add_grandchildren, count_queries
+
+
+@pytest.mark.django_db
+def test_fields_param(doc, docnodes, vocabterms, client):
+    url = '/Ghana/standardnodes/{}.json'.format(docnodes['s1'].id)
+    data = client.get(url + '?fields=id,notation,parent,not_a_field').json()
+    assert list(data.keys()) == ['id', 'parent', 'notation']
+    assert data['notation'] == 'B1.1'
+    #
+    data = client.get(url + '?omit=children,subjects').json()
+    assert 'children' not in data and 'subjects' not in data
+    assert 'education_levels' in data
+    #
+    data = client.get('/Ghana/documents/{}.json?fields=id,title'.format(doc.id)).json()
+    assert list(data.keys()) == ['id', 'title']
+
+
+@pytest.mark.django_db
+def test_fields_param_skips_prefetches(doc, docnodes, vocabterms, client):
+    url = '/Ghana/standardnodes.json'
+    with CaptureQueriesContext(connection) as ctx:
+        full_data = client.get(url).json()['results']
+    with CaptureQueriesContext(connection) as lean_ctx:
+        data = client.get(url + '?fields=id,notation,parent').json()['results']
+    assert [d['id'] for d in data] == [d['id'] for d in full_data]
+    assert count_queries(lean_ctx) <= count_queries(ctx) - 4
+    for table in ['subjects', 'education_levels', 'concept_terms']:
+        assert not any(table in q['sql'] for q in lean_ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_fields_param_full(doc, docnodes, vocabterms, client):
+    add_grandchildren(docnodes, [vocabterms['b1']])
+    url = '/Ghana/documents/{}/full.json?fields=title,id,notation,children'.format(doc.id)
+    data = client.get(url).json()
+    assert list(data.keys()) == ['id', 'children', 'title']
+    indicator = data['children'][0]['children'][0]['children'][0]
+    assert list(indicator.keys()) == ['id', 'children', 'notation', 'title']
+    stream_response = client.get(url + '&stream=true')
+    assert json.loads(b''.join(stream_response.streaming_content)) == data
+    #
+    url = '/Ghana/documents/{}/full.json?omit=children'.format(doc.id)
+    data = client.get(url).json()
+    assert 'children' not in data
+    assert json.loads(b''.join(client.get(url + '&stream=true').streaming_content)) == data
+    #
+    url = '/Ghana/documents/{}/full.json?fields=title,notation'.format(doc.id)
+    assert client.get(url).json() == {'title': doc.title}
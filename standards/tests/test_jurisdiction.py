@@ -1,7 +1,12 @@
 import django
 import pytest
 
-from standards.models import Jurisdiction, UserProfile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from standards.models import ContentCollection, Jurisdiction, StandardsDocument, UserProfile
+
+from .test_trees import count_queries
 
 
 @pytest.mark.django_db
@@ -25,3 +30,27 @@ def test_no_duplicate_names():
     with pytest.raises(django.db.utils.IntegrityError):
         juri2.save()
 
+
+
+@pytest.mark.django_db
+def test_juri_api_query_count(juri, vocab, doc, collection, correlation, client):
+    kenya = Jurisdiction.objects.create(name="Kenya", display_name="Kenya KICD", country='KE')
+    with CaptureQueriesContext(connection) as list_ctx:
+        client.get('/.json')
+    with CaptureQueriesContext(connection) as detail_ctx:
+        client.get('/Ghana.json')
+    for i in range(5):
+        StandardsDocument.objects.create(name='GH.Doc{}'.format(i), title='Doc {}'.format(i), jurisdiction=juri)
+        StandardsDocument.objects.create(name='KE.Doc{}'.format(i), title='Doc {}'.format(i), jurisdiction=kenya)
+        ContentCollection.objects.create(name='Coll{}'.format(i), title='Coll {}'.format(i), jurisdiction=juri)
+    with CaptureQueriesContext(connection) as many_list_ctx:
+        data = client.get('/.json').json()
+    assert count_queries(many_list_ctx) == count_queries(list_ctx)
+    with CaptureQueriesContext(connection) as many_detail_ctx:
+        data = client.get('/Ghana.json').json()
+    assert count_queries(many_detail_ctx) == count_queries(detail_ctx)
+    assert len(data['documents']) == 6
+    assert len(data['contentcollections']) == 6
+    assert 'http://testserver/Ghana/documents/{}'.format(doc.id) in data['documents']
+    assert data['vocabularies'] == ['http://testserver/Ghana/terms/GradeLevels']
+    assert data['contentcorrelations'] == ['http://testserver/Ghana/contentcorrelations/{}'.format(correlation.id)]
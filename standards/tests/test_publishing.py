@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from asgiref.sync import async_to_sync
+from django.http import FileResponse
+from django.test import AsyncClient
+from django.urls import get_resolver
+from rest_framework.test import APIRequestFactory
+
+from standards.asyncviews import async_read_view
+from standards.publishing import build_absolute_uri, get_publishing_context, get_uri_path
+
+
+def test_publishing_contexts(settings):
+    request = APIRequestFactory().get('/Ghana', HTTP_HOST='localhost:8000')
+    other_request = APIRequestFactory().get('/Ghana', HTTP_HOST='127.0.0.1:8000')
+    publishing_context = get_publishing_context(request=request)
+    assert publishing_context.base_url == 'http://localhost:8000'
+    assert get_publishing_context(request=request) is publishing_context
+    assert get_publishing_context(request=other_request).base_url == 'http://127.0.0.1:8000'
+    assert build_absolute_uri('/Ghana', request=request) == 'http://localhost:8000/Ghana'
+    assert settings.ROCDATA_PUBLISHING_CONTEXTS['default']['netloc'] is None
+    #
+    settings.ROCDATA_PUBLISHING_CONTEXT = 'rocserver'
+    assert build_absolute_uri('/Ghana') == 'https://rocdata.global/Ghana'
+    settings.ROCDATA_PUBLISHING_CONTEXT = 'w3id.org'
+    assert get_publishing_context() is get_publishing_context()
+    assert build_absolute_uri('/Ghana') == 'https://w3id.org/rocdata/Ghana'
+    assert get_uri_path('https://w3id.org/rocdata/Ghana/terms/GradeLevels') == '/Ghana/terms/GradeLevels'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_read_view(doc, docnodes, client, monkeypatch, settings):
+    settings.ROCDATA_RESPONSE_CACHE = None
+    for pattern in get_resolver().url_patterns:
+        if getattr(pattern, 'name', None) == 'jurisdiction-standardnode-detail':
+            monkeypatch.setattr(pattern, 'callback', async_read_view(pattern.callback))
+    url = '/Ghana/standardnodes/{}.json'.format(docnodes['s1'].id)
+    async_client = AsyncClient()
+    response = async_to_sync(async_client.get)(url)
+    assert response.status_code == 200
+    assert response.json() == client.get(url).json()
+    response = async_to_sync(async_client.delete)(url)     # not a read, runs thread-sensitive
+    assert response.status_code == 204
+    assert async_to_sync(async_client.get)(url).status_code == 404
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_read_view_stream(doc, docnodes, client, monkeypatch, settings):
+    settings.ROCDATA_RESPONSE_CACHE = None
+    for pattern in get_resolver().url_patterns:
+        if getattr(pattern, 'name', None) == 'jurisdiction-document-full':
+            monkeypatch.setattr(pattern, 'callback', async_read_view(pattern.callback))
+    url = '/Ghana/documents/{}/full.json'.format(doc.id)
+    response = async_to_sync(AsyncClient().get)(url + '?stream=true')
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/json'
+    # the content was generated in the read thread, no queries are left for the event loop
+    assert isinstance(response, FileResponse)
+    assert json.loads(b''.join(response.streaming_content)) == client.get(url).json()
@@ -0,0 +1,61 @@
+import datetime
+import decimal
+import json
+import uuid
+from collections import OrderedDict
+
+import pytest
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from standards.renderers import FastJSONRenderer, json_dumps, orjson
+
+
+SAMPLE_DATA = OrderedDict([
+    ('id', 'S1234'),
+    ('uri', 'http://localhost:8000/Ghana/standardnodes/S1234'),
+    ('sort_order', 1.5),
+    ('level', 2),
+    ('description', 'Unicode: Ɔdwen, \u2028 and \u2029 line separators, "quotes" \\ </script>'),
+    ('date_created', datetime.datetime(2020, 12, 1, 10, 30, 0, 123456, tzinfo=timezone.utc)),
+    ('publication_date', datetime.date(2020, 12, 1)),
+    ('duration', datetime.timedelta(minutes=5)),
+    ('amount', decimal.Decimal('1.10')),
+    ('uuid', uuid.UUID('12345678123456781234567812345678')),
+    ('label', gettext_lazy('Label')),
+    ('extra_fields', {'b': None, 'a': [True, False, {}]}),
+    ('children', [{'id': 'S1235', 'children': []}]),
+])
+
+
+def test_json_dumps_same_as_drf():
+    expected = JSONRenderer().render(SAMPLE_DATA)
+    assert json_dumps(SAMPLE_DATA) == expected
+    assert json_dumps(dict(SAMPLE_DATA)) == expected
+    big_data = {'big': 2 ** 70}     # too large for orjson
+    assert json_dumps(big_data) == JSONRenderer().render(big_data)
+
+
+@pytest.mark.skipif(orjson is None, reason='orjson not installed')
+def test_json_dumps_floats():
+    # same values as JSONRenderer, but orjson's notation
+    data = {'a': 1e16, 'b': 1e-7, 'c': 1e-5, 'd': 1.5, 'e': 0.0001}
+    assert json_dumps(data) == b'{"a":1e16,"b":1e-7,"c":0.00001,"d":1.5,"e":0.0001}'
+    assert JSONRenderer().render(data) == b'{"a":1e+16,"b":1e-07,"c":1e-05,"d":1.5,"e":0.0001}'
+    assert json.loads(json_dumps(data)) == data
+    # non-finite floats are not valid JSON
+    data = {'a': float('nan'), 'b': float('inf')}
+    assert json_dumps(data) == b'{"a":null,"b":null}'
+    with pytest.raises(ValueError):
+        JSONRenderer().render(data)
+    with pytest.raises(ValueError):
+        json_dumps({'big': 2 ** 70, 'a': float('nan')})     # without orjson
+
+
+@pytest.mark.parametrize('accepted_media_type', [None, 'application/json', 'application/json; indent=4'])
+def test_fast_json_renderer(accepted_media_type):
+    data = dict(SAMPLE_DATA)
+    expected = JSONRenderer().render(data, accepted_media_type)
+    assert FastJSONRenderer().render(data, accepted_media_type) == expected
+    assert FastJSONRenderer().render(None) == b''
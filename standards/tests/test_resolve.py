@@ -0,0 +1,55 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from standards.models import StandardNode
+
+from .test_trees import count_queries
+
+
+def resolve(client, uris):
+    return client.post('/resolve', {'uris': uris}, content_type='application/json')
+
+
+@pytest.mark.django_db
+def test_resolve(doc, docnodes, vocabterms, client):
+    node_uris = ['http://testserver' + docnodes[name].uri for name in ['s1', 's11', 's12']]
+    term_uri = 'https://w3id.org/rocdata' + vocabterms['b22'].uri
+    uris = node_uris + [
+        term_uri,
+        docnodes['s2'].uri + '.json',
+        doc.uri,
+        '/Ghana/standardnodes/Snotanode',
+        'http://testserver/pages/about',
+    ]
+    response = resolve(client, uris)
+    assert response.status_code == 200
+    objects = response.json()['objects']
+    assert set(objects) == set(uris[:-2])
+    for uri in node_uris:
+        assert objects[uri] == client.get(uri + '.json').json()
+    assert objects[term_uri]['path'] == 'B2/2'
+    assert objects[term_uri]['uri'] == 'http://testserver' + vocabterms['b22'].uri
+    assert objects[doc.uri]['id'] == doc.id
+    assert set(response.json()['errors']) == set(uris[-2:])
+
+
+@pytest.mark.django_db
+def test_resolve_query_count(doc, docnodes, vocabterms, client):
+    uris = [docnodes[name].uri for name in ['s1', 's11']] + [vocabterms['b1'].uri]
+    with CaptureQueriesContext(connection) as ctx:
+        resolve(client, uris)
+    nodes = [StandardNode.objects.create(document=doc, parent=docnodes['s1{}'.format(i % 2 + 1)]) for i in range(10)]
+    uris += [node.uri for node in nodes] + [vocabterms['b2'].uri]
+    with CaptureQueriesContext(connection) as many_ctx:
+        response = resolve(client, uris)
+    assert len(response.json()['objects']) == 14
+    assert count_queries(many_ctx) == count_queries(ctx)
+
+
+@pytest.mark.django_db
+def test_resolve_errors(client):
+    assert resolve(client, 'not a list').status_code == 400
+    assert resolve(client, [1, 2]).status_code == 400
+    assert resolve(client, ['/Ghana'] * 1001).status_code == 400
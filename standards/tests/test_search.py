@@ -0,0 +1,68 @@
+import pytest
+
+from standards.models import ContentNode, StandardNode, Term
+from standards.search import rebuild_search_index, search
+
+
+def search_kinds_ids(q, **kwargs):
+    return [(spec.kind, obj.id) for spec, obj, score in search(q, **kwargs)]
+
+
+@pytest.mark.django_db
+def test_search(docnodes, contentnodes, vocabterms):
+    node = docnodes['s21']
+    node.title = 'Adding fractions'
+    node.concept_keywords = 'fractions, numerators'
+    node.save()
+    StandardNode.objects.create(document=node.document, parent=docnodes['s2'], description='Compare a fraction to 1')
+    ContentNode.objects.create(
+        collection=contentnodes['root'].collection, parent=contentnodes['root'],
+        title='Fractions on the number line', author='Fraction Videos Inc.', source_id='4')
+    results = search('fraction')
+    assert [spec.kind for spec, obj, score in results] == ['standardnode', 'contentnode', 'standardnode']
+    assert results[0][1] == node
+    assert results[0][2] > results[1][2] > results[2][2] > 0
+    assert search_kinds_ids('fractions numerators') == [('standardnode', node.id)]
+    assert search_kinds_ids('fractions', kinds=['contentnode'], limit=1)[0][0] == 'contentnode'
+    assert set(search_kinds_ids('basic 2')) == {('term', vocabterms['b2'].id), ('term', vocabterms['b22'].id)}
+    assert search('"*') == []
+
+
+@pytest.mark.django_db
+def test_search_index_updates(docnodes, vocab):
+    StandardNode.objects.bulk_create([
+        StandardNode(id='Sbulk', document=docnodes['s1'].document, parent=docnodes['s1'], description='Geometry',
+                     tree_id=docnodes['s1'].tree_id, lft=0, rght=0, level=2),
+    ])
+    assert search_kinds_ids('geometry') == [('standardnode', 'Sbulk')]
+    StandardNode.objects.filter(id='Sbulk').update(description='Algebra')
+    assert search_kinds_ids('geometry') == []
+    assert search_kinds_ids('algebra') == [('standardnode', 'Sbulk')]
+    StandardNode.objects.filter(id='Sbulk').delete()
+    assert search_kinds_ids('algebra') == []
+    #
+    term = Term.objects.create(path='K1', label='Kindergarten 1', alt_label='KG1', vocabulary=vocab)
+    assert search_kinds_ids('kg1') == [('term', term.id)]
+    rebuild_search_index()
+    assert search_kinds_ids('kindergarten') == [('term', term.id)]
+
+
+@pytest.mark.django_db
+def test_search_api(docnodes, contentnodes, client):
+    node = docnodes['s21']
+    node.title = 'Counting'
+    node.save()
+    response = client.get('/search?q=counting')
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert len(results) == 1
+    assert results[0]['kind'] == 'standardnode'
+    assert results[0]['uri'] == 'http://testserver' + node.uri
+    assert results[0]['document'] == 'http://testserver' + node.document.uri
+    assert results[0]['notation'] == 'B1.2.1'
+    assert set(results[0]) == {'kind', 'uri', 'score', 'document', 'notation', 'title', 'concept_keywords', 'description'}
+    response = client.get('/search?q=video&kind=contentnode,term&limit=2')
+    assert [result['kind'] for result in response.json()['results']] == ['contentnode', 'contentnode']
+    assert client.get('/search').status_code == 400
+    assert client.get('/search?q=video&kind=documents').status_code == 400
+    assert client.get('/search?q=video&limit=0').status_code == 400
@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections, router
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from standards.models import Jurisdiction, StandardNode, Term
+from standards.sqlite import ReadOnlyDatabaseMiddleware, read_only_database
+from standards.trees import iter_tree_nodes, load_tree
+
+
+def get_connection(name):
+    settings_dict = dict(connection.settings_dict, NAME=name)
+    return DatabaseWrapper(settings_dict, alias='sqlitetest')
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != 'sqlite', reason='SQLite only')
+def test_sqlite_connections(tmp_path):
+    path = str(tmp_path / 'db.sqlite3')
+    read_write = get_connection(path)
+    with read_write.cursor() as cursor:
+        cursor.execute('CREATE TABLE term (path TEXT)')
+        cursor.execute("INSERT INTO term VALUES ('Grade1')")
+        cursor.execute('PRAGMA journal_mode')
+        assert cursor.fetchone()[0] == 'wal'
+        cursor.execute('PRAGMA synchronous')
+        assert cursor.fetchone()[0] == 1    # NORMAL
+        cursor.execute('PRAGMA busy_timeout')
+        assert cursor.fetchone()[0] == 5000
+    read_only = get_connection('file:{}?mode=ro'.format(path))
+    with read_only.cursor() as cursor:
+        cursor.execute('SELECT path FROM term')
+        assert cursor.fetchall() == [('Grade1',)]
+        with pytest.raises(OperationalError):
+            cursor.execute("INSERT INTO term VALUES ('Grade2')")
+    read_write.close()
+    read_only.close()
+
+
+def test_read_only_router(settings):
+    settings.ROCDATA_READ_ONLY_DATABASE = 'readonly'
+    assert router.db_for_read(Term) == 'default'
+    with read_only_database():
+        assert router.db_for_read(Term) == 'readonly'
+        assert router.db_for_write(Term) == 'default'
+    assert router.db_for_read(Term) == 'default'
+    assert not router.allow_migrate('readonly', 'standards')
+    #
+    settings.ROCDATA_READ_ONLY_DATABASE = None
+    with read_only_database():
+        assert router.db_for_read(Term) == 'default'
+
+
+def test_read_only_middleware(settings):
+    settings.ROCDATA_READ_ONLY_DATABASE = 'readonly'
+    factory = APIRequestFactory()
+
+    def get_response(request):
+        return HttpResponse(router.db_for_read(Term))
+    middleware = ReadOnlyDatabaseMiddleware(get_response)
+    assert middleware(factory.get('/Ghana')).content == b'readonly'
+    assert middleware(factory.head('/Ghana')).content == b'readonly'
+    assert middleware(factory.post('/Ghana')).content == b'default'
+
+    def get_streaming_response(request):
+        return StreamingHttpResponse(router.db_for_read(Term) for i in range(2))
+    middleware = ReadOnlyDatabaseMiddleware(get_streaming_response)
+    assert b''.join(middleware(factory.get('/Ghana')).streaming_content) == b'readonlyreadonly'
+
+
+def test_read_only_middleware_async(settings):
+    settings.ROCDATA_READ_ONLY_DATABASE = 'readonly'
+    factory = APIRequestFactory()
+
+    async def get_response(request):
+        return HttpResponse(router.db_for_read(Term))
+    middleware = ReadOnlyDatabaseMiddleware(get_response)
+    assert asyncio.iscoroutinefunction(middleware)
+    assert asyncio.run(middleware(factory.get('/Ghana'))).content == b'readonly'
+    assert asyncio.run(middleware(factory.post('/Ghana'))).content == b'default'
+
+
+@pytest.fixture
+def file_databases(tmp_path, django_db_blocker, settings):
+    """
+    Replace the default and readonly connections with connections to a migrated
+    database file, like outside of the tests (the test database is in memory).
+    """
+    path = str(tmp_path / 'db.sqlite3')
+    originals = {alias: connections[alias] for alias in ['default', 'readonly']}
+    with django_db_blocker.unblock():
+        for alias, name in [('default', path), ('readonly', 'file:{}?mode=ro'.format(path))]:
+            connections[alias] = DatabaseWrapper(dict(originals[alias].settings_dict, NAME=name), alias=alias)
+        try:
+            call_command('migrate', verbosity=0)
+            settings.ROCDATA_READ_ONLY_DATABASE = 'readonly'
+            yield
+        finally:
+            for alias, original in originals.items():
+                connections[alias].close()
+                connections[alias] = original
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite', reason='SQLite only')
+def test_read_only_database_requests(file_databases, client):
+    Jurisdiction.objects.create(name='Ghana', display_name='Ghana NaCCA', country='GH')
+    with CaptureQueriesContext(connections['readonly']) as readonly_ctx, \
+            CaptureQueriesContext(connections['default']) as default_ctx:
+        response = client.get('/Ghana.json')
+    assert response.status_code == 200
+    assert response.json()['name'] == 'Ghana'
+    assert readonly_ctx.captured_queries
+    assert not any(query['sql'].startswith('SELECT') for query in default_ctx.captured_queries)
+    with pytest.raises(OperationalError):
+        with connections['readonly'].cursor() as cursor:
+            cursor.execute("UPDATE standards_jurisdiction SET display_name = 'Ghana'")
+
+    # the writes of GET requests still go to the default database
+    def get_response(request):
+        juri = Jurisdiction.objects.get(name='Ghana')
+        juri.display_name = 'Ghana (updated)'
+        juri.save()
+        return HttpResponse(Jurisdiction.objects.get(name='Ghana').display_name)
+    middleware = ReadOnlyDatabaseMiddleware(get_response)
+    assert middleware(APIRequestFactory().get('/Ghana')).content == b'Ghana (updated)'
+    assert Jurisdiction.objects.using('default').get(name='Ghana').display_name == 'Ghana (updated)'
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite', reason='SQLite only')
+def test_tree_stream_snapshot(file_databases, docnodes):
+    root = docnodes['root']
+    expected = [node.id for node in load_tree(root)[1:]]
+    with read_only_database():
+        nodes = iter_tree_nodes(root, chunk_size=3)
+        streamed = [next(nodes) for i in range(3)]
+        # an import inserts a node between two chunks, which shifts the lft values
+        StandardNode.objects.create(document=root.document, parent=docnodes['s1'], description='New')
+        streamed.extend(nodes)
+    assert [node.id for node in streamed] == expected
+    assert len(load_tree(StandardNode.objects.get(pk=root.pk))) == len(expected) + 2
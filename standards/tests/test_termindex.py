@@ -0,0 +1,86 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ValidationError
+
+from standards.models import ContentNode, ControlledVocabulary, Jurisdiction, Term
+from standards.serializers import TermHyperlinkField
+from standards.termindex import bump_term_index_version, get_term_index
+from standards.utils import get_default_license
+
+from .test_trees import count_queries
+
+
+@pytest.mark.django_db
+def test_term_index(vocab, vocabterms):
+    index = get_term_index()
+    b22 = vocabterms['b22']
+    assert index.get_id('Ghana', 'GradeLevels', 'B2/2') == b22.id
+    assert index.get_key(b22.id) == ('Ghana', 'GradeLevels', 'B2/2')
+    assert index.get_id('Ghana', 'GradeLevels', 'B3') is None
+    with CaptureQueriesContext(connection) as ctx:
+        assert get_term_index() is index
+    assert count_queries(ctx) == 0
+    #
+    b3 = Term.objects.create(path='B3', label='Basic 3', vocabulary=vocab)
+    assert get_term_index().get_id('Ghana', 'GradeLevels', 'B3') == b3.id
+    vocab.name = 'Grades'
+    vocab.save()
+    assert get_term_index().get_key(b3.id) == ('Ghana', 'Grades', 'B3')
+    b3.delete()
+    assert get_term_index().get_key(b3.id) is None
+    assert get_default_license() is None
+
+
+@pytest.mark.django_db
+def test_term_hyperlinks_use_index(doc, docnodes, vocabterms, client, settings):
+    settings.ROCDATA_RESPONSE_CACHE = None
+    node = docnodes['s1']
+    url = '/Ghana/standardnodes/{}.json'.format(node.id)
+    get_term_index()
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(url)
+    node.kind = vocabterms['b1']
+    node.save()
+    get_term_index()
+    with CaptureQueriesContext(connection) as kind_ctx:
+        data = client.get(url).json()
+    assert data['kind'] == 'http://testserver' + vocabterms['b1'].uri
+    assert count_queries(kind_ctx) == count_queries(ctx)
+    #
+    field = TermHyperlinkField()
+    with CaptureQueriesContext(connection) as ctx:
+        assert field.to_internal_value(data['kind']) == vocabterms['b1']
+    assert count_queries(ctx) == 1     # by primary key
+    with pytest.raises(ValidationError):
+        field.to_internal_value('http://testserver/Ghana/terms/GradeLevels/B9')
+
+
+@pytest.mark.django_db
+def test_default_terms_memoized(collection):
+    global_juri = Jurisdiction.objects.create(name='Global', display_name='Global')
+    licenses = ControlledVocabulary.objects.create(name='LicenseKinds', label='Licenses', jurisdiction=global_juri)
+    assert get_default_license() is None
+    arr = Term.objects.create(path='All_Rights_Reserved', label='All Rights Reserved', vocabulary=licenses)
+    assert get_default_license() == arr.id
+    with CaptureQueriesContext(connection) as ctx:
+        nodes = [ContentNode(collection=collection, title='Video {}'.format(i)) for i in range(100)]
+    assert len(ctx.captured_queries) == 0
+    assert all(node.license_id == arr.id for node in nodes)
+    arr.delete()
+    assert ContentNode(collection=collection, title='Video').license_id is None
+
+
+@pytest.mark.django_db
+def test_default_terms_reloaded_by_other_process(collection):
+    global_juri = Jurisdiction.objects.create(name='Global', display_name='Global')
+    licenses = ControlledVocabulary.objects.create(name='LicenseKinds', label='Licenses', jurisdiction=global_juri)
+    arr = Term.objects.create(path='All_Rights_Reserved', label='All Rights Reserved', vocabulary=licenses)
+    assert get_default_license() == arr.id
+    # another process reloads the vocabulary (no signals in this process)
+    Term.objects.filter(pk=arr.pk).update(path='Old_All_Rights_Reserved')
+    new_arr, = Term.objects.bulk_create([Term(id='Tnewarr', path='All_Rights_Reserved', label='ARR', vocabulary=licenses)])
+    bump_term_index_version()
+    assert get_default_license() == new_arr.id
+    assert ContentNode(collection=collection, title='Video').license_id == new_arr.id
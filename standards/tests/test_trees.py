@@ -0,0 +1,225 @@
+import json
+import uuid
+
+import pytest
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from standards.models import ContentCollection, ContentNode, Jurisdiction, StandardNode, Term
+from standards.serializers import FullStandardNodeSerializer, StandardNodeSerializer
+from standards.trees import iter_tree_nodes, load_tree
+
+
+def serialize_recursively(node, context):
+    """
+    Reference implementation of the ``/full`` tree: node by node traversal.
+    """
+    data = StandardNodeSerializer(node, context=context).data
+    data['children'] = [serialize_recursively(child, context) for child in node.children.all()]
+    return data
+
+
+def count_queries(ctx):
+    # only count the data queries (not the savepoints and silk's profiling)
+    return len([
+        q for q in ctx.captured_queries
+        if q['sql'].startswith('SELECT') and 'silk_' not in q['sql']
+    ])
+
+
+def add_grandchildren(docnodes, terms):
+    for name in ['s11', 's12', 's21', 's22', 's31', 's32']:
+        substrand = docnodes[name]
+        for k in range(3, 0, -1):   # out of sort order insertion
+            node = StandardNode.objects.create(
+                document=substrand.document, parent=substrand, sort_order=float(k),
+                description='Indicator {}.{}'.format(substrand.notation, k))
+            node.education_levels.add(*terms)
+
+
+@pytest.mark.django_db
+def test_load_tree(doc, docnodes):
+    root = StandardNode.objects.prefetch_related(None).get(pk=docnodes['root'].pk)
+    with CaptureQueriesContext(connection) as ctx:
+        nodes = load_tree(root, shared_related=['document'])
+        ids = [[[n.id for n in s.tree_children] for s in strand.tree_children] for strand in root.tree_children]
+        parents = [node.parent.id for node in nodes[1:]]
+        docs = set(node.document.id for node in nodes)
+    assert len(ctx.captured_queries) == 2   # root.document + descendants
+    assert len(nodes) == 10
+    assert ids == [
+        [[], []] for strand in ['s1', 's2', 's3']
+    ]
+    assert [strand.id for strand in root.tree_children] == [docnodes[s].id for s in ['s1', 's2', 's3']]
+    assert parents == [n.parent_id for n in nodes[1:]]
+    assert docs == {doc.id}
+
+
+@pytest.mark.django_db
+def test_full_serializer_same_as_recursive(doc, docnodes, vocabterms):
+    add_grandchildren(docnodes, [vocabterms['b1'], vocabterms['b2']])
+    request = Request(APIRequestFactory().get('/Ghana/documents/{}/full'.format(doc.id)))
+    context = {'request': request}
+    strand = StandardNode.objects.get(pk=docnodes['s2'].pk)
+    expected = serialize_recursively(strand, context)
+    data = FullStandardNodeSerializer(StandardNode.objects.get(pk=strand.pk), context=context).data
+    assert data == expected
+    indicators = data['children'][0]['children']
+    assert [child['sort_order'] for child in indicators] == [1.0, 2.0, 3.0]
+
+
+@pytest.mark.django_db
+def test_document_full_constant_queries(doc, docnodes, vocabterms, client):
+    url = '/Ghana/documents/{}/full.json'.format(doc.id)
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    small_tree_queries = count_queries(ctx)
+    #
+    add_grandchildren(docnodes, list(Term.objects.all()))
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    assert count_queries(ctx) == small_tree_queries
+    assert small_tree_queries <= 12
+    strands = response.json()['children']
+    assert len(strands[0]['children'][0]['children']) == 3
+    assert len(strands[0]['children'][0]['children'][0]['education_levels']) == 3
+
+
+@pytest.mark.django_db
+def test_iter_tree_nodes(doc, docnodes, vocabterms):
+    add_grandchildren(docnodes, [vocabterms['b1']])
+    root = StandardNode.objects.prefetch_related(None).get(pk=docnodes['root'].pk)
+    expected = load_tree(root)[1:]
+    nodes = list(iter_tree_nodes(root, prefetch_related=['education_levels'], shared_related=['document'], chunk_size=4))
+    assert [node.id for node in nodes] == [node.id for node in expected]
+    assert [node.parent.id for node in nodes] == [node.parent_id for node in expected]
+
+
+@pytest.mark.django_db
+def test_document_full_stream(doc, docnodes, vocabterms, client):
+    add_grandchildren(docnodes, [vocabterms['b1'], vocabterms['b22']])
+    url = '/Ghana/documents/{}/full.json'.format(doc.id)
+    expected = client.get(url).json()
+    response = client.get(url + '?stream=true')
+    assert response.status_code == 200
+    assert response.streaming
+    data = json.loads(b''.join(response.streaming_content))
+    assert data == expected
+    assert list(data['children'][0].keys()) == list(expected['children'][0].keys())
+
+
+@pytest.mark.django_db
+def test_document_full_depth(doc, docnodes, vocabterms, client):
+    add_grandchildren(docnodes, [vocabterms['b1']])
+    url = '/Ghana/documents/{}/full.json'.format(doc.id)
+    response = client.get(url + '?depth=1')
+    assert response.status_code == 200
+    strands = response.json()['children']
+    assert [strand['notation'] for strand in strands] == ['B1.1', 'B1.2', 'B1.3']
+    for strand in strands:
+        assert 'children' not in strand
+        assert strand['children_count'] == 2
+    #
+    response = client.get(url + '?depth=2')
+    substrand = response.json()['children'][0]['children'][0]
+    assert substrand['children_count'] == 3
+    assert list(substrand.keys()) == [k if k != 'children' else 'children_count' for k in strands[0].keys()]
+    #
+    stream_response = client.get(url + '?depth=2&stream=true')
+    assert json.loads(b''.join(stream_response.streaming_content)) == response.json()
+    #
+    response = client.get(url + '?depth=three')
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_document_full_subtree(doc, docnodes, vocabterms, client):
+    add_grandchildren(docnodes, [vocabterms['b1']])
+    url = '/Ghana/documents/{}/full.json'.format(doc.id)
+    full_data = client.get(url).json()
+    response = client.get(url + '?root={}'.format(docnodes['s2'].id))
+    assert response.status_code == 200
+    data = response.json()
+    assert data['children'] == [full_data['children'][1]]
+    assert data['title'] == full_data['title']
+    #
+    response = client.get(url + '?root={}&depth=0'.format(docnodes['s2'].id))
+    subtree = response.json()['children']
+    assert len(subtree) == 1
+    assert subtree[0]['children_count'] == 2
+    #
+    stream_response = client.get(url + '?root={}&depth=1&stream=true'.format(docnodes['s2'].id))
+    response = client.get(url + '?root={}&depth=1'.format(docnodes['s2'].id))
+    assert json.loads(b''.join(stream_response.streaming_content)) == response.json()
+    #
+    response = client.get(url + '?root=Snotanode')
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_document_full_html_lazy_tree(doc, docnodes, vocabterms, client):
+    add_grandchildren(docnodes, [vocabterms['b1']])
+    content = client.get('/Ghana/documents/{}/full'.format(doc.id)).content.decode('utf-8')
+    assert 'Substrand 1.1' in content
+    assert 'Indicator B1.1.1' not in content
+    fragment_url = '/Ghana/standardnodes/{}/childrenfragment'.format(docnodes['s11'].id)
+    assert 'data-children-url="{}"'.format(fragment_url) in content
+    assert 'show 3 children' in content
+    #
+    response = client.get(fragment_url)
+    assert response.status_code == 200
+    assert 'Indicator B1.1.1' in response.content.decode('utf-8')
+    assert 'load-children' not in response.content.decode('utf-8')
+    with CaptureQueriesContext(connection) as ctx:
+        assert client.get(fragment_url).content == response.content
+    assert count_queries(ctx) == 0
+    #
+    indicator = docnodes['s11'].children.first()
+    StandardNode.objects.create(document=doc, parent=indicator, description='Exemplar')
+    content = client.get(fragment_url).content.decode('utf-8')
+    assert '/Ghana/standardnodes/{}/childrenfragment'.format(indicator.id) in content
+    assert 'show 1 child\n' in content
+
+
+def kolibri_node(name, kind, children=None):
+    node = dict(
+        id=uuid.uuid5(uuid.NAMESPACE_DNS, name).hex, content_id=uuid.uuid5(uuid.NAMESPACE_URL, name).hex,
+        kind=kind, title=name, description='', author='')
+    if children is not None:
+        node['children'] = children
+    return node
+
+
+@pytest.mark.django_db
+def test_collection_full_stream_order_after_reimport(client, tmp_path):
+    # ccimport_kolibri --update changes the sort_order of existing nodes
+    Jurisdiction.objects.create(name='LE', display_name='Learning Equality')
+    call_command('loadterms', 'data/terms/KolibriContentNodeKinds.yml')
+    a, b, c = (
+        kolibri_node('a', 'topic', [kolibri_node('a1', 'video'), kolibri_node('a2', 'video')]),
+        kolibri_node('b', 'document'),
+        kolibri_node('c', 'topic', [kolibri_node('c1', 'video')]),
+    )
+    channel = dict(
+        channel_id=uuid.uuid4().hex, title='Channel', description='', lang_id='en',
+        license_description='', license_owner='', children=[a, b, c])
+    path = tmp_path / 'channel.json'
+    path.write_text(json.dumps(channel))
+    call_command('ccimport_kolibri', str(path), jurisdiction='LE', name='channel')
+    channel['children'] = [c, kolibri_node('d', 'video'), a]     # b is retired
+    path.write_text(json.dumps(channel))
+    call_command('ccimport_kolibri', str(path), jurisdiction='LE', name='channel', update=True)
+    #
+    collection = ContentCollection.objects.get(name='channel')
+    url = '/LE/contentcollections/{}/full.json'.format(collection.id)
+    data = client.get(url).json()
+    assert [child['title'] for child in data['children']] == ['c', 'd', 'a', 'b']
+    assert json.loads(b''.join(client.get(url + '?stream=true').streaming_content)) == data
+    root = ContentNode.objects.get(pk=collection.root.pk)
+    assert len(set(node.lft for node in iter_tree_nodes(root))) == 7
@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import pytest
+from rest_framework.request import Request
+from rest_framework.reverse import reverse
+from rest_framework.test import APIRequestFactory
+
+from standards import serializers
+from standards.uris import build_uri, get_uri_template
+
+
+HYPERLINK_FIELD_CLASSES = [
+    cls for cls in vars(serializers).values()
+    if isinstance(cls, type)
+    and issubclass(cls, serializers.MultiKeyHyperlinkField)
+    and getattr(cls, 'view_name', None)
+]
+
+
+def make_obj(url_kwargs_mapping, values):
+    """
+    Build a stub object with the dot-separated attributes in `url_kwargs_mapping`.
+    """
+    root = SimpleNamespace()
+    for urlparam, attrpath in url_kwargs_mapping.items():
+        obj = root
+        attrs = attrpath.split('.')
+        for attr in attrs[:-1]:
+            if not hasattr(obj, attr):
+                setattr(obj, attr, SimpleNamespace())
+            obj = getattr(obj, attr)
+        setattr(obj, attrs[-1], values[urlparam])
+    return root
+
+
+@pytest.fixture
+def request_():
+    return Request(APIRequestFactory().get('/Ghana'))
+
+
+@pytest.mark.parametrize('field_class', HYPERLINK_FIELD_CLASSES, ids=lambda c: c.__name__)
+def test_hyperlink_urls_same_as_reverse(field_class, request_):
+    for values in [
+            dict(jurisdiction_name='Ghana', name='Ghana', pk='S2x4Ab9kq', vocabulary_name='GradeLevels', path='B2/2'),
+            dict(jurisdiction_name='Honduras', name='Grados', pk='CC3x4Ab9k', vocabulary_name='Año', path='Año/1º'),
+        ]:
+        values = dict((k, v) for k, v in values.items() if k in field_class.url_kwargs_mapping)
+        obj = make_obj(field_class.url_kwargs_mapping, values)
+        field = field_class()
+        url = field.get_url(obj, field_class.view_name, request_, None)
+        assert url == reverse(field_class.view_name, kwargs=values, request=request_)
+
+
+def test_build_uri_ignores_format_query_param():
+    request = Request(APIRequestFactory().get('/Ghana.json?format=json'))
+    url = build_uri('jurisdiction-detail', request, name='Ghana')
+    assert url == 'http://testserver/Ghana'
+    assert 'format' in request.GET   # the request is not modified
+
+
+def test_build_uri_publishing_context(settings):
+    settings.ROCDATA_PUBLISHING_CONTEXT = 'w3id.org'
+    request = Request(APIRequestFactory().get('/Ghana', HTTP_HOST='localhost'))
+    assert build_uri('jurisdiction-detail', request, name='Ghana') == 'https://w3id.org/rocdata/Ghana'
+    assert build_uri('jurisdiction-vocabulary-term-detail', request,
+                     jurisdiction_name='Ghana', vocabulary_name='GradeLevels', path='B2/2') \
+        == 'https://w3id.org/rocdata/Ghana/terms/GradeLevels/B2/2'
+
+
+def test_uri_template_rejects_values_that_dont_match():
+    template = get_uri_template('jurisdiction-document-detail', frozenset(['jurisdiction_name', 'pk']))
+    assert template.expand({'jurisdiction_name': 'Ghana', 'pk': 'D123'}) == 'Ghana/documents/D123'
+    assert template.expand({'jurisdiction_name': 'Ghana', 'pk': 'D.123'}) is None
@@ -0,0 +1,150 @@
+from contextlib import contextmanager
+from operator import attrgetter
+
+from django.db import connections, router, transaction
+from django.db.models import Count, prefetch_related_objects
+
+
+
+# TREE MATERIALIZATION
+################################################################################
+
+def get_descendants_queryset(root, select_related=(), max_level=None):
+    """
+    Return the descendants of the MPTT node ``root`` in tree order (by ``lft``)
+    down to level ``max_level``.
+    """
+    model = type(root)
+    queryset = model._default_manager.select_related(*select_related)
+    queryset = queryset.filter(
+        tree_id=root.tree_id,
+        lft__gt=root.lft,
+        rght__lt=root.rght,
+    )
+    if max_level is not None:
+        queryset = queryset.filter(level__lte=max_level)
+    return queryset.order_by('lft')
+
+
+def set_children_counts(nodes, max_level):
+    """
+    Set ``tree_children_count`` on the ``nodes`` at level ``max_level`` that
+    have children (the boundary of a depth-limited tree) using one query.
+    """
+    boundary_nodes = [n for n in nodes if n.level == max_level and n.rght > n.lft + 1]
+    if not boundary_nodes:
+        return
+    model = type(boundary_nodes[0])
+    counts = dict(
+        model._default_manager.filter(
+            tree_id=boundary_nodes[0].tree_id,
+            lft__gt=boundary_nodes[0].lft,
+            lft__lt=boundary_nodes[-1].rght,
+            level=max_level + 1,
+        ).order_by().values_list('parent_id').annotate(Count('pk'))
+    )
+    for node in boundary_nodes:
+        node.tree_children_count = counts.get(node.pk, 0)
+
+
+def load_tree(root, select_related=(), prefetch_related=(), shared_related=(), max_level=None):
+    """
+    Load all the descendants of the MPTT node ``root`` using one range query on
+    the ``tree_id``/``lft``/``rght`` columns plus one query per lookup in
+    ``prefetch_related``, and assemble the nested structure in memory: each
+    node gets a ``tree_children`` list ordered like ``node.children.all()``.
+    The ``parent`` of every descendant and the related objects named in
+    ``shared_related`` (e.g. ``document``) are set from the in-memory nodes.
+    When ``max_level`` is given, only the nodes down to that level are loaded,
+    and the nodes at that level get ``tree_children_count`` if not leaves.
+    Returns the list of all nodes (``root`` included) in tree order.
+    """
+    model = type(root)
+    descendants = list(get_descendants_queryset(root, select_related=select_related, max_level=max_level))
+    nodes = [root] + descendants
+    prefetch_related_objects(nodes, *prefetch_related)
+    if max_level is not None:
+        set_children_counts(nodes, max_level)
+
+    parent_field = model._meta.get_field('parent')
+    shared = [(model._meta.get_field(name), getattr(root, name)) for name in shared_related]
+    nodes_by_id = {}
+    for node in nodes:
+        node.tree_children = []
+        nodes_by_id[node.pk] = node
+        if node is root:
+            continue
+        parent = nodes_by_id[node.parent_id]
+        parent_field.set_cached_value(node, parent)
+        for field, value in shared:
+            field.set_cached_value(node, value)
+        parent.tree_children.append(node)
+
+    # siblings are in lft order, which follows sort_order since MPTT moves the
+    # nodes saved with a new sort_order (``iter_tree_nodes`` relies on this),
+    # but not for rows written without save, so sort them like the model's ordering
+    get_ordering_key = attrgetter(*model._meta.ordering)
+    for node in nodes:
+        node.tree_children.sort(key=get_ordering_key)
+    return nodes
+
+
+@contextmanager
+def read_snapshot(using):
+    """
+    Run the block in one transaction on the database `using`, so that all its
+    queries read the same snapshot of the data. SQLite (in WAL mode) keeps the
+    snapshot of the first read of a transaction, while PostgreSQL's default
+    READ COMMITTED takes a new snapshot for each query, so the transaction is
+    made REPEATABLE READ there.
+    """
+    connection = connections[using]
+    outermost = not connection.in_atomic_block
+    with transaction.atomic(using=using):
+        if outermost and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+        yield
+
+
+def iter_tree_nodes(root, select_related=(), prefetch_related=(), shared_related=(), max_level=None,
+                    chunk_size=500):
+    """
+    Yield the descendants of the MPTT node ``root`` in tree order (by ``lft``)
+    without loading the whole tree: nodes are fetched in chunks of ``chunk_size``
+    (keyset queries on ``lft``) with one query per ``prefetch_related`` lookup
+    per chunk. Like in ``load_tree``, the ``parent`` and the ``shared_related``
+    objects of each node are set from memory; only the ancestors of the current
+    node are kept around for that. The ``max_level`` works like in ``load_tree``.
+    All the chunks are read in one snapshot (see ``read_snapshot``), since an
+    insert between two chunks would shift the ``lft`` values of the next ones.
+    """
+    model = type(root)
+    using = router.db_for_read(model)
+    with read_snapshot(using):
+        # the tree fields of root are read again in the snapshot
+        bounds = model._base_manager.using(using).filter(pk=root.pk).values_list('tree_id', 'lft', 'rght').first()
+        if bounds is None:
+            return
+        root.tree_id, root.lft, root.rght = bounds
+        queryset = get_descendants_queryset(root, select_related=select_related, max_level=max_level).using(using)
+        parent_field = model._meta.get_field('parent')
+        shared = [(model._meta.get_field(name), getattr(root, name)) for name in shared_related]
+        ancestors = [root]
+        last_lft = root.lft
+        while True:
+            chunk = list(queryset.filter(lft__gt=last_lft)[:chunk_size])
+            prefetch_related_objects(chunk, *prefetch_related)
+            if max_level is not None:
+                set_children_counts(chunk, max_level)
+            for node in chunk:
+                while ancestors[-1].rght < node.lft:
+                    ancestors.pop()
+                parent_field.set_cached_value(node, ancestors[-1])
+                for field, value in shared:
+                    field.set_cached_value(node, value)
+                ancestors.append(node)
+                yield node
+            if len(chunk) < chunk_size:
+                break
+            last_lft = chunk[-1].lft
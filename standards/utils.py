@@ -3,12 +3,48 @@ from urllib.parse import urlparse
 
 import pycountry
 
-from standards.models import Term
-
 
 
 # DEFAULT TERM SETTERS
 ################################################################################
+# These return the id of the term (or None) as recommended for the defaults of
+# ``ForeignKey`` fields. Defaults are computed for every new instance, including
+# every row built by ``loaddata``, so the ids are memoized (see ``DefaultTerm``).
+
+class DefaultTerm:
+    """
+    Memoized id of the term with natural key (jurisdiction name, vocabulary name,
+    path). The id is looked up in the term index again when the index version
+    changed, which is checked on every call (one get on the generation cache),
+    so the terms reloaded by other processes are used right away.
+    """
+    instances = []
+
+    def __init__(self, jurisdiction_name, vocabulary_name, path):
+        self.key = (jurisdiction_name, vocabulary_name, path)
+        self.term_id = None
+        self.version = None
+        DefaultTerm.instances.append(self)
+
+    def get_id(self):
+        # imported here, since ``standards.models`` imports this module
+        from standards.termindex import get_term_index
+        index = get_term_index()
+        if index.version != self.version:
+            self.term_id = index.get_id(*self.key)
+            self.version = index.version
+        return self.term_id
+
+    @classmethod
+    def reset_all(cls):
+        for default_term in cls.instances:
+            default_term.version = None
+
+
+DEFAULT_LICENSE = DefaultTerm("Global", "LicenseKinds", "All_Rights_Reserved")
+DEFAULT_STANDARD_NODE_RELATION_KIND = DefaultTerm("Global", "StandardNodeRelationKinds", "majorAlignment")
+DEFAULT_CONTENT_STANDARD_RELATION_KIND = DefaultTerm("Global", "ContentStandardRelationKinds", "majorCorrelation")
+
 
 def get_default_license():
     """
@@ -16,42 +52,21 @@ def get_default_license():
     Used for StandardsDocument, StandardsCrosswalk, ContentCollection,
     ContentNode, and ContentCorrelation classes.
     """
-    try:
-        return Term.objects.get(
-            vocabulary__jurisdiction__name="Global",
-            vocabulary__name="LicenseKinds",
-            path="All_Rights_Reserved"
-        )
-    except Term.DoesNotExist:
-        return None
+    return DEFAULT_LICENSE.get_id()
 
 
 def get_default_standard_node_relation_kind():
     """
     Return the default ``kind`` for ``StandardNodeRelation`` objects.
     """
-    try:
-        return Term.objects.get(
-            vocabulary__jurisdiction__name="Global",
-            vocabulary__name="StandardNodeRelationKinds",
-            path="majorAlignment"
-        )
-    except Term.DoesNotExist:
-        return None
+    return DEFAULT_STANDARD_NODE_RELATION_KIND.get_id()
 
 
 def get_default_content_standard_relation_kind():
     """
     Return the default ``kind`` for ``ContentStandardRelation`` objects.
     """
-    try:
-        return Term.objects.get(
-            vocabulary__jurisdiction__name="Global",
-            vocabulary__name="ContentStandardRelationKinds",
-            path="majorCorrelation"
-        )
-    except Term.DoesNotExist:
-        return None
+    return DEFAULT_CONTENT_STANDARD_RELATION_KIND.get_id()
 
 
 
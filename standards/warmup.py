@@ -0,0 +1,46 @@
+from urllib.parse import urlparse
+
+from standards.exporting import render_resource
+from standards.models import ContentCollection, StandardsDocument
+from standards.termindex import get_term_index
+from standards.utils import DefaultTerm
+
+
+
+# WARMUP
+################################################################################
+# Before ``./manage.py serve`` forks its workers, the process-wide data (term
+# index and default terms) is loaded, and the responses of the most recently
+# modified documents and collections are rendered into the response cache, so
+# the first requests after a deploy don't all hit a cold server.
+
+WARMUP_FORMATS = ["json", "html"]
+WARMUP_ACTIONS = ["", "/full"]
+
+
+def warm_up(base_url, limit=20):
+    """
+    Load the term index and the default terms, and render the detail and /full
+    responses of the `limit` most recently modified documents and collections
+    for requests to `base_url` (the scheme and host matter for the response
+    cache keys in the ``default`` publishing context).
+    Returns the number of responses rendered.
+    """
+    get_term_index()
+    for default_term in DefaultTerm.instances:
+        default_term.get_id()
+    parsed_url = urlparse(base_url)
+    count = 0
+    for model in [StandardsDocument, ContentCollection]:
+        for obj in model.objects.select_related('jurisdiction').order_by('-date_modified')[:limit]:
+            path = obj.get_absolute_url()
+            for action in WARMUP_ACTIONS:
+                for format_suffix in WARMUP_FORMATS:
+                    try:
+                        render_resource(path + action, format_suffix,
+                                        host=parsed_url.netloc, secure=parsed_url.scheme == 'https')
+                    except Exception as e:
+                        print('WARNING: warmup of', path + action, 'failed:', e)
+                        continue
+                    count += 1
+    return count